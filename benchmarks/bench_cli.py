@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# --- CLI COLD START ---
+# Wall time of fresh `python -m glass_core ...` processes against a bare
+# interpreter, and which heavy modules each command pulled in (from
+# -X importtime). `--help` and a local report must not load Streamlit,
+# PyGithub, NumPy or ReportLab; exits 1 when they do or when a command is
+# slower than --budget-ms above the bare interpreter.
+#
+#   python -m benchmarks.bench_cli --runs 10
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("streamlit", "github", "numpy", "reportlab")
+MUST_STAY_LIGHT = ("help", "report_local")
+
+def timed_run(argv, cwd):
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, *argv], cwd=cwd, capture_output=True, text=True)
+    seconds = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} failed: {proc.stderr.strip()}")
+    return seconds
+
+def heavy_imports(argv, cwd):
+    proc = subprocess.run([sys.executable, "-X", "importtime", *argv], cwd=cwd, capture_output=True, text=True)
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            loaded.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return sorted(loaded & set(HEAVY))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold start of the glass_core command line")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="allowed time above a bare interpreter")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data:
+        # The repo's real day files, copied so the report does not write a manifest into the repo
+        for name in os.listdir(ROOT):
+            if name.endswith(".json") and name[:8].isdigit():
+                with open(os.path.join(ROOT, name), "rb") as src, open(os.path.join(data, name), "wb") as dst:
+                    dst.write(src.read())
+        cases = {
+            "python": ["-c", "pass"],
+            "import": ["-c", "import glass_core"],
+            "help": ["-m", "glass_core", "--help"],
+            "report_local": ["-m", "glass_core", "--local", data, "--secrets", "", "report", "--date", "2025-08-23"],
+            "reprint_local": ["-m", "glass_core", "--local", data, "--secrets", "", "reprint", "GL230825-001",
+                              "--out", os.path.join(data, "nota.pdf")],
+        }
+        rows = {}
+        for label, argv in cases.items():
+            timed_run(argv, ROOT)  # warm the OS file cache and the .pyc files
+            times = [timed_run(argv, ROOT) for _ in range(args.runs)]
+            rows[label] = {"case": label, "median_ms": round(statistics.median(times) * 1000, 1),
+                           "min_ms": round(min(times) * 1000, 1), "heavy": heavy_imports(argv, ROOT)}
+
+    bare = rows["python"]["median_ms"]
+    failed = False
+    for label, row in rows.items():
+        row["over_python_ms"] = round(row["median_ms"] - bare, 1)
+        if label in MUST_STAY_LIGHT and (row["heavy"] or row["over_python_ms"] > args.budget_ms):
+            row["ok"] = False
+            failed = True
+        print(json.dumps(row))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,50 @@
+import argparse
+import glob
+import json
+import os
+from glass_core.cutting import DEFAULT_KERF, DEFAULT_SHEET, expand_pieces, optimize
+
+# --- CUTTING BENCHMARK ---
+# Real pieces from the day files in the repo root, per glass type, plus all
+# days pooled per type and repeated until there are at least --pieces pieces.
+#
+#   python -m benchmarks.bench_cutting --pieces 200
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_items(paths):
+    by_type = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for t in json.load(f):
+                for it in t.get("items", []):
+                    by_type.setdefault(it.get("item") or it.get("name") or "Item", []).append(it)
+    return by_type
+
+def run(label, pieces, budget):
+    for mode in ("fast", "best"):
+        plan = optimize(pieces, DEFAULT_SHEET, DEFAULT_KERF, mode=mode, time_budget=budget)
+        print(json.dumps({
+            "case": label,
+            "mode": mode,
+            "pieces": len(pieces),
+            "sheets": plan["sheet_count"],
+            "waste_pct": plan["waste_pct"],
+            "unplaced": len(plan["unplaced"]),
+            "ms": round(plan["seconds"] * 1000, 1),
+        }))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cutting-stock optimizer benchmark on real day files")
+    parser.add_argument("--pieces", type=int, default=200)
+    parser.add_argument("--budget", type=float, default=0.3, help="seconds for mode=best")
+    parser.add_argument("files", nargs="*")
+    args = parser.parse_args()
+
+    by_type = load_items(args.files or sorted(glob.glob(os.path.join(ROOT, "[0-9]" * 8 + ".json"))))
+    for name, items in sorted(by_type.items()):
+        pieces = expand_pieces(items)
+        run(f"{name} (all days)", pieces, args.budget)
+        if pieces and len(pieces) < args.pieces:
+            scaled = (pieces * (args.pieces // len(pieces) + 1))[:args.pieces]
+            run(f"{name} (x{args.pieces})", scaled, args.budget)
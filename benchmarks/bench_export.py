@@ -0,0 +1,112 @@
+import argparse
+import datetime
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from benchmarks.synthetic import DayGenerator, parse_range
+from glass_core.dayfile import dumps_day
+from glass_core import export
+from glass_core.export import EXPORT_FORMATS, GRANULARITIES, ROW_GROUP_SIZE, export_range
+from glass_core.storage import LocalJsonStorage
+
+# --- EXPORT MEMORY BENCHMARK ---
+# Synthetic day files for --years years in a local directory, exported as one
+# month and as the whole span in every format and granularity. Each export
+# runs in a fresh process and reports its rows, wall time, tracemalloc peak
+# (Python objects) and growth of the resident set over the imports (which
+# includes pyarrow's buffers). Exits 1 when the whole span needs more than
+# --max-ratio times the memory of one month.
+#
+# Memory is bounded by one row group plus the days in the prefetch window, so
+# it only stops growing once a span fills a row group. --row-group (default
+# 1000) makes one month fill several; with the app's 10000 the same plateau
+# starts around a year of sales.
+#
+#   python -m benchmarks.bench_export --years 3
+
+START = datetime.date(2023, 1, 1)
+
+def max_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def child(directory, first, last, granularity, fmt, row_group):
+    export.ROW_GROUP_SIZE = int(row_group)
+    if fmt == "parquet":
+        import pyarrow.parquet  # noqa: F401 loaded before the baseline
+    storage = LocalJsonStorage(directory)
+    baseline = max_rss_kb()
+    with tempfile.TemporaryFile() as out:
+        tracemalloc.start()
+        started = time.perf_counter()
+        rows = export_range(storage, first, last, granularity, fmt, out)
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        size = out.tell()
+    return {"rows": rows, "seconds": round(seconds, 2), "peak_kb": round(peak / 1024),
+            "rss_growth_kb": max_rss_kb() - baseline, "bytes": size}
+
+def write_days(directory, years, receipts, seed):
+    gen = DayGenerator(seed)
+    day = START
+    end = START.replace(year=START.year + years)
+    names = [item["name"] for item in gen.items]
+    count = 0
+    while day < end:
+        # A month at a time so the generator never holds the whole span
+        month = (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+        for name, transactions in gen.days(day, (month - day).days, receipts).items():
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(dumps_day(transactions, "jsonl", names))
+            count += len(transactions)
+        day = month
+    return end - datetime.timedelta(days=1), count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export memory for a month vs several years")
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--receipts", default="10-100", help="receipts per day, N or LO-HI")
+    parser.add_argument("--formats", nargs="+", choices=EXPORT_FORMATS, default=list(EXPORT_FORMATS))
+    parser.add_argument("--max-ratio", type=float, default=2.0)
+    parser.add_argument("--row-group", type=int, default=1000, help=f"rows per batch / row group (app: {ROW_GROUP_SIZE})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", nargs=6, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(*args.child)))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        last_day, receipts = write_days(directory, args.years, parse_range(args.receipts), args.seed)
+        print(json.dumps({"case": "data", "years": args.years, "receipts": receipts}))
+        spans = {
+            "month": (START.strftime("%Y%m%d"), START.replace(day=31).strftime("%Y%m%d")),
+            f"{args.years}y": (START.strftime("%Y%m%d"), last_day.strftime("%Y%m%d")),
+        }
+        failed = False
+        for fmt in args.formats:
+            for granularity in GRANULARITIES:
+                peaks = {}
+                for span, (first, last) in spans.items():
+                    proc = subprocess.run(
+                        [sys.executable, "-m", "benchmarks.bench_export", "--child", directory, first, last, granularity, fmt, str(args.row_group)],
+                        capture_output=True, text=True, check=True,
+                    )
+                    row = {"case": f"{fmt}.{granularity}.{span}", **json.loads(proc.stdout)}
+                    peaks[span] = row
+                    print(json.dumps(row))
+                small, large = peaks.values()
+                ratio = large["peak_kb"] / max(small["peak_kb"], 1)
+                ok = ratio <= args.max_ratio
+                failed = failed or not ok
+                print(json.dumps({"case": f"{fmt}.{granularity}.ratio", "rows": round(large["rows"] / max(small["rows"], 1), 1),
+                                  "peak": round(ratio, 2), "rss": round(large["rss_growth_kb"] / max(small["rss_growth_kb"], 1), 2),
+                                  "ok": ok}))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,124 @@
+import argparse
+import datetime
+import json
+import threading
+import time
+from benchmarks.fake_repo import FakeRepo
+from benchmarks.synthetic import DayGenerator, parse_range
+from glass_core.dayfile import dumps_day
+from github import GithubException
+from glass_core.github_storage import GithubStorage
+
+# --- RANGE PREFETCH BENCHMARK ---
+# A month of synthetic day files behind a FakeRepo that sleeps --latency per
+# call, loaded day by day (what a multi-day view did before) and through
+# Storage.iter_range with several pool sizes. Also an early stop after the
+# newest --first days, a repo that throttles above --max-concurrent loads in
+# flight, and a nearly exhausted quota that forces pacing. One JSON line per case.
+#
+#   python -m benchmarks.bench_prefetch --days 31 --latency 0.1
+
+START = datetime.date(2025, 8, 1)
+
+
+class FakeRequester:
+    # The two PyGithub Requester attributes GithubStorage.quota() reads
+    def __init__(self, remaining, reset_in):
+        self.rate_limiting = (remaining, 5000)
+        self.rate_limiting_resettime = time.time() + reset_in
+
+
+class QuotaRepo(FakeRepo):
+    """FakeRepo with a rate-limit counter and a secondary limit on concurrent reads."""
+
+    def __init__(self, files, latency, max_concurrent=None, remaining=5000, reset_in=3600):
+        super().__init__(files, latency)
+        self.max_concurrent = max_concurrent
+        self.requester = FakeRequester(remaining, reset_in)
+        self.in_flight = 0
+        self.throttled = 0
+        self._gate = threading.Lock()
+
+    def get_contents(self, path, ref=None):
+        with self._gate:
+            self.in_flight += 1
+            busy = self.max_concurrent is not None and self.in_flight > self.max_concurrent
+            if busy:
+                self.throttled += 1
+            remaining, limit = self.requester.rate_limiting
+            self.requester.rate_limiting = (max(0, remaining - 1), limit)
+        try:
+            if busy:
+                raise GithubException(403, {"message": "You have exceeded a secondary rate limit."}, {"Retry-After": "0.05"})
+            return super().get_contents(path, ref)
+        finally:
+            with self._gate:
+                self.in_flight -= 1
+
+
+def make_files(days, receipts, seed):
+    generated = DayGenerator(seed).days(START, days, receipts)
+    return {name: dumps_day(t, "json") for name, t in generated.items()}
+
+def timed(label, fn, repo, baseline=None, **extra):
+    started = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - started
+    row = {"case": label, "seconds": round(seconds, 3), "calls": sum(repo.calls.values()), **extra}
+    if baseline:
+        row["speedup"] = round(baseline / seconds, 1)
+    print(json.dumps(row))
+    return seconds, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel range prefetch vs day-by-day loads")
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--receipts", default="10-100", help="receipts per day, N or LO-HI")
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per simulated GitHub call")
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--first", type=int, default=5, help="days needed by the early-stop case")
+    parser.add_argument("--max-concurrent", type=int, default=4, help="throttling repo: loads allowed in flight")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    files = make_files(args.days, parse_range(args.receipts), args.seed)
+    first = START.strftime("%Y%m%d")
+    last = (START + datetime.timedelta(days=args.days - 1)).strftime("%Y%m%d")
+
+    def fresh(**kwargs):
+        repo = QuotaRepo(files, args.latency, **kwargs)
+        return repo, GithubStorage(lambda: repo)
+
+    repo, storage = fresh()
+    days = storage.list_days()
+    repo.calls.clear()
+    base, expected = timed("sequential", lambda: {f: storage.load_day(f) for f in sorted(days)}, repo, days=len(days))
+
+    for workers in args.workers:
+        repo, storage = fresh()
+        _, got = timed(f"iter_range[{workers}]", lambda: dict(storage.iter_range(first, last, workers=workers)),
+                       repo, base, days=len(days))
+        assert got == expected, "parallel load differs from the sequential one"
+
+    repo, storage = fresh()
+
+    def newest(n):
+        out = []
+        for f, _ in storage.iter_range(first, last, newest_first=True):
+            out.append(f)
+            if len(out) == n:
+                break
+        return out
+    timed(f"first_{args.first}_newest", lambda: newest(args.first), repo, base, days=args.first)
+
+    repo, storage = fresh(max_concurrent=args.max_concurrent)
+    _, got = timed(f"throttled[max {args.max_concurrent}]", lambda: dict(storage.iter_range(first, last, workers=16)),
+                   repo, base, days=len(days))
+    assert got == expected
+    print(json.dumps({"case": "throttled_responses", "count": repo.throttled}))
+
+    # 20 requests above the reserve, quota resets in 2 s: the rest of the month is paced
+    repo, storage = fresh(remaining=220, reset_in=2.0)
+    _, got = timed("low_quota", lambda: dict(storage.iter_range(first, last)), repo, base, days=len(days))
+    assert got == expected
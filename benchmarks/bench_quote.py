@@ -0,0 +1,207 @@
+import argparse
+import json
+import random
+import sys
+import time
+from glass_core.config import ITEMS, item_names
+from glass_core.pricing import cart_line, line_price, merge_lines
+from glass_core.quote import parse_cut_list, quote_lines
+
+# --- BATCH QUOTE BENCHMARK ---
+# Property checks first: random cut lists (whole, one- and two-decimal and
+# arbitrary float sizes, sizes whose price lands on a whole rupiah, large
+# quantities) must price exactly like cart_line piece by piece, merge into the
+# cart exactly like the old linear add_to_cart, and survive a round trip
+# through every cut-list text format, mixed line by line too. A comma that
+# could be a decimal comma or a separator must give an error, never another
+# size. Then the timings of a contractor list both ways, per --pieces. Exits
+# 1 on the first mismatch.
+#
+#   python -m benchmarks.bench_quote --cases 2000 --pieces 50 300 10000
+
+def random_size(rng):
+    kind = rng.randrange(5)
+    if kind == 0:
+        return float(rng.randint(1, 400))
+    if kind == 1:
+        return rng.randint(10, 4000) / 10
+    if kind == 2:
+        return rng.randint(100, 40000) / 100
+    if kind == 3:
+        return rng.uniform(0.01, 400)
+    # Tiny pieces: the price is (almost) only the cutting fee
+    return rng.randint(1, 100) / 100
+
+def random_rows(rng, n, sizes=None):
+    # sizes: a small pool to draw from, so the list repeats pieces like a real one
+    rows = []
+    for _ in range(n):
+        name = rng.choice(ITEMS)["name"]
+        w, h = rng.choice(sizes) if sizes else (random_size(rng), random_size(rng))
+        qty = rng.choice([1, 1, 2, 3, rng.randint(1, 50), rng.randint(1, 10000)])
+        rows.append((name, w, h, qty))
+    return rows
+
+def exact_price_rows():
+    # Sizes where area * price per m² is a whole number, the edge of the int() truncation
+    rows = []
+    for item in ITEMS:
+        for w in range(5, 400, 5):
+            for h in (10, 25, 40, 50, 80, 100, 125, 200):
+                rows.append((item["name"], float(w), float(h), 1 + w % 7))
+    return rows
+
+def linear_add(cart, line):
+    # add_to_cart before the hash index: first line with the same glass and size
+    for item in cart:
+        if (
+            item.get("item") == line["item"]
+            and float(item.get("width_cm", 0)) == line["width_cm"]
+            and float(item.get("height_cm", 0)) == line["height_cm"]
+        ):
+            item["qty"] = int(item.get("qty", 1)) + line["qty"]
+            item["unit_price"] = line["unit_price"]
+            item["price"] = line_price(line["unit_price"], item["qty"])
+            return cart
+    cart.append(line)
+    return cart
+
+def comma(size):
+    # A size with a decimal comma, whole sizes without decimals
+    return f"{size:g}" if size.is_integer() else repr(size).replace(".", ",")
+
+# One line per row in each format parse_cut_list reads, sizes written as repr() so they read back exactly
+LINE_FORMATS = {
+    "comma": lambda n, w, h, q: f"{n},{w!r},{h!r},{q}",
+    "comma_spaced": lambda n, w, h, q: f"{n}, {w!r}, {h!r}, {q}",
+    "tab": lambda n, w, h, q: f"{n}\t{w!r}\t{h!r}\t{q}",
+    "pasted": lambda n, w, h, q: f"{n.lower()}  {w!r}x{h!r} {q}",
+    "decimal_comma": lambda n, w, h, q: f"{n};{comma(w)};{comma(h)};{q}",
+    "quoted_decimal_comma": lambda n, w, h, q: f'{n},"{comma(w)}","{comma(h)}",{q}',
+    "pasted_decimal_comma": lambda n, w, h, q: f"{n} {comma(w)}x{comma(h)} {q}",
+}
+
+def cut_list_texts(rows):
+    yield "semicolon", "jenis;lebar;tinggi;qty\n" + "\n".join(f"{n};{w!r};{h!r};{q}" for n, w, h, q in rows)
+    for fmt, line in LINE_FORMATS.items():
+        yield fmt, "\n".join(line(*row) for row in rows)
+    # Every line its own format, like a list put together from several sources
+    formats = list(LINE_FORMATS.values())
+    yield "mixed", "\n".join(formats[i % len(formats)](*row) for i, row in enumerate(rows))
+
+# Lines read one way only, or an error, never silently another way
+PARSE_CASES = [
+    ("Kaca Polos 5MM, 60, 40, 2\nKaca Cermin; 45,5x30", None, [("Kaca Polos 5MM", 60.0, 40.0, 2), ("Kaca Cermin", 45.5, 30.0, 1)], 0),
+    ("Kaca Cermin, 45,5x30", None, [], 1),
+    ("Kaca Polos 5MM, 60,5, 40", None, [], 1),
+    ('Kaca Cermin,"45,5",30', None, [("Kaca Cermin", 45.5, 30.0, 1)], 0),
+    ("Kaca Cermin 45,5x30 2", None, [("Kaca Cermin", 45.5, 30.0, 2)], 0),
+    ("60x40x2", "Kaca Cermin", [("Kaca Cermin", 60.0, 40.0, 2)], 0),
+    ("60;40;2\n30x30", "Kaca Cermin", [("Kaca Cermin", 60.0, 40.0, 2), ("Kaca Cermin", 30.0, 30.0, 1)], 0),
+    ("100 50", None, [], 1),
+]
+
+def ambiguous_line(n, w, h, q):
+    # Decimal commas in a comma-separated line, qty left out when 1
+    return f"{n}, {comma(w)}, {comma(h)}" + (f", {q}" if q != 1 else "")
+
+def check(rng, cases):
+    # Returns the failures, empty when every property holds
+    failures = []
+    batches = [exact_price_rows()] + [random_rows(rng, rng.randint(1, 300)) for _ in range(cases)]
+    for rows in batches:
+        expected = [cart_line(n, w, h, q) for n, w, h, q in rows]
+        got = quote_lines(rows)
+        for row, want, line in zip(rows, expected, got):
+            if line != want or [type(v) for v in line.values()] != [type(v) for v in want.values()]:
+                failures.append({"property": "price", "row": row, "expected": want, "got": line})
+                return failures
+    for _ in range(max(1, cases // 10)):
+        sizes = [(random_size(rng), random_size(rng)) for _ in range(rng.randint(1, 20))]
+        rows = random_rows(rng, rng.randint(1, 300), sizes)
+        cart = [cart_line(n, w, h, q) for n, w, h, q in random_rows(rng, rng.randint(0, 20), sizes)]
+        reference = [dict(line) for line in cart]
+        for n, w, h, q in rows:
+            linear_add(reference, cart_line(n, w, h, q))
+        merge_lines(cart, quote_lines(rows))
+        if cart != reference:
+            failures.append({"property": "merge", "rows": rows[:20], "expected": reference[:20], "got": cart[:20]})
+            return failures
+    for _ in range(max(1, cases // 10)):
+        rows = random_rows(rng, rng.randint(1, 50))
+        for fmt, text in cut_list_texts(rows):
+            parsed, errors = parse_cut_list(text)
+            if parsed != rows or errors:
+                failures.append({"property": f"parse.{fmt}", "rows": rows[:5], "got": parsed[:5], "errors": errors[:5]})
+                return failures
+        # Sizes only, the first line included: every line takes the default glass type
+        name = rows[0][0]
+        rows = [(name, w, h, q) for _, w, h, q in rows]
+        parsed, errors = parse_cut_list("\n".join(f"{w!r}x{h!r}x{q}" for _, w, h, q in rows), default_item=name)
+        if parsed != rows or errors:
+            failures.append({"property": "parse.default_item", "rows": rows[:5], "got": parsed[:5], "errors": errors[:5]})
+            return failures
+        for row in random_rows(rng, 20, [(float(rng.randint(1, 400)), rng.randint(1, 4000) / 10) for _ in range(5)]):
+            parsed, errors = parse_cut_list(ambiguous_line(*row))
+            if parsed != [row] and not (not parsed and len(errors) == 1 and "ambiguous" in errors[0]):
+                failures.append({"property": "parse.ambiguous_comma", "line": ambiguous_line(*row), "got": parsed, "errors": errors})
+                return failures
+    for text, default_item, want, error_count in PARSE_CASES:
+        parsed, errors = parse_cut_list(text, default_item=default_item)
+        if parsed != want or len(errors) != error_count:
+            failures.append({"property": "parse.cases", "text": text, "expected": want, "got": parsed, "errors": errors})
+            return failures
+    return failures
+
+def best_ms(fn, runs):
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3)
+
+def timings(rng, pieces, runs):
+    sizes = [(float(rng.randint(20, 200)), float(rng.randint(20, 200))) for _ in range(max(1, pieces // 3))]
+    rows = random_rows(rng, pieces, sizes)
+    text = "\n".join(f"{n};{w:g};{h:g};{q}" for n, w, h, q in rows)
+
+    def per_item():
+        cart = []
+        for n, w, h, q in rows:
+            linear_add(cart, cart_line(n, w, h, q))
+        return cart
+
+    def batch():
+        return merge_lines([], quote_lines(rows))
+
+    def import_text():
+        parsed, _ = parse_cut_list(text)
+        return merge_lines([], quote_lines(parsed))
+
+    return {
+        "case": f"quote[{pieces}]",
+        "pieces": pieces,
+        "cart_lines": len(batch()),
+        "per_item_ms": best_ms(per_item, runs),
+        "batch_ms": best_ms(batch, runs),
+        "import_text_ms": best_ms(import_text, runs),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch quotes against the per-item formula")
+    parser.add_argument("--cases", type=int, default=500, help="random cut lists to check")
+    parser.add_argument("--pieces", type=int, nargs="+", default=[50, 300, 10000])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = check(rng, args.cases)
+    print(json.dumps({"case": "properties", "cut_lists": args.cases, "item_types": len(item_names()), "ok": not failures}))
+    if failures:
+        print(json.dumps(failures[0], default=str))
+        sys.exit(1)
+    for pieces in args.pieces:
+        print(json.dumps(timings(rng, pieces, args.runs)))
@@ -0,0 +1,208 @@
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# --- RERUN LATENCY ---
+# Scripted cashier sessions through glass_cashier.py with Streamlit's AppTest,
+# against benchmarks.fake_repo.FakeRepo (set with backend.set_repo_override)
+# with --latency-ms per GitHub call and --receipts sales already on today's day.
+# Every scenario (latency x day size) runs in a fresh process: the first
+# session there is a cold server, the rest share its cached resources like a
+# second browser tab. Each interaction's rerun is timed around AppTest.run(),
+# and the elements and widgets it rendered are counted.
+#
+# AppTest always runs the whole script, also for widgets inside a fragment.
+# For interactions handled by page regions the row also carries those
+# regions' own time (session_state["region_ms"]), which is what the fragment
+# rerun in the browser executes.
+#
+# Prints one JSON row per scenario and interaction with the latency
+# percentiles. Exits 1 when an interaction's p95 goes over --budget-ms, or
+# over a saved --baseline by more than --tolerance (plus --slack-ms of noise),
+# or when it renders more widgets than the baseline did.
+#
+#   python -m benchmarks.bench_rerun --save rerun.json
+#   python -m benchmarks.bench_rerun --baseline rerun.json --tolerance 0.25
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE = os.path.join(ROOT, "glass_cashier.py")
+SIZES = [(120.0, 80.0), (60.0, 40.0), (45.5, 30.0), (200.0, 100.0)]
+UNBUDGETED = ("cold_load",)  # cache building and the first manifest, not a rerun
+# Interaction -> the fragments that rerun for it
+STEP_REGIONS = {
+    "set_width": ("cart",), "set_height": ("cart",), "add_item": ("cart",),
+    "pay": ("cart", "today", "history"),
+    "select_receipt": ("today",), "next_page": ("today",),
+    "open_history": ("history",), "pick_day": ("history",),
+}
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def fake_files(receipts, history_days, seed):
+    from benchmarks.synthetic import DayGenerator
+    from glass_core.config import item_names, now
+    from glass_core.dayfile import dumps_day
+    gen = DayGenerator(seed)
+    names = item_names()
+    today = now().date()
+    files = {}
+    past = gen.days(today - datetime.timedelta(days=history_days), history_days, (20, 80))
+    past[f"{today:%Y%m%d}.json"] = gen.day(today, receipts)
+    for name, transactions in past.items():
+        files[name] = dumps_day(transactions, "jsonl", names)
+    return files
+
+def count_elements(at):
+    from streamlit.testing.v1.element_tree import Block, Widget
+    elements = widgets = 0
+    stack = list(at._tree.children.values())
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Block):
+            stack.extend(node.children.values())
+            continue
+        elements += 1
+        widgets += isinstance(node, Widget)
+    return elements, widgets
+
+def button(at, text):
+    return next(b for b in at.button if text in b.label)
+
+def cashier_session(at, step, items):
+    # load -> enter sizes and add items -> pay -> open a receipt -> next page -> history -> another day
+    step("load", None)
+    for n in range(items):
+        width, height = SIZES[n % len(SIZES)]
+        step("set_width", lambda: at.number_input(key="width_cm").set_value(width))
+        step("set_height", lambda: at.number_input(key="height_cm").set_value(height))
+        step("add_item", lambda: button(at, "Tambah").click())
+    step("pay", lambda: button(at, "Bayar").click())
+    step("select_receipt", lambda: at.session_state.__setitem__("today_table_1_10", {"selection": {"rows": [0], "columns": []}}))
+    if any(n.key == "today_page" and n.max > 1 for n in at.number_input):
+        step("next_page", lambda: at.number_input(key="today_page").set_value(2))
+    step("open_history", lambda: button(at, "Tampilkan Riwayat").click())
+    if any(s.label == "Pilih Sesi" and len(s.options) > 1 for s in at.selectbox):
+        step("pick_day", lambda: next(s for s in at.selectbox if s.label == "Pilih Sesi").set_value(1))
+
+def child(latency_ms, receipts, sessions, items, history_days, seed):
+    from benchmarks.fake_repo import FakeRepo
+    from glass_core.backend import set_repo_override
+    from streamlit.testing.v1 import AppTest
+    repo = FakeRepo(fake_files(receipts, history_days, seed), latency=latency_ms / 1000)
+    set_repo_override(repo)
+    steps = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        for session in range(sessions):
+            at = AppTest.from_file(PAGE, default_timeout=120)
+            # Batched commits need the git data API, which FakeRepo does not have
+            at.secrets.update(COMMIT_BATCH_INTERVAL="0", OUTBOX_PATH=os.path.join(scratch, "outbox.jsonl"))
+
+            def step(name, action):
+                if action is not None:
+                    action()
+                started = time.perf_counter()
+                at.run()
+                seconds = time.perf_counter() - started
+                if at.exception:
+                    raise RuntimeError(f"{name}: {at.exception[0].value}")
+                if name == "load" and session == 0:
+                    name = "cold_load"
+                elements, widgets = count_elements(at)
+                row = steps.setdefault(name, {"seconds": [], "elements": [], "widgets": [], "region_ms": []})
+                row["seconds"].append(seconds)
+                region_ms = at.session_state["region_ms"] if "region_ms" in at.session_state else {}
+                if name in STEP_REGIONS and all(r in region_ms for r in STEP_REGIONS[name]):
+                    row["region_ms"].append(sum(region_ms[r] for r in STEP_REGIONS[name]))
+                row["elements"].append(elements)
+                row["widgets"].append(widgets)
+
+            cashier_session(at, step, items)
+    return {"calls": dict(repo.calls), "steps": steps}
+
+def summarize(scenario, steps):
+    for name, row in steps.items():
+        ms = [s * 1000 for s in row["seconds"]]
+        out = {"case": f"{scenario}.{name}", "runs": len(ms), "p50_ms": round(percentile(ms, 50), 1),
+               "p90_ms": round(percentile(ms, 90), 1), "p95_ms": round(percentile(ms, 95), 1),
+               "max_ms": round(max(ms), 1), "elements": max(row["elements"]), "widgets": max(row["widgets"])}
+        if row.get("region_ms"):
+            out["fragment"] = "+".join(STEP_REGIONS[name])
+            out["fragment_p50_ms"] = percentile(row["region_ms"], 50)
+        yield out
+
+def over_budget(row, args, baseline):
+    # Reasons this row fails, empty when it is within every budget
+    step = row["case"].rsplit(".", 1)[1]
+    if step in UNBUDGETED:
+        return []
+    reasons = []
+    if args.budget_ms is not None and row["p95_ms"] > args.budget_ms:
+        reasons.append(f"p95 {row['p95_ms']} ms > budget {args.budget_ms} ms")
+    base = baseline.get(row["case"])
+    if base:
+        limit = base["p95_ms"] * (1 + args.tolerance) + args.slack_ms
+        if row["p95_ms"] > limit:
+            reasons.append(f"p95 {row['p95_ms']} ms > baseline {base['p95_ms']} ms + {args.tolerance:.0%} + {args.slack_ms} ms")
+        if row["widgets"] > base["widgets"]:
+            reasons.append(f"{row['widgets']} widgets > baseline {base['widgets']}")
+    return reasons
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rerun latency of scripted cashier sessions")
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0.0, 50.0], help="fake GitHub latency per call")
+    parser.add_argument("--receipts", type=int, nargs="+", default=[50, 500], help="sales already on today's day")
+    parser.add_argument("--sessions", type=int, default=3, help="cashier sessions per scenario")
+    parser.add_argument("--items", type=int, default=3, help="cart lines per sale")
+    parser.add_argument("--history-days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-ms", type=float, help="p95 ceiling for every interaction")
+    parser.add_argument("--baseline", metavar="PATH", help="rows saved by an earlier --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 growth over the baseline")
+    parser.add_argument("--slack-ms", type=float, default=10.0, help="absolute noise allowance on top of --tolerance")
+    parser.add_argument("--save", metavar="PATH", help="write the rows as a baseline")
+    parser.add_argument("--child", nargs=6, type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        latency_ms, receipts, sessions, items, history_days, seed = args.child
+        print(json.dumps(child(latency_ms, int(receipts), int(sessions), int(items), int(history_days), int(seed))))
+        sys.exit(0)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {row["case"]: row for row in json.load(f)}
+    rows = []
+    failed = False
+    for latency_ms in args.latency_ms:
+        for receipts in args.receipts:
+            scenario = f"lat{latency_ms:g}ms.day{receipts}"
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_rerun", "--child", str(latency_ms), str(receipts),
+                 str(args.sessions), str(args.items), str(args.history_days), str(args.seed)],
+                cwd=ROOT, capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                raise RuntimeError(f"{scenario} failed: {proc.stderr.strip()[-2000:]}")
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            for row in summarize(scenario, result["steps"]):
+                reasons = over_budget(row, args, baseline)
+                if reasons:
+                    row["ok"] = False
+                    row["over"] = reasons
+                    failed = True
+                rows.append(row)
+                print(json.dumps(row))
+            print(json.dumps({"case": f"{scenario}.github_calls", **result["calls"]}))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(rows, f, indent=1)
+    sys.exit(1 if failed else 0)
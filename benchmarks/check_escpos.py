@@ -0,0 +1,38 @@
+import json
+import os
+import sys
+from glass_core.escpos import render_escpos
+
+
+# --- ESC/POS GOLDEN FILES ---
+# The printer bytes of the sample receipts, byte for byte against
+# golden/escpos/*.bin. Exits 1 when any differ.
+#
+#   python -m benchmarks.check_escpos            compare current output
+#   python -m benchmarks.check_escpos --update   rewrite the .bin files from the samples
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "golden", "escpos")
+GOLDEN_SHOP = "Glass Cashier App"
+
+def golden_samples():
+    with open(os.path.join(GOLDEN_DIR, "samples.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else "--check"
+    failed = []
+    for name, transaction in golden_samples().items():
+        path = os.path.join(GOLDEN_DIR, f"{name}.bin")
+        data = render_escpos(transaction, GOLDEN_SHOP)
+        if mode == "--update":
+            with open(path, "wb") as f:
+                f.write(data)
+        else:
+            with open(path, "rb") as f:
+                if f.read() != data:
+                    failed.append(name)
+    if failed:
+        print(f"ESC/POS output differs from golden files: {', '.join(failed)}")
+        sys.exit(1)
+    print("OK" if mode != "--update" else f"Updated golden files in {GOLDEN_DIR}")
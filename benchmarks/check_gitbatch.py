@@ -0,0 +1,187 @@
+import argparse
+import collections
+import datetime
+import hashlib
+import sys
+import threading
+import time
+from benchmarks.fake_git_server import FakeGitServer
+from benchmarks.stress_multitill import make_transaction
+from github import Github
+from glass_core.backend import open_storage
+from glass_core.manifest import ManifestStorage
+from glass_core.numbering import generate_receipt_code
+from glass_core.github_storage import GithubStorage
+from glass_core.stock import load_stock, restock
+from glass_core.storage import ShardedStorage
+
+
+# --- COMMIT BATCHER CHECK ---
+# Real PyGithub against a local fake GitHub server. Several tills sell at once,
+# each with its own batching storage, while a plain contents-API writer keeps
+# moving the branch so ref updates conflict. Every sale must land exactly once,
+# the manifest must match a full rebuild and the branch must have far fewer
+# commits than writes. Then the app's own stack (ledger, stock, manifest): a
+# sale and a delete must each be one commit, and a plain write listener (the
+# search index) must hear of a file once, only after its commit landed.
+#
+#   python -m benchmarks.check_gitbatch --tills 3 --sales 20
+
+FILENAME = "20250822.json"
+ITEM_NAMES = ["Kaca Polos 5MM"]
+
+def run(tills, sales, interval, interference):
+    server = FakeGitServer({"notes.json": "{}"}).start()
+    try:
+        till_ids = [chr(ord("A") + i) for i in range(tills)]
+
+        def open_repo():
+            # One client per till, like separate server processes
+            # No client-side write throttling: the fake server has no secondary rate limit
+            return Github(base_url=server.base_url, retry=None, seconds_between_requests=0,
+                          seconds_between_writes=0).get_repo(server.full_name)
+
+        stores = {}
+        for till_id in till_ids:
+            repo = open_repo()
+            inner = GithubStorage(lambda repo=repo: repo, day_format="jsonl", item_names=ITEM_NAMES, batch_interval=interval)
+            stores[till_id] = (inner, ShardedStorage(ManifestStorage(inner), till_id, till_ids))
+        stores[till_ids[0]][1].day_index()  # creates the manifest
+
+        requeued = collections.Counter()
+
+        def till(till_id):
+            storage = stores[till_id][1]
+            # Several sessions in one process: their syncs coalesce into shared commits
+            def session(offset):
+                for n in range(offset, sales, 2):
+                    t = make_transaction(generate_receipt_code("220825", n + 1, till_id), n)
+                    # Same contract as the outbox worker: a failed sync stays queued and is retried
+                    while True:
+                        try:
+                            storage.append_transactions(FILENAME, [t])
+                            break
+                        except Exception as e:
+                            requeued[type(e).__name__] += 1
+                            time.sleep(0.05)
+            workers = [threading.Thread(target=session, args=(i,)) for i in range(2)]
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+
+        stop = threading.Event()
+
+        def interfere():
+            # Unbatched writer on another file: moves the branch under the batchers
+            repo = open_repo()
+            n = 0
+            while not stop.is_set():
+                f = repo.get_contents("notes.json")
+                repo.update_file("notes.json", "Touch notes", f'{{"n": {n}}}', f.sha)
+                n += 1
+                time.sleep(0.05)
+
+        noise = threading.Thread(target=interfere) if interference else None
+        if noise:
+            noise.start()
+        started = time.perf_counter()
+        threads = [threading.Thread(target=till, args=(t,)) for t in till_ids]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        if noise:
+            noise.join()
+
+        reader_repo = open_repo()
+        reader = ManifestStorage(GithubStorage(lambda: reader_repo))
+        codes = [t["code"] for t in ShardedStorage(reader, till_ids[0], till_ids).load_day(FILENAME)]
+        index = reader.day_index()
+        manifest_before = reader.manifest()
+        rebuilt = reader.rebuild()
+        history = collections.Counter(m.split("\n")[0].split(" ")[0] for m in server.history())
+        expected = tills * sales
+        return {
+            "sales": expected,
+            "stored": len(codes),
+            "unique": len(set(codes)),
+            "manifest_count": index.get(FILENAME, {}).get("count"),
+            "manifest_matches_rebuild": rebuilt["files"] == manifest_before["files"],
+            "batch_commits": sum(s[0].stats().get("commits", 0) for s in stores.values()),
+            "ref_conflicts": sum(s[0].stats().get("conflicts", 0) for s in stores.values()),
+            "history": dict(history),
+            "requeued": dict(requeued),
+            "seconds": round(elapsed, 2),
+            "ok": len(codes) == len(set(codes)) == expected
+            and index.get(FILENAME, {}).get("count") == expected
+            and rebuilt["files"] == manifest_before["files"],
+        }
+    finally:
+        server.stop()
+
+
+def run_sale(interval):
+    server = FakeGitServer({"notes.json": "{}"}).start()
+    try:
+        repo = Github(base_url=server.base_url, retry=None, seconds_between_requests=0,
+                      seconds_between_writes=0).get_repo(server.full_name)
+        storage = open_storage({"STORAGE_BACKEND": "github", "COMMIT_BATCH_INTERVAL": interval}, lambda: repo)
+        heard = []
+
+        def listener(name, data, version):
+            # What the branch holds at this moment
+            landed = server.files().get(name)
+            heard.append((name, landed is not None and hashlib.sha1(b"blob %d\0" % len(landed) + landed).hexdigest() == version))
+        storage.add_write_listener(listener)
+        storage.day_index()  # creates the manifest
+        restock(storage, "Kaca Polos 5MM", 10, datetime.datetime(2025, 8, 1))
+        t = make_transaction(generate_receipt_code("220825", 1, ""), 1)
+        commits = len(server.history())
+        started = time.perf_counter()
+        storage.append_transactions(FILENAME, [t])
+        sale_commits = len(server.history()) - commits
+        sale_seconds = time.perf_counter() - started
+        sold = load_stock(storage)["items"]["Kaca Polos 5MM"]["area_m2"]
+        ledger = storage.ledger(FILENAME)["receipts"]
+        commits = len(server.history())
+        started = time.perf_counter()
+        deleted = storage.delete_transaction(FILENAME, t["code"])
+        delete_commits = len(server.history()) - commits
+        delete_seconds = time.perf_counter() - started
+        back = load_stock(storage)["items"]["Kaca Polos 5MM"]["area_m2"]
+        day_notices = [landed for name, landed in heard if name == FILENAME]
+        return {
+            "sale_commits": sale_commits,
+            "sale_seconds": round(sale_seconds, 2),
+            "delete_commits": delete_commits,
+            "delete_seconds": round(delete_seconds, 2),
+            "deleted": deleted,
+            "ledger_after_sale": ledger,
+            "stock_after_sale": sold,
+            "stock_after_delete": back,
+            "day_notices": day_notices,
+            "ledger_check": storage.check(FILENAME),
+            "ok": sale_commits == 1 and delete_commits == 1 and deleted and ledger == 1
+            and sold < back and day_notices == [True, True] and not storage.check(FILENAME),
+        }
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the Git Data API commit batcher against a fake GitHub server")
+    parser.add_argument("--tills", type=int, default=3)
+    parser.add_argument("--sales", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.2)
+    parser.add_argument("--no-interference", action="store_true")
+    args = parser.parse_args()
+    result = run(args.tills, args.sales, args.interval, not args.no_interference)
+    print(result)
+    sale = run_sale(args.interval)
+    print(sale)
+    ok = result["ok"] and sale["ok"]
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+from benchmarks.stress_multitill import make_transaction
+from glass_core.analytics import day_rollup
+from glass_core.ledger import LedgerStorage
+from glass_core.manifest import ManifestStorage
+from glass_core.records import parse_day
+from glass_core.storage import LocalJsonStorage, ShardedStorage, SqliteStorage
+
+
+# --- DAY LEDGER CHECK ---
+# A day that repeats a receipt code (like 20250822, with two GL220825-003
+# receipts) through the JSON and SQLite stacks: the ledger must count every
+# receipt like analytics.day_rollup does, ignore a replayed sale, and a delete
+# must take off one receipt from the day and the ledger alike. --local also
+# checks the days of a data directory against their rollup.
+#
+#   python -m benchmarks.check_ledger --local data
+
+FILENAME = "20250822.json"
+ITEM_NAMES = ["Kaca Polos 5MM"]
+
+def repeated_code_day():
+    day = [make_transaction(f"GL220825-{n:03d}", n) for n in range(1, 6)]
+    repeat = dict(make_transaction("GL220825-003", 40), total=25000)
+    repeat["items"] = [dict(repeat["items"][0], width_cm=30, height_cm=30, price=25000)]
+    return day + [repeat]
+
+def rollup_totals(transactions):
+    receipts = revenue = 0
+    for slot in day_rollup(parse_day(FILENAME, transactions).transactions, ITEM_NAMES)["methods"].values():
+        revenue += int(slot[0])
+        receipts += int(slot[1])
+    return receipts, revenue
+
+def agrees(storage, filename, problems, label):
+    ledger = storage.ledger(filename)
+    day = storage.load_day(filename)
+    want = rollup_totals(day)
+    if (ledger["receipts"], ledger["total"]) != want:
+        problems.append(f"{label}: ledger {ledger['receipts']} receipts / {ledger['total']}, day {want}")
+    diffs = storage.check(filename)
+    if diffs:
+        problems.append(f"{label}: check {diffs}")
+    return len(day)
+
+def run_stack(name, storage):
+    problems = []
+    day = repeated_code_day()
+    storage.save_day(FILENAME, day)
+    if agrees(storage, FILENAME, problems, f"{name}.saved") != 6:
+        problems.append(f"{name}.saved: the day lost a receipt")
+    # The outbox resending a synced sale changes nothing
+    storage.append_transactions(FILENAME, [day[2]])
+    agrees(storage, FILENAME, problems, f"{name}.replay")
+    # One delete, one receipt: the other GL220825-003 stays
+    storage.delete_transaction(FILENAME, "GL220825-003")
+    codes = [t["code"] for t in storage.load_day(FILENAME)]
+    if codes.count("GL220825-003") != 1:
+        problems.append(f"{name}.delete: {codes.count('GL220825-003')} GL220825-003 left, expected 1")
+    agrees(storage, FILENAME, problems, f"{name}.delete")
+    storage.delete_transaction(FILENAME, "GL220825-003")
+    if agrees(storage, FILENAME, problems, f"{name}.delete_again") != 4:
+        problems.append(f"{name}.delete_again: expected 4 receipts left")
+    storage.append_transactions(FILENAME, [make_transaction("GL220825-006", 50)])
+    agrees(storage, FILENAME, problems, f"{name}.sale")
+    return problems
+
+def run_local(directory):
+    # Days of a data directory, ledgers counted in memory: nothing is written
+    storage = LedgerStorage(LocalJsonStorage(directory))
+    problems = []
+    for filename in sorted(storage.list_days()):
+        ledger = storage.ledger(filename)
+        want = rollup_totals(storage.load_day(filename))
+        print(json.dumps({"day": filename, "receipts": ledger["receipts"], "total": ledger["total"], "rollup": want}))
+        if (ledger["receipts"], ledger["total"]) != want:
+            problems.append(f"{filename}: ledger {ledger['receipts']} receipts / {ledger['total']}, day {want}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the day ledgers on a day with a repeated receipt code")
+    parser.add_argument("--local", help="also check the days of this data directory")
+    args = parser.parse_args()
+
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        json_stack = LedgerStorage(ShardedStorage(ManifestStorage(LocalJsonStorage(os.path.join(tmp, "data"))), "A", ["A", "B"]))
+        problems += run_stack("json", json_stack)
+        problems += run_stack("sqlite", LedgerStorage(SqliteStorage(os.path.join(tmp, "glass.db"))))
+    if args.local:
+        problems += run_local(args.local)
+    for problem in problems:
+        print(problem)
+    print("OK" if not problems else "FAILED")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,255 @@
+import base64
+import collections
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from benchmarks.fake_repo import git_blob_sha
+
+
+# --- FAKE GITHUB HTTP SERVER ---
+# A local stand-in for the GitHub REST endpoints the app talks to, so the real
+# PyGithub client runs unchanged against it:
+#   GET/PUT/DELETE /repos/{owner}/{repo}/contents/{path}   (ETag / 304 aware)
+#   GET /git/ref(s)/heads/{branch}, PATCH /git/refs/heads/{branch}
+#   GET/POST /git/blobs, /git/trees, /git/commits
+# Blobs use real git SHAs; trees and commits get content hashes of their own.
+# Only a flat root tree is modelled, like the day files in the real repo.
+# Responses carry x-ratelimit-* headers; 304s do not use up the quota.
+#
+#   server = FakeGitServer({"20250822.json": b"[]"}).start()
+#   repo = Github(base_url=server.base_url).get_repo(server.full_name)
+
+def _object_sha(kind, body):
+    return hashlib.sha1(kind.encode() + json.dumps(body, sort_keys=True).encode()).hexdigest()
+
+
+class FakeGitServer:
+    def __init__(self, files=None, owner="shop", name="glass-cashier", branch="main"):
+        self.owner = owner
+        self.name = name
+        self.branch = branch
+        self.calls = collections.Counter()
+        self.blobs = {}
+        self.trees = {}
+        self.commits = {}
+        self._lock = threading.Lock()
+        self.rate_limit = 5000
+        self.rate_remaining = 5000
+        self.rate_reset = int(time.time()) + 3600
+        tree = self._put_tree({path: self._put_blob(data.encode() if isinstance(data, str) else data)
+                               for path, data in (files or {}).items()})
+        self.head = self._put_commit(tree, [], "Initial")
+        self._server = None
+
+    @property
+    def full_name(self):
+        return f"{self.owner}/{self.name}"
+
+    # --- object store ---
+    def _put_blob(self, data):
+        sha = git_blob_sha(data)
+        self.blobs[sha] = data
+        return sha
+
+    def _put_tree(self, entries):
+        sha = _object_sha("tree", entries)
+        self.trees[sha] = dict(entries)
+        return sha
+
+    def _put_commit(self, tree, parents, message):
+        sha = _object_sha("commit", {"tree": tree, "parents": parents, "message": message, "n": len(self.commits)})
+        self.commits[sha] = {"tree": tree, "parents": parents, "message": message}
+        return sha
+
+    def files(self):
+        # {path: bytes} at the branch head
+        with self._lock:
+            return {p: self.blobs[s] for p, s in self.trees[self.commits[self.head]["tree"]].items()}
+
+    def history(self):
+        # Commit messages from the head back to the initial commit
+        out = []
+        sha = self.head
+        while sha:
+            commit = self.commits[sha]
+            out.append(commit["message"])
+            sha = commit["parents"][0] if commit["parents"] else None
+        return out
+
+    def _is_ancestor(self, old, new):
+        stack = [new]
+        while stack:
+            sha = stack.pop()
+            if sha == old:
+                return True
+            stack.extend(self.commits.get(sha, {}).get("parents", []))
+        return False
+
+    # --- JSON shapes ---
+    def _url(self, suffix=""):
+        return f"{self.base_url}/repos/{self.full_name}{suffix}"
+
+    def _content_json(self, path, sha):
+        data = self.blobs[sha]
+        return {
+            "type": "file", "encoding": "base64", "name": path.rsplit("/", 1)[-1], "path": path,
+            "sha": sha, "size": len(data), "content": base64.b64encode(data).decode(),
+            "url": self._url(f"/contents/{path}"),
+        }
+
+    def _commit_json(self, sha):
+        c = self.commits[sha]
+        return {
+            "sha": sha, "url": self._url(f"/git/commits/{sha}"), "message": c["message"],
+            "tree": {"sha": c["tree"], "url": self._url(f"/git/trees/{c['tree']}")},
+            "parents": [{"sha": p, "url": self._url(f"/git/commits/{p}")} for p in c["parents"]],
+        }
+
+    def _ref_json(self):
+        return {
+            "ref": f"refs/heads/{self.branch}", "url": self._url(f"/git/refs/heads/{self.branch}"),
+            "object": {"sha": self.head, "type": "commit", "url": self._url(f"/git/commits/{self.head}")},
+        }
+
+    # --- request handling ---
+    def handle(self, method, path, query, body, headers):
+        # -> (status, json body, extra headers)
+        prefix = f"/repos/{self.full_name}"
+        if path in (prefix, prefix + "/"):
+            return 200, {"full_name": self.full_name, "name": self.name, "url": self._url(),
+                         "default_branch": self.branch, "owner": {"login": self.owner}}, {}
+        if not path.startswith(prefix + "/"):
+            return 404, {"message": "Not Found"}, {}
+        route = path[len(prefix) + 1:]
+        kind = "contents" if route.startswith("contents") else re.sub(r"/[0-9a-f]{40}$", "", route)
+        self.calls[f"{method} {kind}"] += 1
+        with self._lock:
+            m = re.fullmatch(r"contents/?(.*)", route)
+            if m:
+                return self._contents(method, m.group(1), body, headers)
+            m = re.fullmatch(r"git/refs?/heads/(.+)", route)
+            if m and m.group(1) == self.branch:
+                if method == "GET":
+                    return 200, self._ref_json(), {}
+                if method == "PATCH":
+                    if body["sha"] not in self.commits:
+                        return 422, {"message": "Object does not exist"}, {}
+                    if not body.get("force") and not self._is_ancestor(self.head, body["sha"]):
+                        return 422, {"message": "Update is not a fast forward"}, {}
+                    self.head = body["sha"]
+                    return 200, self._ref_json(), {}
+            m = re.fullmatch(r"git/(blobs|trees|commits)(?:/([0-9a-f]+))?", route)
+            if m:
+                return self._git(method, m.group(1), m.group(2), body)
+        return 404, {"message": "Not Found"}, {}
+
+    def _contents(self, method, path, body, headers):
+        tree = self.trees[self.commits[self.head]["tree"]]
+        if method == "GET":
+            if path == "":
+                return 200, [self._content_json(p, s) for p, s in sorted(tree.items())], {}
+            if path not in tree:
+                return 404, {"message": "Not Found"}, {}
+            etag = f'"{tree[path]}"'
+            if headers.get("If-None-Match") == etag:
+                return 304, None, {"ETag": etag}
+            return 200, self._content_json(path, tree[path]), {"ETag": etag}
+        if method == "PUT":
+            if path in tree and body.get("sha") is None:
+                return 422, {"message": '"sha" wasn\'t supplied.'}, {}
+            if path in tree and body["sha"] != tree[path]:
+                return 409, {"message": f"{path} does not match {body['sha']}"}, {}
+            new_tree = dict(tree, **{path: self._put_blob(base64.b64decode(body["content"]))})
+        elif method == "DELETE":
+            if path not in tree:
+                return 404, {"message": "Not Found"}, {}
+            if body.get("sha") != tree[path]:
+                return 409, {"message": f"{path} does not match {body.get('sha')}"}, {}
+            new_tree = {p: s for p, s in tree.items() if p != path}
+        else:
+            return 405, {"message": "Method Not Allowed"}, {}
+        self.head = self._put_commit(self._put_tree(new_tree), [self.head], body.get("message", ""))
+        content = self._content_json(path, new_tree[path]) if path in new_tree else None
+        return (201 if method == "PUT" else 200), {"content": content, "commit": self._commit_json(self.head)}, {}
+
+    def _git(self, method, kind, sha, body):
+        if method == "GET":
+            if kind == "blobs" and sha in self.blobs:
+                data = self.blobs[sha]
+                return 200, {"sha": sha, "size": len(data), "encoding": "base64",
+                             "content": base64.b64encode(data).decode(), "url": self._url(f"/git/blobs/{sha}")}, {}
+            if kind == "trees" and sha in self.trees:
+                return 200, {"sha": sha, "url": self._url(f"/git/trees/{sha}"), "truncated": False, "tree": [
+                    {"path": p, "mode": "100644", "type": "blob", "sha": s, "size": len(self.blobs[s]),
+                     "url": self._url(f"/git/blobs/{s}")}
+                    for p, s in sorted(self.trees[sha].items())
+                ]}, {}
+            if kind == "commits" and sha in self.commits:
+                return 200, self._commit_json(sha), {}
+            return 404, {"message": "Not Found"}, {}
+        if method != "POST":
+            return 405, {"message": "Method Not Allowed"}, {}
+        if kind == "blobs":
+            data = base64.b64decode(body["content"]) if body.get("encoding") == "base64" else body["content"].encode()
+            new = self._put_blob(data)
+            return 201, {"sha": new, "url": self._url(f"/git/blobs/{new}")}, {}
+        if kind == "trees":
+            entries = dict(self.trees.get(body.get("base_tree"), {}))
+            for e in body["tree"]:
+                if "content" in e:
+                    entries[e["path"]] = self._put_blob(e["content"].encode())
+                elif e.get("sha") is None:
+                    entries.pop(e["path"], None)
+                elif e["sha"] not in self.blobs:
+                    return 422, {"message": f"Invalid sha {e['sha']}"}, {}
+                else:
+                    entries[e["path"]] = e["sha"]
+            _, payload, _ = self._git("GET", "trees", self._put_tree(entries), None)
+            return 201, payload, {}
+        if body["tree"] not in self.trees or any(p not in self.commits for p in body.get("parents", [])):
+            return 422, {"message": "Invalid tree or parent"}, {}
+        new = self._put_commit(body["tree"], body.get("parents", []), body["message"])
+        return 201, self._commit_json(new), {}
+
+    # --- server ---
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _serve(self):
+                path, _, query = self.path.partition("?")
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else {}
+                status, payload, extra = fake.handle(self.command, path, query, body, self.headers)
+                with fake._lock:
+                    if status != 304:
+                        fake.rate_remaining = max(0, fake.rate_remaining - 1)
+                    extra = dict(extra, **{"x-ratelimit-limit": str(fake.rate_limit),
+                                           "x-ratelimit-remaining": str(fake.rate_remaining),
+                                           "x-ratelimit-reset": str(fake.rate_reset)})
+                data = json.dumps(payload).encode() if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in extra.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_PUT = do_POST = do_PATCH = do_DELETE = _serve
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+        threading.Thread(target=self._server.serve_forever, name="fake-git-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
@@ -0,0 +1,97 @@
+import collections
+import hashlib
+import os
+import threading
+import time
+from github import GithubException, UnknownObjectException
+
+
+# --- FAKE REPOSITORY ---
+# In-memory stand-in for the slice of PyGithub's Repository the app uses.
+# Same SHA rules as the contents API: update_file with a stale SHA answers 409,
+# create_file on an existing path answers 422, missing paths raise 404.
+
+def git_blob_sha(data):
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class FakeContentFile:
+    def __init__(self, repo, path, data):
+        self._repo = repo
+        self.path = path
+        self.name = os.path.basename(path)
+        self.type = "file"
+        self.decoded_content = data
+        self.size = len(data)
+        self.sha = git_blob_sha(data)
+
+    def update(self):
+        # ContentFile.update(): conditional GET, False means "304 Not Modified"
+        data = self._repo._read(self.path, "update")
+        if git_blob_sha(data) == self.sha:
+            return False
+        self.decoded_content = data
+        self.size = len(data)
+        self.sha = git_blob_sha(data)
+        return True
+
+
+class FakeRepo:
+    def __init__(self, files=None, latency=0.0):
+        self.files = {path: (data.encode() if isinstance(data, str) else data) for path, data in (files or {}).items()}
+        self.latency = latency
+        self.calls = collections.Counter()
+        self._lock = threading.Lock()
+
+    def _sleep(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _read(self, path, call):
+        self._sleep()
+        with self._lock:
+            self.calls[call] += 1
+            if path not in self.files:
+                raise UnknownObjectException(404, {"message": "Not Found"}, {})
+            return self.files[path]
+
+    def get_contents(self, path, ref=None):
+        if path == "":
+            self._sleep()
+            with self._lock:
+                self.calls["get_contents"] += 1
+                return [FakeContentFile(self, p, d) for p, d in sorted(self.files.items()) if "/" not in p]
+        return FakeContentFile(self, path, self._read(path, "get_contents"))
+
+    def update_file(self, path, message, content, sha, branch=None):
+        self._sleep()
+        data = content.encode() if isinstance(content, str) else content
+        with self._lock:
+            self.calls["update_file"] += 1
+            if path not in self.files:
+                raise UnknownObjectException(404, {"message": "Not Found"}, {})
+            if git_blob_sha(self.files[path]) != sha:
+                raise GithubException(409, {"message": f"{path} does not match {sha}"}, {})
+            self.files[path] = data
+        return {"content": FakeContentFile(self, path, data), "commit": None}
+
+    def create_file(self, path, message, content, branch=None):
+        self._sleep()
+        data = content.encode() if isinstance(content, str) else content
+        with self._lock:
+            self.calls["create_file"] += 1
+            if path in self.files:
+                raise GithubException(422, {"message": "Invalid request. \"sha\" wasn't supplied."}, {})
+            self.files[path] = data
+        return {"content": FakeContentFile(self, path, data), "commit": None}
+
+    def delete_file(self, path, message, sha, branch=None):
+        self._sleep()
+        with self._lock:
+            self.calls["delete_file"] += 1
+            if path not in self.files:
+                raise UnknownObjectException(404, {"message": "Not Found"}, {})
+            if git_blob_sha(self.files[path]) != sha:
+                raise GithubException(409, {"message": f"{path} does not match {sha}"}, {})
+            del self.files[path]
+        return {"commit": None}
@@ -0,0 +1,155 @@
+import argparse
+import collections
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from benchmarks.fake_repo import FakeRepo
+from glass_core.numbering import ReceiptCounter, generate_receipt_code
+from glass_core.github_storage import GithubStorage
+from glass_core.outbox import Outbox, SyncWorker
+from glass_core.storage import ShardedStorage
+
+
+# --- MULTI-TILL STRESS ---
+# Many threads sell into one FakeRepo at the same time and the merged day must
+# contain every sale exactly once. The "cancel" mode deletes fresh sales while
+# the sync worker is committing them: a deleted sale must never land.
+#
+#   python -m benchmarks.stress_multitill --tills 8 --sales 25 --latency 0.002
+
+FILENAME = "20250822.json"
+
+def make_transaction(code, n):
+    return {
+        "code": code,
+        "datetime": f"2025-08-22T08:{n // 60 % 60:02d}:{n % 60:02d}",
+        "items": [{"item": "Kaca Polos 5MM", "width_cm": 88, "height_cm": 49, "unit_price": 82428, "qty": 1, "price": 83000}],
+        "method": "Cash",
+        "total_qty": 1,
+        "total": 83000,
+    }
+
+def run(mode, tills, sales, latency):
+    repo = FakeRepo(latency=latency)
+    till_ids = [chr(ord("A") + i) for i in range(tills)]
+    shared_counter = ReceiptCounter()
+    retries = collections.Counter()
+    expected = []
+    expected_lock = threading.Lock()
+
+    def till(till_id):
+        # Each till behaves like its own server process: own storage cache and counter
+        storage = GithubStorage(lambda: repo)
+        counter = ReceiptCounter()
+        prefix = till_id
+        if mode == "sharded":
+            storage = ShardedStorage(storage, till_id, till_ids)
+        elif mode == "sessions":
+            # Many sessions inside one server: shared counter, no till prefix
+            counter = shared_counter
+            prefix = ""
+        for n in range(sales):
+            no = counter.next(FILENAME, prefix, lambda: storage.load_day(FILENAME))
+            t = make_transaction(generate_receipt_code("220825", no, prefix), n)
+            with expected_lock:
+                expected.append(t["code"])
+            # Same contract as the outbox worker: a failed sync stays queued and is retried
+            while True:
+                try:
+                    storage.append_transactions(FILENAME, [t])
+                    break
+                except Exception:
+                    retries[till_id] += 1
+                    time.sleep(0.01)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=till, args=(t,)) for t in till_ids]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    reader = GithubStorage(lambda: repo)
+    if mode == "sharded":
+        reader = ShardedStorage(reader, till_ids[0], till_ids)
+    codes = [t["code"] for t in reader.load_day(FILENAME)]
+    duplicates = [c for c, n in collections.Counter(codes).items() if n > 1]
+    lost = sorted(set(expected) - set(codes))
+    return {
+        "mode": mode,
+        "sales": len(expected),
+        "stored": len(codes),
+        "unique_codes": len(set(expected)) == len(expected),
+        "duplicates": duplicates,
+        "lost": lost,
+        "requeued": sum(retries.values()),
+        "calls": dict(repo.calls),
+        "seconds": round(elapsed, 3),
+    }
+
+
+def run_cancel(rounds, latency):
+    # The page's delete (outbox cancel, else storage) racing SyncWorker.drain()
+    repo = FakeRepo(latency=latency)
+    storage = GithubStorage(lambda: repo)
+    rng = random.Random(0)
+    outcomes = collections.Counter()
+    resurrected = []
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = Outbox(os.path.join(tmp, "outbox.jsonl"))
+        worker = SyncWorker(outbox, storage.append_transactions)
+        started = time.perf_counter()
+        for n in range(rounds):
+            t = make_transaction(generate_receipt_code("220825", n + 1, ""), n)
+            outbox.append(FILENAME, t)
+            drain = threading.Thread(target=worker.drain)
+            # Now and then the delete comes before the worker picks the sale up
+            early = rng.random() < 0.25
+            if not early:
+                drain.start()
+                time.sleep(rng.uniform(0, 4 * latency))
+            if outbox.cancel(t["code"]):
+                outcomes["cancelled"] += 1
+            elif storage.delete_transaction(FILENAME, t["code"]):
+                outcomes["deleted"] += 1
+            else:
+                outcomes["not_found"] += 1
+            if early:
+                drain.start()
+            drain.join()
+            if t["code"] in {s["code"] for s in storage.load_day(FILENAME)} or len(outbox):
+                resurrected.append(t["code"])
+        elapsed = time.perf_counter() - started
+    return {
+        "mode": "cancel",
+        "sales": rounds,
+        "outcomes": dict(outcomes),
+        "resurrected": resurrected,
+        "seconds": round(elapsed, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-till stress test against a fake repo")
+    parser.add_argument("--tills", type=int, default=8)
+    parser.add_argument("--sales", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--mode", choices=["shared", "sharded", "sessions", "cancel", "all"], default="all")
+    args = parser.parse_args()
+
+    ok = True
+    for mode in (["shared", "sharded", "sessions", "cancel"] if args.mode == "all" else [args.mode]):
+        if mode == "cancel":
+            result = run_cancel(args.tills * args.sales, args.latency)
+            print(result)
+            ok = ok and not result["resurrected"] and not result["outcomes"].get("not_found")
+            continue
+        result = run(mode, args.tills, args.sales, args.latency)
+        print(result)
+        ok = ok and result["unique_codes"] and not result["duplicates"] and not result["lost"] and result["stored"] == result["sales"]
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,448 @@
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from glass_core.analytics import RollupStore, day_rollup
+from benchmarks.fake_repo import FakeRepo
+from benchmarks.synthetic import DayGenerator, page_constants, parse_range
+from glass_core.dayfile import dumps_day
+from glass_core.helpers import safe_item_fields
+from glass_core.ledger import add_receipts, build_ledger, ledger_receipts, receipt_entry, remove_receipt
+from glass_core.numbering import ReceiptCounter
+from glass_core.records import RecordCache, parse_day
+from glass_core.receipts import ReceiptCache, render_receipt_pdf, render_summary_pdf
+from glass_core.search import SearchIndex
+from glass_core.stock import consume, empty_stock, entry_areas, forecast, receive
+from glass_core.summary import summary_lines
+from glass_core.github_storage import GithubStorage
+from glass_core.telemetry import Telemetry, Traced
+
+# --- BENCHMARK SUITE ---
+# Times the hot paths of the page on synthetic days against the in-memory
+# FakeRepo: what load_transactions/save_transactions do in storage, receipt
+# and summary PDFs, the receipt-number scan of the Bayar handler and the
+# safe_item_fields aggregations against the parsed records. Every case reports the median and best wall
+# time and the tracemalloc peak of one extra run, as JSON.
+#
+#   python -m benchmarks.suite --out bench.json
+#   python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+#   python -m benchmarks.suite --compare benchmarks/baseline.json --threshold 0.25
+
+DAY_SIZES = (10, 100, 1000)
+DAY = datetime.date(2025, 8, 22)
+FILENAME = "20250822.json"
+
+CASES = []
+
+def case(name):
+    # setup(ctx, param) -> zero-argument callable to time
+    def register(setup):
+        CASES.append((name, setup))
+        return setup
+    return register
+
+def fake_storage(files, ctx, **kwargs):
+    repo = FakeRepo({n: dumps_day(t, "json") for n, t in files.items()}, latency=ctx["latency"])
+    return GithubStorage(lambda: repo, **kwargs)
+
+# --- CASES ---
+@case("storage.load_day.cold")
+def _(ctx, n):
+    files = {FILENAME: ctx["day"](n)}
+    def run():
+        fake_storage(files, ctx).load_day(FILENAME)
+    return run
+
+@case("storage.load_day.warm")
+def _(ctx, n):
+    storage = fake_storage({FILENAME: ctx["day"](n)}, ctx)
+    storage.load_day(FILENAME)
+    return lambda: storage.load_day(FILENAME)
+
+@case("storage.save_day.json")
+def _(ctx, n):
+    day = ctx["day"](n)
+    storage = fake_storage({FILENAME: day}, ctx)
+    return lambda: storage.save_day(FILENAME, day)
+
+@case("storage.save_day.jsonl")
+def _(ctx, n):
+    day = ctx["day"](n)
+    storage = fake_storage({FILENAME: day}, ctx, day_format="jsonl", item_names=ctx["item_names"])
+    return lambda: storage.save_day(FILENAME, day)
+
+@case("storage.save_day.jsonl_gz")
+def _(ctx, n):
+    day = ctx["day"](n)
+    storage = fake_storage({FILENAME: day}, ctx, day_format="jsonl.gz", item_names=ctx["item_names"])
+    return lambda: storage.save_day(FILENAME, day)
+
+@case("storage.append_sale")
+def _(ctx, n):
+    storage = fake_storage({FILENAME: ctx["day"](n)}, ctx)
+    sale = ctx["day"](1)[0]
+    counter = iter(range(10 ** 9))
+
+    def run():
+        storage.append_transactions(FILENAME, [dict(sale, code=f"GL220825-X{next(counter)}")])
+    return run
+
+@case("pdf.receipt.render")
+def _(ctx, n):
+    t = ctx["day"](1)[0]
+    return lambda: render_receipt_pdf(t, ctx["shop"])
+
+@case("pdf.receipt.cached")
+def _(ctx, n):
+    t = ctx["day"](1)[0]
+    cache = ReceiptCache()
+    cache.get(t, ctx["shop"])
+    return lambda: cache.get(t, ctx["shop"])
+
+@case("pdf.summary")
+def _(ctx, n):
+    day = parse_day(FILENAME, ctx["day"](n)).transactions
+    return lambda: render_summary_pdf("Ringkasan Sesi Hari Ini", summary_lines(day))
+
+@case("ledger.add_sale")
+def _(ctx, n):
+    # What a synced sale (and its delete) costs the running ledger of a day with n receipts
+    ledger = build_ledger(parse_day(FILENAME, ctx["day"](n)).transactions)
+    sale = parse_day(FILENAME, [dict(ctx["day"](1)[0], code="GL220825-X001")]).transactions[0]
+
+    def run():
+        add_receipts(ledger, [sale])
+        remove_receipt(ledger, sale.code)
+    return run
+
+@case("stock.sale")
+def _(ctx, n):
+    # What a sale and its delete cost the stock balance: the receipt's own items, not the day or the history
+    stock = empty_stock()
+    for name in ctx["item_names"]:
+        receive(stock, name, 100, None, datetime.datetime(2025, 1, 1), None, "restock")
+    areas = entry_areas([receipt_entry(parse_day(FILENAME, ctx["day"](n)).transactions[-1])])
+
+    def run():
+        consume(stock, FILENAME, areas, 1)
+        consume(stock, FILENAME, areas, -1)
+    return run
+
+@case("session_close.receipts")
+def _(ctx, n):
+    # "Selesaikan Sesi" before the ledger: every receipt re-summed
+    day = parse_day(FILENAME, ctx["day"](n)).transactions
+    return lambda: summary_lines(day)
+
+@case("session_close.ledger")
+def _(ctx, n):
+    ledger = build_ledger(parse_day(FILENAME, ctx["day"](n)).transactions)
+    return lambda: summary_lines(list(ledger_receipts(ledger)))
+
+@case("receipt_number.scan")
+def _(ctx, n):
+    # First Bayar of the day in a fresh process: parse every code of the day
+    day = ctx["day"](n)
+    return lambda: ReceiptCounter().next(FILENAME, "", lambda: day)
+
+@case("receipt_number.next")
+def _(ctx, n):
+    day = ctx["day"](n)
+    counter = ReceiptCounter()
+    counter.next(FILENAME, "", lambda: day)
+    return lambda: counter.next(FILENAME, "", lambda: day)
+
+@case("aggregate.safe_item_fields")
+def _(ctx, n):
+    day = ctx["day"](n)
+
+    def run():
+        totals = {}
+        for t in day:
+            for it in t.get("items", []):
+                name, w, h, qty, unit_price, subtotal, area_m2 = safe_item_fields(it)
+                acc = totals.setdefault(name, [0, 0, 0.0])
+                acc[0] += subtotal
+                acc[1] += qty
+                acc[2] += area_m2 * qty
+        return totals
+    return run
+
+@case("aggregate.records")
+def _(ctx, n):
+    # The same totals from records parsed once
+    day = parse_day(FILENAME, ctx["day"](n))
+
+    def run():
+        totals = {}
+        for t in day.transactions:
+            for it in t.items:
+                acc = totals.setdefault(it.name, [0, 0, 0.0])
+                acc[0] += it.subtotal
+                acc[1] += it.qty
+                acc[2] += it.area_m2 * it.qty
+        return totals
+    return run
+
+@case("records.parse_day")
+def _(ctx, n):
+    # A day file that changed: validate and normalize every receipt
+    day = ctx["day"](n)
+    return lambda: parse_day(FILENAME, day)
+
+@case("records.cached")
+def _(ctx, n):
+    # A rerun on an unchanged day: one lookup by file version
+    day = ctx["day"](n)
+    cache = RecordCache()
+    cache.day(FILENAME, day, "v1")
+    return lambda: cache.day(FILENAME, day, "v1")
+
+@case("aggregate.day_rollup")
+def _(ctx, n):
+    day = parse_day(FILENAME, ctx["day"](n)).transactions
+    return lambda: day_rollup(day, ctx["item_names"])
+
+@case("history.rollups.refresh_cold")
+def _(ctx, n):
+    files = ctx["history"]()
+    def run():
+        RollupStore(fake_storage(files, ctx), ctx["item_names"]).refresh()
+    return run
+
+@case("history.rollups.refresh_after_sale")
+def _(ctx, n):
+    # The owner-mode rerun after a sale: one day recomputed, its month rewritten
+    files = ctx["history"]()
+    last = max(files)
+    storage = fake_storage(files, ctx)
+    store = RollupStore(storage, ctx["item_names"])
+    store.refresh()
+    sale = files[last][0]
+    counter = iter(range(10 ** 9))
+
+    def run():
+        storage.append_transactions(last, [dict(sale, code=f"GL-X{next(counter)}")])
+        store.refresh()
+    return run
+
+@case("history.rollups.period_year")
+def _(ctx, n):
+    store = RollupStore(fake_storage(ctx["history"](), ctx), ctx["item_names"])
+    store.refresh()
+    first = ctx["history_start"]
+    return lambda: store.period(first, first + datetime.timedelta(days=364))
+
+@case("history.stock.forecast")
+def _(ctx, n):
+    # Consumption rates of every glass type from the stacked rollups, and days until stock-out
+    store = RollupStore(fake_storage(ctx["history"](), ctx), ctx["item_names"])
+    store.refresh()
+    today = ctx["history_start"] + datetime.timedelta(days=365 * ctx["years"])
+    stock = empty_stock()
+    for name in ctx["item_names"]:
+        receive(stock, name, 20, None, datetime.datetime(2023, 1, 1), None, "restock")
+    return lambda: forecast(stock, store.consumption(today, 56, 14), ctx["item_names"], today)
+
+@case("history.load_range_month")
+def _(ctx, n):
+    storage = fake_storage(ctx["history"](), ctx)
+    first = ctx["history_start"]
+    lo, hi = first.strftime("%Y%m%d"), (first + datetime.timedelta(days=30)).strftime("%Y%m%d")
+    return lambda: storage.load_range(lo, hi)
+
+@case("history.search.refresh_cold")
+def _(ctx, n):
+    files = ctx["history"]()
+    return lambda: SearchIndex(fake_storage(files, ctx)).refresh()
+
+@case("history.search.reload")
+def _(ctx, n):
+    # Restart with the persisted index: no day file is re-read
+    storage = fake_storage(ctx["history"](), ctx)
+    SearchIndex(storage).refresh()
+    return lambda: SearchIndex(storage).refresh()
+
+SEARCH_QUERIES = ("GL150323-0", "reben 60x40 ~2", "100000-150000 Transfer", "cermin", "Cash")
+
+@case("history.search.query")
+def _(ctx, n):
+    # All SEARCH_QUERIES once per run
+    index = SearchIndex(fake_storage(ctx["history"](), ctx))
+    index.refresh()
+
+    def run():
+        for q in SEARCH_QUERIES:
+            index.query(q)
+    return run
+
+@case("telemetry.span_enabled")
+def _(ctx, n):
+    telemetry = Telemetry()
+
+    def run():
+        for _ in range(1000):
+            with telemetry.span("bench"):
+                pass
+    return run
+
+@case("telemetry.span_disabled")
+def _(ctx, n):
+    telemetry = Telemetry(enabled=False)
+
+    def run():
+        for _ in range(1000):
+            with telemetry.span("bench"):
+                pass
+    return run
+
+@case("telemetry.traced_load_day_warm")
+def _(ctx, n):
+    # Same as storage.load_day.warm[100] with every repo call going through the proxy
+    repo = FakeRepo({FILENAME: dumps_day(ctx["day"](100), "json")}, latency=ctx["latency"])
+    traced = Traced(repo, Telemetry())
+    storage = GithubStorage(lambda: traced)
+    storage.load_day(FILENAME)
+    return lambda: storage.load_day(FILENAME)
+
+# Per-day cases run at every DAY_SIZES; the others once
+ONCE = ("history.", "telemetry.")
+
+
+# --- RUNNER ---
+def measure(fn, min_time, min_runs):
+    fn()  # warm-up
+    times = []
+    started = time.perf_counter()
+    while len(times) < min_runs or time.perf_counter() - started < min_time:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+        if len(times) >= 10000:
+            break
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return {
+        "median_ms": round(statistics.median(times) * 1000, 4),
+        "min_ms": round(min(times) * 1000, 4),
+        "runs": len(times),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+def run_suite(args):
+    consts = page_constants()
+    gen_cache = {}
+
+    def day(n):
+        if n not in gen_cache:
+            gen_cache[n] = DayGenerator(args.seed).day(DAY, n)
+        return gen_cache[n]
+
+    history = {}
+
+    def get_history():
+        if not history:
+            history.update(DayGenerator(args.seed).days(start, args.years * 365, parse_range(args.history_receipts)))
+        return history
+
+    start = datetime.date(2023, 1, 1)
+    ctx = {
+        "day": day,
+        "history": get_history,
+        "history_start": start,
+        "years": args.years,
+        "item_names": [item["name"] for item in consts["ITEMS"]],
+        "shop": consts["SHOP_NAME"],
+        "latency": args.latency,
+    }
+    results = {}
+    for name, setup in CASES:
+        if args.filter and not any(f in name for f in args.filter):
+            continue
+        params = [None] if name.startswith(ONCE) else args.sizes
+        for n in params:
+            key = name if n is None else f"{name}[{n}]"
+            results[key] = measure(setup(ctx, n), args.min_time, args.min_runs)
+            print(json.dumps({key: results[key]}), file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "sizes": args.sizes,
+            "years": args.years,
+            "history_receipts": args.history_receipts,
+            "latency": args.latency,
+        },
+        "results": results,
+    }
+
+def compare(current, baseline, threshold, floor_ms):
+    """Rows of (case, baseline ms, current ms, ratio, verdict); verdict "slower" fails the run."""
+    rows = []
+    for key, now in current["results"].items():
+        old = baseline.get("results", {}).get(key)
+        if old is None:
+            rows.append((key, None, now["median_ms"], None, "new"))
+            continue
+        ratio = now["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+        delta = now["median_ms"] - old["median_ms"]
+        if ratio > 1 + threshold and delta > floor_ms:
+            verdict = "slower"
+        elif ratio < 1 - threshold and -delta > floor_ms:
+            verdict = "faster"
+        else:
+            verdict = "same"
+        rows.append((key, old["median_ms"], now["median_ms"], round(ratio, 3), verdict))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark suite on synthetic day files")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DAY_SIZES), help="receipts per day")
+    parser.add_argument("--years", type=int, default=1, help="history length for the history.* cases")
+    parser.add_argument("--history-receipts", default="10-100", help="receipts per history day, N or LO-HI")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated GitHub latency per call (s)")
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds spent timing each case")
+    parser.add_argument("--min-runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--filter", nargs="*", help="only cases whose name contains one of these")
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative change that counts")
+    parser.add_argument("--floor-ms", type=float, default=0.05, help="ignore changes smaller than this")
+    args = parser.parse_args()
+
+    report = run_suite(args)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    elif not args.compare:
+        print(text)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold, args.floor_ms)
+        print(json.dumps({"comparison": [
+            {"case": k, "baseline_ms": b, "current_ms": c, "ratio": r, "verdict": v} for k, b, c, r, v in rows
+        ]}, indent=2))
+        slower = [k for k, _, _, _, v in rows if v == "slower"]
+        if slower:
+            print(f"Slower than baseline: {', '.join(slower)}", file=sys.stderr)
+            sys.exit(1)
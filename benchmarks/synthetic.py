@@ -0,0 +1,118 @@
+import argparse
+import datetime
+import glob
+import json
+import os
+import random
+from glass_core import config
+from glass_core.numbering import generate_receipt_code
+from glass_core.pricing import line_price, unit_price
+
+# --- SYNTHETIC DAY FILES ---
+# Day files shaped like the real ones in the repo root: item names and prices
+# from ITEMS/SERVICE_FEE in glass_core.config, piece sizes drawn around the
+# sizes actually sold, the same basket and quantity mix, opening-hours
+# timestamps and the same fields computed the way the Bayar handler does.
+#
+#   python -m benchmarks.synthetic --days 30 --receipts 10-1000 --out /tmp/days
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def page_constants(names=("ITEMS", "SERVICE_FEE", "SHOP_NAME")):
+    return {name: getattr(config, name) for name in names}
+
+def real_profile():
+    # Sizes, quantities and basket sizes seen in the real day files
+    sizes, qtys, baskets = [], [], []
+    for path in sorted(glob.glob(os.path.join(ROOT, "[0-9]" * 8 + ".json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            for t in json.load(f):
+                baskets.append(len(t.get("items", [])))
+                for it in t.get("items", []):
+                    w, h = float(it.get("width_cm", 0)), float(it.get("height_cm", 0))
+                    if w >= 1 and h >= 1:
+                        sizes.append((w, h))
+                    qtys.append(int(it.get("qty", 1)))
+    return {"sizes": sizes or [(60.0, 40.0)], "qtys": qtys or [1], "baskets": baskets or [1]}
+
+
+class DayGenerator:
+    def __init__(self, seed=0, items=None, service_fee=None, methods=(("Cash", 0.7), ("Transfer", 0.3))):
+        consts = page_constants()
+        self.items = items or consts["ITEMS"]
+        self.service_fee = consts["SERVICE_FEE"] if service_fee is None else service_fee
+        self.methods = methods
+        self.profile = real_profile()
+        self.rng = random.Random(seed)
+        # Popular types first, like the real mix (reben and cermin dominate)
+        self.weights = [1.0 / (i + 1) for i in range(len(self.items))]
+
+    def _size(self):
+        w, h = self.rng.choice(self.profile["sizes"])
+        # Jitter around a real size, keeping half-centimetre precision
+        w = max(1.0, round(w * self.rng.uniform(0.8, 1.2) * 2) / 2)
+        h = max(1.0, round(h * self.rng.uniform(0.8, 1.2) * 2) / 2)
+        return w, h
+
+    def item(self):
+        spec = self.rng.choices(self.items, self.weights)[0]
+        w, h = self._size()
+        qty = self.rng.choice(self.profile["qtys"])
+        unit = unit_price(spec["base_price"], w, h, self.service_fee)
+        return {
+            "item": spec["name"],
+            "width_cm": w,
+            "height_cm": h,
+            "area_m2": (w / 100) * (h / 100),
+            "unit_price": unit,
+            "qty": qty,
+            "price": line_price(unit, qty),
+        }
+
+    def day(self, date, receipts):
+        date_str = date.strftime("%d%m%y")
+        opening = datetime.datetime.combine(date, datetime.time(7, 0))
+        seconds = sorted(self.rng.uniform(0, 11 * 3600) for _ in range(receipts))
+        transactions = []
+        for n, offset in enumerate(seconds, 1):
+            items = [self.item() for _ in range(self.rng.choice(self.profile["baskets"]))]
+            transactions.append({
+                "code": generate_receipt_code(date_str, n),
+                "datetime": (opening + datetime.timedelta(seconds=offset)).isoformat(),
+                "items": items,
+                "method": self.rng.choices([m for m, _ in self.methods], [w for _, w in self.methods])[0],
+                "total_qty": sum(it["qty"] for it in items),
+                "total": sum(it["price"] for it in items),
+            })
+        return transactions
+
+    def days(self, first, count, receipts=(10, 1000)):
+        """{YYYYMMDD.json: transactions} for `count` consecutive days from `first`."""
+        lo, hi = receipts
+        out = {}
+        for d in range(count):
+            date = first + datetime.timedelta(days=d)
+            out[f"{date.strftime('%Y%m%d')}.json"] = self.day(date, self.rng.randint(lo, hi))
+        return out
+
+def parse_range(text):
+    lo, _, hi = text.partition("-")
+    return int(lo), int(hi or lo)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic day files shaped like the real ones")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--receipts", default="10-1000", help="receipts per day, N or LO-HI")
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    gen = DayGenerator(args.seed)
+    days = gen.days(datetime.date.fromisoformat(args.start), args.days, parse_range(args.receipts))
+    for name, transactions in days.items():
+        with open(os.path.join(args.out, name), "w", encoding="utf-8") as f:
+            json.dump(transactions, f, indent=2)
+    print(f"Wrote {len(days)} day files, {sum(len(t) for t in days.values())} receipts to {args.out}")
@@ -1,11 +1,34 @@
 import streamlit as st
+import contextlib
 import datetime
-import json
 import math
+import os
+import tempfile
+import time
+from glass_core.analytics import RollupStore, period_bounds
+from glass_core.backend import open_storage, repo_override, till_id, unwrap
+from glass_core.config import FORECAST_HALF_LIFE_DAYS, FORECAST_WINDOW_DAYS, GITHUB_REPO, ITEMS, LOW_STOCK_SHEETS, PAYMENT_METHODS, SHOP_NAME, TIMEZONE, day_filename, item_names, now
+from glass_core.cutting import DEFAULT_KERF, DEFAULT_SHEET, optimize_by_type, sheet_svg
+from glass_core.escpos import PrintQueue, render_escpos, sink_from_url
+from glass_core.export import EXPORT_FORMATS, MIME_TYPES, export_filename, export_range
+from glass_core.helpers import rupiah
+from glass_core.ledger import LedgerStorage, add_receipts, build_ledger, ledger_receipts
+from glass_core.manifest import ManifestStorage
+from glass_core.numbering import ReceiptCounter, generate_receipt_code
+from glass_core.outbox import Outbox, SyncWorker
+from glass_core.pricing import add_to_cart, base_price, cart_line, make_transaction, merge_lines, unit_price
+from glass_core.quote import parse_cut_list, quote_lines
+from glass_core.records import Item, RecordCache, Transaction, parse_day
+from glass_core.receipts import ReceiptCache, render_receipts_pdf, render_summary_pdf
+from glass_core.search import SearchIndex
+from glass_core.stock import forecast, load_stock, restock, stock_levels
+from glass_core.storage import ShardedStorage, SqliteStorage
+from glass_core.summary import summary_lines, summary_sections
+from glass_core.telemetry import Telemetry, Traced
 from github import Github
 from io import BytesIO
-from reportlab.pdfgen import canvas
-from zoneinfo import ZoneInfo
+
+RERUN_STARTED = time.perf_counter()
 
 # --- GITHUB TOKEN (Safe Fetch) ---
 def get_github_token():
@@ -16,220 +39,200 @@ def get_github_token():
     return token
 
 # --- CONFIGURATION ---
-GITHUB_REPO = "Saichizu/glass-cashier"
-SHOP_NAME = "Glass Cashier App"  # shown at top of receipt
-
-# --- ITEMS ---
-ITEMS = [
-    {"name": "Kaca Polos 5MM", "base_price": 190000},
-    {"name": "Kaca Reben 5MM", "base_price": 200000},
-    {"name": "Kaca Reben 3MM", "base_price": 160000},
-    {"name": "Kaca Polos 3MM", "base_price": 150000},
-    {"name": "Kaca Cermin", "base_price": 240000},
-    {"name": "Kaca Polos Utuh", "base_price": 140000},
-    {"name": "Kaca Reben Utuh", "base_price": 150000},
-]
-
-SERVICE_FEE = 500
+# Shop name, glass types, prices and storage defaults live in glass_core.config
 OWNER_PASSCODE = "901012"
 
-# --- HELPERS ---
-def rupiah(n):
-    try:
-        return f"Rp {int(n):,}".replace(",", ".")
-    except Exception:
-        return f"Rp {n}"
-
-def mm_to_pt(mm):
-    return mm * 72.0 / 25.4
+# --- STOCK SHEETS (cm) for the cutting plan ---
+STOCK_SHEETS = {item["name"]: DEFAULT_SHEET for item in ITEMS}
+CUT_KERF = DEFAULT_KERF
+OUTBOX_PATH = st.secrets.get("OUTBOX_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "outbox.jsonl"))
+COUNTER_PATH = st.secrets.get("COUNTER_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "receipt_counter.json"))
+TELEMETRY_CAPACITY = 2000  # spans kept for the diagnostics panel
 
-def safe_item_fields(item):
-    name = item.get("item") or item.get("name") or "Item"
-    w = item.get("width_cm", 0)
-    h = item.get("height_cm", 0)
-    qty = int(item.get("qty", 1))
-    unit_price = int(item.get("unit_price", 0))
-    subtotal = int(item.get("price", unit_price * qty))
-    area_m2 = float(item.get("area_m2", (w/100.0)*(h/100.0) if (w and h) else 0))
-    return name, w, h, qty, unit_price, subtotal, area_m2
+# --- TELEMETRY ---
+@st.cache_resource
+def get_telemetry():
+    # TELEMETRY = false in secrets turns the spans off; the owner can also toggle them
+    enabled = str(st.secrets.get("TELEMETRY", "true")).strip().lower() not in ("0", "false", "off", "no")
+    return Telemetry(TELEMETRY_CAPACITY, enabled)
 
 # --- GITHUB UTILS ---
+@st.cache_resource
 def get_github_client():
     token = get_github_token()
     if not token:
         raise RuntimeError("GitHub token is missing or invalid.")
     return Github(token)
 
+@st.cache_resource
+def get_github_repo():
+    telemetry = get_telemetry()
+    with telemetry.span("github.get_repo"):
+        # A fake repo set by a harness (benchmarks/bench_rerun.py) needs no token
+        repo = repo_override() or get_github_client().get_repo(GITHUB_REPO)
+    return Traced(repo, telemetry)
+
+# --- STORAGE ---
+def get_till_id():
+    # Set TILL_ID (e.g. "A") on each tablet that runs its own server, plus TILLS = ["A", "B"]
+    return till_id(st.secrets)
+
+@st.cache_resource
+def get_storage():
+    # Backend, day format, batching and till sharding all come from secrets, see glass_core.backend
+    return open_storage(st.secrets, get_github_repo)
+
+@st.cache_resource
+def get_rollups():
+    return RollupStore(get_storage(), item_names())
+
+@st.cache_resource
+def get_search_index():
+    # Indexes stored files, so it sits below the till sharding; the listener keeps it current
+    base = unwrap(get_storage(), LedgerStorage, ShardedStorage)
+    index = SearchIndex(base)
+    base.add_write_listener(index.record)
+    return index
+
+@st.cache_resource
+def get_receipt_counter():
+    return ReceiptCounter(COUNTER_PATH)
+
 def get_today_filename():
-    today = datetime.datetime.now(ZoneInfo("Asia/Shanghai")).strftime("%Y%m%d")
-    return f"{today}.json"
+    return day_filename(now().date())
 
 def load_transactions(filename):
     try:
-        g = get_github_client()
-        repo = g.get_repo(GITHUB_REPO)
-        file_content = repo.get_contents(filename).decoded_content.decode()
-        return json.loads(file_content)
+        return get_storage().load_day(filename)
     except Exception:
         return []
 
 def save_transactions(filename, data):
     try:
-        g = get_github_client()
-        repo = g.get_repo(GITHUB_REPO)
-        try:
-            file = repo.get_contents(filename)
-            repo.update_file(filename, "Update transactions", json.dumps(data, indent=2), file.sha)
-        except Exception:
-            repo.create_file(filename, "Create transactions", json.dumps(data, indent=2))
+        get_storage().save_day(filename, data)
     except Exception as e:
         st.error(f"Gagal menyimpan transaksi: {e}")
 
-def delete_transaction(filename, code_to_delete):
+def sync_transactions(filename, pending):
+    # Called from the outbox worker thread: raise instead of st.error so the worker retries
+    get_storage().append_transactions(filename, pending)
+
+@st.cache_resource
+def get_outbox():
+    return Outbox(OUTBOX_PATH)
+
+@st.cache_resource
+def get_sync_worker():
+    worker = SyncWorker(get_outbox(), sync_transactions)
+    worker.start()
+    return worker
+
+def load_day(filename, strict=False):
+    # Synced transactions from storage plus sales still waiting in the local outbox.
+    # Snapshot the outbox first so a sale synced in between is still seen once.
+    # strict=True lets storage errors through instead of showing an empty day.
+    pending = get_outbox().pending(filename)
+    transactions = get_storage().load_day(filename) if strict else load_transactions(filename)
+    known = {t.get("code") for t in transactions}
+    transactions += [t for t in pending if t.get("code") not in known]
+    return transactions
+
+def receipt_seed(filename):
+    # What the receipt counter seeds from. Without storage the outbox's unsynced
+    # sales stand in for the day: the counter's own file has every number this
+    # till handed out today, so none is reused.
     try:
-        g = get_github_client()
-        repo = g.get_repo(GITHUB_REPO)
-        file = repo.get_contents(filename)
-        transactions = json.loads(file.decoded_content.decode())
-        new_transactions = [t for t in transactions if t.get("code") != code_to_delete]
-        repo.update_file(
-            path=filename,
-            message=f"Delete transaction {code_to_delete}",
-            content=json.dumps(new_transactions, indent=2),
-            sha=file.sha
-        )
-        return True
+        return load_day(filename, strict=True)
+    except Exception:
+        return get_outbox().pending(filename)
+
+@st.cache_resource
+def get_record_cache():
+    return RecordCache()
+
+def load_records(filename):
+    # Like load_day, parsed into records; a day is parsed again only after its file changed
+    pending = get_outbox().pending(filename)
+    try:
+        day = get_record_cache().load(get_storage(), filename)
+    except Exception:
+        day = parse_day(filename, [])
+    return day.merged(parse_day(filename, pending))
+
+def load_ledger(filename):
+    # Running day totals from storage plus sales still waiting in the local outbox
+    pending = get_outbox().pending(filename)
+    try:
+        ledger = get_storage().ledger(filename)
     except Exception as e:
-        st.error(f"Gagal menghapus transaksi: {e}")
-        return False
+        st.warning(f"Gagal membaca ringkasan hari ini: {e}")
+        ledger = build_ledger([])
+    add_receipts(ledger, parse_day(filename, pending).transactions)
+    return ledger
 
-def generate_receipt_code(date_str, count):
-    return f"GL{date_str}-{count:03d}"
+def low_stock():
+    # Stocked glass types at or below their alert level, from the running stock balance
+    try:
+        return [row for row in stock_levels(load_stock(get_storage())) if row["low"]]
+    except Exception:
+        return []
+
+def delete_transaction(filename, code_to_delete):
+    if get_outbox().cancel(code_to_delete):
+        # Never reached storage, dropping it from the outbox is enough. A sale the
+        # sync worker is committing is waited for, then deleted from storage below
+        return True
+    return get_storage().delete_transaction(filename, code_to_delete)
 
-def list_session_files():
+def search_receipts(query):
+    index = get_search_index()
     try:
-        g = get_github_client()
-        repo = g.get_repo(GITHUB_REPO)
-        files = repo.get_contents("")
-        session_files = [f.name for f in files if f.name.endswith(".json") and f.name[:8].isdigit()]
-        session_files.sort(reverse=True)
-        return session_files
+        index.refresh()
+    except Exception as e:
+        st.error(f"Gagal memperbarui indeks pencarian: {e}")
+    hits, total = index.query(query)
+    # Summary rows for the table, the hit itself kept as raw for resolve_search_hit
+    rows = [Transaction(h["code"], h["datetime"], h["method"], (), h["total_qty"], h["total"], raw=h) for h in hits]
+    return rows, total
+
+def resolve_search_hit(row):
+    # Full transaction of a search hit, from its day (None once deleted)
+    return load_records(row.raw["day"]).find(row.code)
+
+def day_index():
+    # {day filename: count/qty/total/methods}, newest first, without opening the day files
+    try:
+        return get_storage().day_index()
     except Exception as e:
         st.error(f"Gagal mengambil daftar sesi: {e}")
-        return []
+        return {}
+
+# --- PDF ---
+@st.cache_resource
+def get_receipt_cache():
+    return ReceiptCache()
 
 def create_receipt_pdf(transaction):
-    margin_left = 20
-    margin_right = 20
-    margin_top = 16
-    margin_bottom = 16
-
-    width_pt = mm_to_pt(76)
-    line_h = 12
-    header_lines = 6
-    footer_lines = 6
-    item_lines_per = 2
-    items_count = len(transaction.get("items", []))
-    est_lines = header_lines + footer_lines + (items_count * item_lines_per)
-    height_pt = est_lines * line_h + margin_top + margin_bottom
-
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=(width_pt, height_pt))
-    y = height_pt - margin_top
-
-    c.setFont("Helvetica-Bold", 10)
-    c.drawCentredString(width_pt/2, y, SHOP_NAME)
-    y -= line_h
-
-    c.setFont("Helvetica", 8)
-    code = transaction.get("code", "GL-XXXXXX")
-    c.drawString(margin_left, y, f"Kode: {code}")
-    y -= line_h
-
-    tstr = transaction.get("datetime", "")[:16]
-    if not tstr:
-        tstr = datetime.datetime.now(ZoneInfo("Asia/Shanghai")).strftime("%d-%m-%Y %H:%M")
-    else:
-        try:
-            dt = datetime.datetime.fromisoformat(transaction["datetime"])
-            tstr = dt.strftime("%d-%m-%Y %H:%M")
-        except Exception:
-            pass
-    c.drawString(margin_left, y, f"Tanggal: {tstr}")
-    y -= line_h
-
-    c.line(margin_left, y, width_pt - margin_right, y)
-    y -= line_h
-
-    c.setFont("Helvetica", 8)
-    for it in transaction.get("items", []):
-        name, w, h, qty, unit_price, subtotal, area_m2 = safe_item_fields(it)
-        c.drawString(margin_left, y, f"{name}  {round(w,2):g}x{round(h,2):g} cm")
-        c.drawRightString(width_pt - margin_right, y, rupiah(subtotal))
-        y -= line_h
-
-        c.drawString(margin_left, y, f"{qty} × {rupiah(unit_price)} = {rupiah(unit_price * qty)}")
-        y -= line_h
-
-    c.line(margin_left, y, width_pt - margin_right, y)
-    y -= line_h
-
-    total_qty = int(transaction.get("total_qty", sum(safe_item_fields(i)[3] for i in transaction.get("items", []))))
-    total_sum = int(transaction.get("total", sum(safe_item_fields(i)[5] for i in transaction.get("items", []))))
-    method = transaction.get("method", "-")
-
-    c.drawString(margin_left, y, "Total Qty:")
-    c.drawRightString(width_pt - margin_right, y, str(total_qty))
-    y -= line_h
-
-    c.drawString(margin_left, y, "Total:")
-    c.drawRightString(width_pt - margin_right, y, rupiah(total_sum))
-    y -= line_h
-
-    c.drawString(margin_left, y, "Metode:")
-    c.drawRightString(width_pt - margin_right, y, method)
-    y -= line_h
-
-    c.showPage()
-    c.save()
-    buffer.seek(0)
-    return buffer
+    # Reprints and reruns reuse the rendered bytes of identical transactions
+    with get_telemetry().span("pdf.receipt"):
+        return BytesIO(get_receipt_cache().get(transaction, SHOP_NAME))
 
 def create_summary_pdf(title, lines):
-    margin_left = 20
-    margin_right = 20
-    margin_top = 16
-    margin_bottom = 16
-
-    width_pt = mm_to_pt(76)
-    line_h = 12
-    header_lines = 2
-    footer_lines = 1
-    est_lines = header_lines + footer_lines + len(lines)
-    height_pt = est_lines * line_h + margin_top + margin_bottom
-
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=(width_pt, height_pt))
-    y = height_pt - margin_top
-
-    c.setFont("Helvetica-Bold", 10)
-    c.drawCentredString(width_pt/2, y, title)
-    y -= line_h * 2
-    c.setFont("Helvetica", 8)
-    for line in lines:
-        c.drawString(margin_left, y, line)
-        y -= line_h
-        if y < (margin_left + 3*line_h):
-            c.showPage()
-            height_pt = 40*line_h + margin_top + margin_bottom
-            c.setPageSize((width_pt, height_pt))
-            y = height_pt - margin_top
-            c.setFont("Helvetica", 8)
-
-    c.showPage()
-    c.save()
-    buffer.seek(0)
-    return buffer
+    with get_telemetry().span("pdf.summary"):
+        return render_summary_pdf(title, lines)
+
+# --- THERMAL PRINTER ---
+@st.cache_resource
+def get_print_queue():
+    # PRINTER_URL in secrets: "tcp://192.168.1.50:9100", "/dev/usb/lp0" or a file path
+    url = str(st.secrets.get("PRINTER_URL", "")).strip()
+    return PrintQueue(sink_from_url(url)) if url else None
+
+def print_receipt(transaction):
+    queue = get_print_queue()
+    if queue is None:
+        return None
+    return queue.submit(render_escpos(transaction, SHOP_NAME))
 
 # --- SESSION STATE ---
 if "keranjang" not in st.session_state:
@@ -248,6 +251,14 @@ if "reprint_passcode" not in st.session_state:
     st.session_state["reprint_passcode"] = ""
 if "just_paid" not in st.session_state:
     st.session_state["just_paid"] = False
+if "paid_notice" not in st.session_state:
+    st.session_state["paid_notice"] = None
+if "pay_error" not in st.session_state:
+    st.session_state["pay_error"] = None
+if "region_data" not in st.session_state:
+    st.session_state["region_data"] = {}
+if "region_ms" not in st.session_state:
+    st.session_state["region_ms"] = {}
 
 # --- SAFE RESET for widget values ---
 def safe_reset():
@@ -261,11 +272,200 @@ def safe_reset():
 
 safe_reset()
 
+# --- PAGE REGIONS ---
+# The cart, today's list, the session summary and the history are fragments
+# keyed by region name: a widget inside one reruns only that function. What a
+# region read from storage stays in session state until invalidate() drops it
+# (a sale, a delete, a repair, 🔄 Refresh) or it is REGION_TTL old, so a region
+# redrawn for its own widgets, or a full rerun for an unrelated one, does not
+# go back to GitHub. Other tills' sales show up within REGION_TTL.
+# A sale or a delete runs in its button's callback and redraw()s only the
+# regions that show it, not the whole app.
+REGION_TTL = 30  # seconds
+
+def region_data(region, key, load):
+    cached = st.session_state["region_data"].setdefault(region, {}).get(key)
+    if cached is None or time.monotonic() - cached[0] > REGION_TTL:
+        cached = (time.monotonic(), load())
+        st.session_state["region_data"][region][key] = cached
+    return cached[1]
+
+def invalidate(*regions, keys=None):
+    # Data shown by these regions changed: drop what they read, or only these keys of it
+    for name in regions:
+        if keys is None:
+            st.session_state["region_data"].pop(name, None)
+        else:
+            for key in keys:
+                st.session_state["region_data"].get(name, {}).pop(key, None)
+
+def redraw(*regions):
+    # From a widget callback: rerun only these regions' fragments instead of the app
+    st.rerun(list(regions))
+
+@contextlib.contextmanager
+def region(name):
+    # Own run time of a region, i.e. what a fragment rerun of it costs (diagnostics, bench_rerun)
+    started = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - started
+    st.session_state["region_ms"][name] = round(seconds * 1000, 1)
+    get_telemetry().record(f"region.{name}", seconds)
+
+# --- TRANSACTION LIST (shared by today's list and Riwayat) ---
+PAGE_SIZES = [10, 25, 50]
+
+def render_transaction_list(transactions, key, filename, allow_delete=False, sync_status=None, resolve=None):
+    # One compact table per page; item detail and owner actions only for the selected row,
+    # so the widget count is bounded by the page size instead of the day size.
+    # resolve(row) -> full transaction, for rows that are only summaries (search hits).
+    notice = st.session_state.pop(f"{key}_notice", None)
+    if notice:
+        kind, text = notice
+        (st.success if kind == "success" else st.error)(text)
+    if not transactions:
+        return
+
+    col_size, col_page = st.columns(2)
+    page_size = col_size.selectbox("Nota per halaman", PAGE_SIZES, key=f"{key}_page_size")
+    pages = max(1, math.ceil(len(transactions) / page_size))
+    page = col_page.number_input(f"Halaman (dari {pages})", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page")
+    page_rows = transactions[(page - 1) * page_size:page * page_size]
+
+    rows = []
+    for t in page_rows:
+        row = {"Kode": t.code}
+        if resolve is not None:
+            row["Tanggal"] = t.date_text
+        row.update({"Jam": t.time_text, "Total": t.total_text, "Pcs": t.total_qty, "Metode": t.method})
+        if sync_status:
+            row["Status"] = "⏳" if sync_status(t.code) == "pending" else "✅"
+        rows.append(row)
+    event = st.dataframe(
+        rows,
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"{key}_table_{page}_{page_size}",
+    )
+    selected = event.selection.rows
+    if not selected or selected[0] >= len(page_rows):
+        st.caption("Pilih satu nota untuk melihat detail.")
+        return
+
+    t = page_rows[selected[0]]
+    if resolve is not None:
+        t = resolve(t)
+        if t is None:
+            st.warning("Nota tidak ditemukan, mungkin sudah dihapus.")
+            return
+    code = t.code
+    st.markdown(f"**Detail {code}**")
+    col1, col2, col3, col4, col5 = st.columns([3, 2, 1, 2, 3])
+    with col1: st.markdown("**Item**")
+    with col2: st.markdown("**Ukuran (cm)**")
+    with col3: st.markdown("**Qty**")
+    with col4: st.markdown("**Harga Satuan**")
+    with col5: st.markdown("**Subtotal**")
+    for item in t.items:
+        col1, col2, col3, col4, col5 = st.columns([3, 2, 1, 2, 3])
+        with col1: st.write(item.name)
+        with col2: st.write(item.size_text)
+        with col3: st.write(f"{item.qty}")
+        with col4: st.write(item.unit_price_text)
+        with col5: st.write(item.subtotal_text)
+
+    if not st.session_state["owner_mode"]:
+        passcode = st.text_input(f"Masukkan Kode Owner untuk Aksi [{code}]", type="password", key=f"{key}_passcode")
+        if not passcode:
+            return
+        if passcode != OWNER_PASSCODE:
+            st.error("Kode salah. Tidak bisa melakukan aksi owner.")
+            return
+
+    col_reprint, col_delete = st.columns(2)
+    with col_reprint:
+        if st.button(f"Reprint Struk [{code}]", key=f"{key}_reprint"):
+            pdf = create_receipt_pdf(t.raw)
+            st.download_button(
+                label=f"⬇️ Download Reprint PDF [{code}]",
+                data=pdf,
+                file_name=f"reprint_{code}.pdf",
+                mime="application/pdf"
+            )
+        if get_print_queue() is not None and st.button(f"🖨️ Cetak ke Printer [{code}]", key=f"{key}_print"):
+            print_receipt(t.raw)
+            st.success("Struk dikirim ke printer.")
+    if allow_delete:
+        with col_delete:
+            st.button(f"🗑️ Hapus Nota [{code}]", key=f"{key}_delete", on_click=delete_receipt, args=(key, filename, code))
+
+def delete_receipt(key, filename, code):
+    # 🗑️ callback: the day, today's stock warnings and the history totals change
+    try:
+        deleted = delete_transaction(filename, code)
+    except Exception as e:
+        st.session_state[f"{key}_notice"] = ("error", f"Gagal menghapus transaksi: {e}")
+        return
+    if deleted:
+        st.session_state[f"{key}_notice"] = ("success", f"Nota {code} berhasil dihapus.")
+        invalidate("today", keys=(filename, "low_stock"))
+        invalidate("history", keys=("sessions", filename))
+        redraw("today", "history")
+
+def render_record_errors(day):
+    # Receipts that could not be read are listed, not shown as "Item" with 0 pieces
+    if not day.errors:
+        return
+    st.warning(f"{len(day.errors)} nota tidak bisa dibaca dan tidak ditampilkan.")
+    with st.expander("Detail nota bermasalah"):
+        for error in day.errors:
+            st.caption(str(error))
+
+# --- CUTTING PLAN ---
+def render_cutting_plan(lines, key):
+    col_mode, col_kerf = st.columns(2)
+    mode = col_mode.radio("Mode", ["fast", "best"], format_func={"fast": "Cepat", "best": "Lebih hemat"}.get, horizontal=True, key=f"{key}_mode")
+    kerf = col_kerf.number_input("Kerf (cm)", min_value=0.0, value=CUT_KERF, step=0.1, format="%.2f", key=f"{key}_kerf")
+    if not st.button("Hitung Rencana Potong", key=f"{key}_run"):
+        return
+    plans = optimize_by_type(lines, STOCK_SHEETS, kerf=kerf, mode=mode, time_budget=0.3)
+    for name, plan in plans.items():
+        sw, sh = plan["sheet"]
+        st.markdown(
+            f"**{name}**: {plan['sheet_count']} lembar {sw:g}x{sh:g} cm · "
+            f"{plan['pieces']} potong · sisa {plan['waste_pct']:.1f}% · {plan['seconds'] * 1000:.0f} ms"
+        )
+        for p in plan["unplaced"]:
+            st.warning(f"{p['label']} lebih besar dari lembar stok")
+        for placed in plan["sheets"]:
+            st.markdown(sheet_svg(placed, plan["sheet"]), unsafe_allow_html=True)
+
+# --- OWNER MODE ---
+def exit_owner_mode():
+    st.session_state["owner_mode"] = False
+    st.session_state["owner_mode_passcode"] = ""
+
+with st.sidebar:
+    if st.session_state["owner_mode"]:
+        st.success("Mode Owner aktif")
+        st.button("🔒 Keluar Mode Owner", on_click=exit_owner_mode, use_container_width=True)
+    else:
+        owner_code = st.text_input("Kode Owner", type="password", key="owner_mode_passcode")
+        if owner_code:
+            if owner_code == OWNER_PASSCODE:
+                st.session_state["owner_mode"] = True
+                st.rerun()
+            else:
+                st.error("Kode salah.")
+
 st.title("Sistem Penjualan Kaca")
 col1, col2 = st.columns([1, 1])
 
 with col1:
     if st.button("🔄 Refresh", use_container_width=True):
+        st.session_state["region_data"].clear()
         st.rerun()
 
 with col2:
@@ -279,18 +479,7 @@ with col2:
 
 
 
-# --- Item selection
-st.subheader("Tambah ke Keranjang")
-item_names = [item["name"] for item in ITEMS]
-selected_item = st.selectbox("Pilih Barang", item_names)
-item_obj = next(item for item in ITEMS if item["name"] == selected_item)
-base_price = item_obj["base_price"]
-
-col1, col2, col3 = st.columns(3)
-width_cm = col1.number_input("Lebar (cm)", min_value=0.0, value=st.session_state.get("width_cm", 0.0), step=0.1, format="%.2f", key="width_cm")
-height_cm = col2.number_input("Tinggi (cm)", min_value=0.0, value=st.session_state.get("height_cm", 0.0), step=0.1, format="%.2f", key="height_cm")
-qty = col3.number_input("Jumlah", min_value=1, value=st.session_state.get("qty", 1), key="qty")
-
+# --- CART (fragment: item entry, ➕/❌ and the cart table rerun only this) ---
 def clear_inputs():
     st.session_state.update({
         "width_cm": 0.0,
@@ -298,304 +487,548 @@ def clear_inputs():
         "qty": 1,
     })
 
-add_col, clear_col = st.columns([3, 2])  # Adjust ratio if needed
-
-with add_col:
-    add_clicked = st.button("➕ Tambah ke Keranjang", use_container_width=True)
-
-with clear_col:
-    st.button("🧹 Bersihkan", on_click=clear_inputs, use_container_width=True)
-
-if width_cm > 0 and height_cm > 0:
-    area_m2 = (width_cm / 100) * (height_cm / 100)
-    unit_price = int(area_m2 * base_price + SERVICE_FEE)
-    st.success(f"Harga per item: {rupiah(unit_price)}")
-
-if add_clicked:
-    found = False
-    for item in st.session_state["keranjang"]:
-        if (
-            item.get("item") == selected_item
-            and float(item.get("width_cm", 0)) == float(width_cm)
-            and float(item.get("height_cm", 0)) == float(height_cm)
-        ):
-            item["qty"] = int(item.get("qty", 1)) + qty
-            raw_subtotal = item["qty"] * unit_price
-            item["unit_price"] = unit_price
-            item["price"] = math.ceil(raw_subtotal / 1000) * 1000
-            found = True
-            break
-    if not found:
-        st.session_state["keranjang"].append({
-            "item": selected_item,
-            "width_cm": float(width_cm),
-            "height_cm": float(height_cm),
-            "area_m2": area_m2,
-            "unit_price": unit_price,
-            "qty": int(qty),
-            "price": math.ceil((unit_price * qty) / 1000) * 1000,
-        })
-
-# --- Keranjang (ongoing transaction) ---
-st.subheader("🛒 Keranjang")
-
-# Always render the table header
-col1, col2, col3, col4, col5, col6 = st.columns([3, 2, 1, 2, 3, 1])
-with col1: st.markdown("**Item**")
-with col2: st.markdown("**Ukuran (cm)**")
-with col3: st.markdown("**Qty**")
-with col4: st.markdown("**Harga Satuan**")
-with col5: st.markdown("**Subtotal**")
-with col6: st.markdown("**Hapus**")
-
-total_qty = 0
-total_price = 0
-
-if st.session_state["keranjang"]:
-    for idx, t in enumerate(st.session_state["keranjang"]):
-        name, w, h, qty, unit_p, subtotal, _ = safe_item_fields(t)
+def remove_cart_line(idx):
+    del st.session_state["keranjang"][idx]
+
+def checkout(method):
+    # 💳 callback: runs before the regions redraw, so the cart inputs can still be reset
+    paid_at = now()
+    today_str = paid_at.strftime("%d%m%y")
+    filename = get_today_filename()
+
+    # Counter is seeded from the day and its local file once per process, then handed out under a lock
+    till = get_till_id()
+    try:
+        receipt_no = get_receipt_counter().next(filename, till, lambda: receipt_seed(filename))
+    except Exception as e:
+        st.session_state["pay_error"] = f"Gagal menentukan nomor nota: {e}"
+        return
+    receipt_code = generate_receipt_code(today_str, receipt_no, till)
+
+    transaction = make_transaction(receipt_code, st.session_state["keranjang"], method, paid_at)
+    # Journal locally first; the sync worker pushes it to GitHub in the background
+    get_outbox().append(filename, transaction)
+    get_sync_worker().kick()
+    printed = print_receipt(transaction) is not None
+    st.session_state["last_receipt"] = transaction
+    st.session_state["last_receipt_pdf"] = create_receipt_pdf(transaction)
+    st.session_state["paid_notice"] = {"code": receipt_code, "printed": printed}
+    st.session_state["pay_error"] = None
+    st.session_state["just_paid"] = True
+    safe_reset()
+    # The sale belongs in today's list and the history totals as well
+    invalidate("today")
+    invalidate("history", keys=("sessions", filename))
+    redraw("cart", "today", "history")
+
+@st.fragment(key="cart")
+def cart_region():
+    with region("cart"):
+        st.subheader("Tambah ke Keranjang")
+        selected_item = st.selectbox("Pilih Barang", item_names())
+
+        col1, col2, col3 = st.columns(3)
+        width_cm = col1.number_input("Lebar (cm)", min_value=0.0, value=st.session_state.get("width_cm", 0.0), step=0.1, format="%.2f", key="width_cm")
+        height_cm = col2.number_input("Tinggi (cm)", min_value=0.0, value=st.session_state.get("height_cm", 0.0), step=0.1, format="%.2f", key="height_cm")
+        qty = col3.number_input("Jumlah", min_value=1, value=st.session_state.get("qty", 1), key="qty")
+
+        add_col, clear_col = st.columns([3, 2])  # Adjust ratio if needed
+
+        with add_col:
+            add_clicked = st.button("➕ Tambah ke Keranjang", use_container_width=True)
+
+        with clear_col:
+            st.button("🧹 Bersihkan", on_click=clear_inputs, use_container_width=True)
+
+        if width_cm > 0 and height_cm > 0:
+            st.success(f"Harga per item: {rupiah(unit_price(base_price(selected_item), width_cm, height_cm))}")
+
+        if add_clicked:
+            if width_cm > 0 and height_cm > 0:
+                add_to_cart(st.session_state["keranjang"], cart_line(selected_item, width_cm, height_cm, qty))
+                st.session_state["paid_notice"] = None
+            else:
+                st.warning("Isi lebar dan tinggi dulu.")
+
+        # Contractor cut lists: every line priced in one pass and merged into the cart
+        with st.expander("📋 Impor Daftar Potong"):
+            st.caption(
+                "Satu baris per ukuran: jenis kaca, lebar, tinggi, jumlah (mis. `Kaca Polos 5MM; 60; 40; 2` "
+                "atau `60x40x2`). Baris tanpa jenis kaca memakai barang yang dipilih di atas. "
+                "Di baris yang dipisah koma, tulis desimal dengan titik (`45.5`) atau dalam tanda kutip."
+            )
+            cut_file = st.file_uploader("File CSV", type=["csv", "txt"], key="cut_list_file")
+            cut_text = st.text_area("Atau tempel daftar", key="cut_list_text", height=120)
+            if st.button("📥 Masukkan ke Keranjang", key="cut_list_import"):
+                text = cut_file.getvalue().decode("utf-8-sig", errors="replace") if cut_file is not None else cut_text
+                rows, errors = parse_cut_list(text, default_item=selected_item)
+                if rows:
+                    merge_lines(st.session_state["keranjang"], quote_lines(rows))
+                    st.session_state["paid_notice"] = None
+                    st.success(f"{len(rows)} baris masuk ke keranjang ({sum(r[3] for r in rows)} pcs).")
+                if errors:
+                    st.warning(f"{len(errors)} baris dilewati:")
+                    for error in errors:
+                        st.caption(error)
+                elif not rows:
+                    st.info("Daftar potong kosong.")
+
+        # --- Keranjang (ongoing transaction) ---
+        st.subheader("🛒 Keranjang")
+
+        # Always render the table header
         col1, col2, col3, col4, col5, col6 = st.columns([3, 2, 1, 2, 3, 1])
-        with col1: st.write(name)
-        with col2: st.write(f"{round(w,2):g} x {round(h,2):g}")
-        with col3: st.write(f"{qty}")
-        with col4: st.write(f"{rupiah(unit_p)}")
-        with col5: st.write(f"{rupiah(subtotal)}")
-        with col6:
-            if st.button("❌", key=f"remove_{idx}"):
-                del st.session_state["keranjang"][idx]  # langsung hapus
-                st.rerun()
+        with col1: st.markdown("**Item**")
+        with col2: st.markdown("**Ukuran (cm)**")
+        with col3: st.markdown("**Qty**")
+        with col4: st.markdown("**Harga Satuan**")
+        with col5: st.markdown("**Subtotal**")
+        with col6: st.markdown("**Hapus**")
+
+        total_qty = 0
+        total_price = 0
+
+        if st.session_state["keranjang"]:
+            for idx, t in enumerate(st.session_state["keranjang"]):
+                line = Item.from_dict(t)
+                col1, col2, col3, col4, col5, col6 = st.columns([3, 2, 1, 2, 3, 1])
+                with col1: st.write(line.name)
+                with col2: st.write(line.size_text)
+                with col3: st.write(f"{line.qty}")
+                with col4: st.write(line.unit_price_text)
+                with col5: st.write(line.subtotal_text)
+                with col6:
+                    # Removed in the callback, before this fragment draws the table again
+                    st.button("❌", key=f"remove_{idx}", on_click=remove_cart_line, args=(idx,))
+
+                total_qty += line.qty
+                total_price += line.subtotal
+
+            # Totals
+            st.markdown(f"**Total Qty: {total_qty} pcs**")
+            st.markdown(f"**Total Keranjang: {rupiah(total_price)}**")
+
+            with st.expander("✂️ Rencana Potong"):
+                render_cutting_plan(st.session_state["keranjang"], "cut_cart")
+
+            # Payment method
+            method = st.radio("Pilih Metode Pembayaran", PAYMENT_METHODS, horizontal=True)
+            st.session_state["method"] = method
+            pay_enabled = method is not None
+
+            # Bayar button
+            st.button("💳 Bayar", disabled=not pay_enabled, on_click=checkout, args=(method,))
+            if st.session_state["pay_error"]:
+                st.error(st.session_state["pay_error"])
+                st.session_state["pay_error"] = None
 
-        total_qty += qty
-        total_price += subtotal
+        else:
+            st.info("Keranjang kosong. Tambahkan item untuk memulai transaksi.")
+
+        # Shown until the next item goes into the cart
+        notice = st.session_state["paid_notice"]
+        if notice:
+            st.success(f"Transaksi berhasil disimpan! Kode: {notice['code']}")
+            if notice["printed"]:
+                st.info("🖨️ Struk dikirim ke printer.")
+            st.download_button(
+                label="⬇️ Download Receipt PDF",
+                data=st.session_state["last_receipt_pdf"],
+                file_name=f"{notice['code']}.pdf",
+                mime="application/pdf"
+            )
 
-    # Totals
-    st.markdown(f"**Total Qty: {total_qty} pcs**")
-    st.markdown(f"**Total Keranjang: {rupiah(total_price)}**")
 
-    # Payment method
-    method = st.radio("Pilih Metode Pembayaran", ["Cash", "Transfer"], horizontal=True)
-    st.session_state["method"] = method
-    pay_enabled = method is not None
+# --- Daftar Transaksi Hari Ini (fragment: paging and opening a receipt rerun only this) ---
+def today_data():
+    # (running ledger, receipts) of today, synced plus pending in the outbox
+    filename = get_today_filename()
+    return region_data("today", filename, lambda: (load_ledger(filename), load_records(filename)))
 
-    # Bayar button
-    if st.button("💳 Bayar", disabled=not pay_enabled):
-        today_str = datetime.datetime.now(ZoneInfo("Asia/Shanghai")).strftime("%d%m%y")
+@st.fragment(key="today")
+def today_region():
+    with region("today"):
+        st.subheader("📑 Daftar Transaksi Hari Ini")
         filename = get_today_filename()
-        transactions_today = load_transactions(filename)
+        ledger_today, day = today_data()
+        if ledger_today["receipts"]:
+            col_nota, col_qty, col_area, col_total = st.columns(4)
+            col_nota.metric("Nota", ledger_today["receipts"])
+            col_qty.metric("Qty", f"{ledger_today['pieces']} pcs")
+            col_area.metric("Luas", f"{ledger_today['area_m2']:.2f} m²")
+            col_total.metric("Total", rupiah(ledger_today["total"]))
+            by_method = " · ".join(f"{m}: {rupiah(s['total'])} ({s['receipts']} nota)" for m, s in ledger_today["methods"].items())
+            st.caption(f"{by_method} · Nota terakhir: {ledger_today['last_code']}")
+        for row in region_data("today", "low_stock", low_stock):
+            st.warning(f"⚠️ Stok {row['item']} menipis: {row['sheets']:g} lembar ({row['area_m2']:.2f} m²)")
+
+        outbox = get_outbox()
+
+        render_record_errors(day)
+
+        # 🔄 Sort so latest transactions appear first
+        transactions_today = list(reversed(day.transactions))
+
 
-        # ✅ Find the last used number, not just len()
         if transactions_today:
-            last_codes = [t.get("code", "") for t in transactions_today if t.get("code")]
-            last_nums = []
-            for code in last_codes:
-                try:
-                    # code format: GL230825-005
-                    num = int(code.split("-")[-1])
-                    last_nums.append(num)
-                except:
-                    pass
-            last_used = max(last_nums) if last_nums else 0
+            render_transaction_list(transactions_today, "today", filename, allow_delete=True, sync_status=outbox.status)
         else:
-            last_used = 0
-
-        receipt_no = last_used + 1
-        receipt_code = generate_receipt_code(today_str, receipt_no)
-
-        total_qty = sum(safe_item_fields(t)[3] for t in st.session_state["keranjang"])
-        total_price = sum(safe_item_fields(t)[5] for t in st.session_state["keranjang"])
-        transaction = {
-            "code": receipt_code,
-            "datetime": datetime.datetime.now(ZoneInfo("Asia/Shanghai")).isoformat(),
-            "items": st.session_state["keranjang"],
-            "method": method,
-            "total_qty": int(total_qty),
-            "total": int(total_price),
-        }
-        transactions_today.append(transaction)
-        save_transactions(filename, transactions_today)
-        st.success(f"Transaksi berhasil disimpan! Kode: {receipt_code}")
-        pdf = create_receipt_pdf(transaction)
-        st.session_state["last_receipt"] = transaction
-        st.session_state["last_receipt_pdf"] = pdf
+            st.info("Belum ada transaksi hari ini.")
+
+        sync_worker = get_sync_worker()
+        if len(outbox):
+            st.caption(f"⏳ {len(outbox)} transaksi menunggu sinkronisasi")
+        if sync_worker.last_error:
+            st.warning(f"Sinkronisasi tertunda, akan dicoba lagi: {sync_worker.last_error}")
+        print_queue = get_print_queue()
+        if print_queue is not None and print_queue.last_error:
+            st.warning(f"Printer bermasalah: {print_queue.last_error}")
+
+
+# --- Finish session (fragment) ---
+@st.fragment(key="session_close")
+def session_close_region():
+    with region("session_close"):
+        if not st.button("Selesaikan Sesi"):
+            return
+        # Read straight from the running ledger, no pass over the day's receipts
+        ledger_today, _ = today_data()
+        receipts = list(ledger_receipts(ledger_today))
+        st.subheader("Ringkasan Sesi Hari Ini")
+        for method, receipt_lines, total_line in summary_sections(receipts):
+            st.markdown(f"### Transaksi {method}")
+            for line in receipt_lines:
+                st.write(line)
+            st.write(total_line)
+            st.markdown("---")  # separator
+        for name, row in ledger_today["items"].items():
+            st.caption(f"{name}: {row['pieces']} pcs, {row['area_m2']:.2f} m², {rupiah(row['total'])}")
+
+        # Same lines for textarea + PDF
+        lines = summary_lines(receipts)
+        summary_str = "\n".join(lines)
+        st.text_area("Struk Ringkasan", summary_str, height=300)
+
+        pdf = create_summary_pdf("Ringkasan Sesi Hari Ini", lines)
         st.download_button(
-            label="⬇️ Download Receipt PDF",
-            data=pdf,
-            file_name=f"{receipt_code}.pdf",
+            "⬇️ Download Ringkasan PDF",
+            pdf,
+            file_name="summary.pdf",
             mime="application/pdf"
         )
-        st.session_state["just_paid"] = True
-
-else:
-    st.info("Keranjang kosong. Tambahkan item untuk memulai transaksi.")
-
-
-# --- Daftar Transaksi Hari Ini ---
-st.subheader("📑 Daftar Transaksi Hari Ini")
-filename = get_today_filename()
-transactions_today = load_transactions(filename)
-
-# 🔄 Sort so latest transactions appear first
-transactions_today = list(reversed(transactions_today))
-
-
-if transactions_today:
-    for i, t in enumerate(transactions_today):
-        qty_display = t.get("total_qty", sum(safe_item_fields(it)[3] for it in t.get("items", [])))
-        total_display = t.get("total", sum(safe_item_fields(it)[5] for it in t.get("items", [])))
-        method_display = t.get("method", "-")
-        with st.expander(f"{t.get('code','(tanpa kode)')} - {rupiah(total_display)} [{qty_display} pcs, {method_display}]"):
-            col1, col2, col3, col4, col5, col6 = st.columns([3, 2, 1, 2, 3, 1])
-            with col1: st.markdown("**Item**")
-            with col2: st.markdown("**Ukuran (cm)**")
-            with col3: st.markdown("**Qty**")
-            with col4: st.markdown("**Harga Satuan**")
-            with col5: st.markdown("**Subtotal**")
-            with col6: st.markdown("")
-            for item in t.get("items", []):
-                name, w, h, qty, unit_p, subtotal, area_m2 = safe_item_fields(item)
-                col1, col2, col3, col4, col5, col6 = st.columns([3, 2, 1, 2, 3, 1])
-                with col1: st.write(name)
-                with col2: st.write(f"{round(w,2):g} x {round(h,2):g}")
-                with col3: st.write(f"{qty}")
-                with col4: st.write(f"{rupiah(unit_p)}")
-                with col5: st.write(f"{rupiah(subtotal)}")
-                with col6: st.write("")
-            
-            passcode = st.text_input(
-                f"Masukkan Kode Owner untuk Aksi [{t.get('code','no_code')}]",
-                type="password",
-                key=f"owner_passcode_{i}"
+
+
+# --- RIWAYAT SESI HARIAN (fragment, moved to very bottom) ---
+def toggle_riwayat():
+    st.session_state["show_riwayat"] = not st.session_state["show_riwayat"]
+
+@st.fragment(key="history")
+def history_region():
+    with region("history"):
+        st.subheader("📅 Riwayat Sesi Harian")
+
+        # Initialize toggle state if not exists
+        if "show_riwayat" not in st.session_state:
+            st.session_state["show_riwayat"] = False
+
+        # Toggle button
+        st.button("👁️ Tampilkan Riwayat" if not st.session_state["show_riwayat"] else "🙈 Sembunyikan Riwayat", on_click=toggle_riwayat)
+
+        # Only render riwayat if visible
+        if not st.session_state["show_riwayat"]:
+            return
+        query = st.text_input(
+            "🔎 Cari Nota",
+            key="search_query",
+            placeholder="GL230825-0 · reben 60x40 ~2 · 100000-250000 · Transfer",
+            help="Kode nota (awalan), nama kaca, ukuran LxT dengan toleransi ~cm, rentang harga, atau metode bayar. Boleh digabung.",
+        )
+        if query.strip():
+            hits, total = search_receipts(query)
+            if hits:
+                shown = f", menampilkan {len(hits)} terbaru" if total > len(hits) else ""
+                st.caption(f"{total} nota cocok{shown}")
+                render_transaction_list(hits, "search", None, resolve=resolve_search_hit)
+            else:
+                st.info("Tidak ada nota yang cocok.")
+
+        sessions = region_data("history", "sessions", day_index)
+        session_files = list(sessions)
+        if session_files:
+            sesi_label = [
+                f"Sesi {f[:4]}-{f[4:6]}-{f[6:8]} · {sessions[f]['count']} nota · {rupiah(sessions[f]['total'])}"
+                for f in session_files
+            ]
+            selected_idx = st.selectbox(
+                "Pilih Sesi",
+                range(len(session_files)),
+                format_func=lambda x: sesi_label[x]
             )
-            if passcode:
-                if passcode == OWNER_PASSCODE:
-                    col_reprint, col_delete = st.columns(2)
-                    with col_reprint:
-                        if st.button(f"Reprint Struk [{t.get('code','no_code')}]", key=f"reprint_btn_{i}"):
-                            pdf = create_receipt_pdf(t)
-                            st.download_button(
-                                label=f"⬇️ Download Reprint PDF [{t.get('code','no_code')}]",
-                                data=pdf,
-                                file_name=f"reprint_{t.get('code','no_code')}.pdf",
-                                mime="application/pdf"
-                            )
-                    with col_delete:
-                        if st.button(f"🗑️ Hapus Nota [{t.get('code','no_code')}]", key=f"delete_btn_{i}"):
-                            if delete_transaction(filename, t.get("code")):
-                                st.success(f"Nota {t.get('code')} berhasil dihapus.")
-                                st.rerun()
-                else:
-                    st.error("Kode salah. Tidak bisa melakukan aksi owner.")
-else:
-    st.info("Belum ada transaksi hari ini.")
-
-
-# --- Finish session ---
-if st.button("Selesaikan Sesi"):
-    by_method = {"Cash": [], "Transfer": []}
-    for t in transactions_today:
-        by_method[t.get("method", "-")].append(t)
-
-    st.subheader("Ringkasan Sesi Hari Ini")
-    summary_lines = []
-
-    for method, txns in by_method.items():
-        st.markdown(f"### Transaksi {method}")
-        summary_lines.append(f"Transaksi {method}\n")
-
-        for t in txns:
-            qty_display = t.get("total_qty", sum(safe_item_fields(it)[3] for it in t.get("items", [])))
-            total_display = t.get("total", sum(safe_item_fields(it)[5] for it in t.get("items", [])))
-            line = f"{t.get('code','(tanpa kode)')}: {rupiah(total_display)} ({qty_display} pcs)"
-            st.write(line)
-            summary_lines.append(line)
-
-        total_m = sum(t.get('total', 0) for t in txns)
-        total_line = f"Total {method}: {rupiah(total_m)}"
-        st.write(total_line)
-        st.markdown("---")  # separator
-        summary_lines.append(total_line + "\n")
-
-    # Join lines for textarea + PDF
-    summary_str = "\n".join(summary_lines)
-    st.text_area("Struk Ringkasan", summary_str, height=300)
-
-    pdf = create_summary_pdf("Ringkasan Sesi Hari Ini", summary_lines)
-    st.download_button(
-        "⬇️ Download Ringkasan PDF",
-        pdf,
-        file_name="summary.pdf",
-        mime="application/pdf"
-    )
+            selected_file = session_files[selected_idx]
+
+            st.info(f"Menampilkan transaksi dari sesi: **{sesi_label[selected_idx]}**")
+            for method, s in sessions[selected_file]["methods"].items():
+                st.caption(f"{method}: {s['count']} nota, {s['qty']} pcs, {rupiah(s['total'])}")
+            day = region_data("history", selected_file, lambda: load_records(selected_file))
+            render_record_errors(day)
+            if day.transactions:
+                render_transaction_list(day.transactions, f"riwayat_{selected_file[:8]}", selected_file)
+            else:
+                st.info("Tidak ada transaksi pada sesi ini.")
+            # Recount the day from its receipts; a stored ledger that disagrees is rebuilt
+            if st.session_state["owner_mode"] and st.button("🧮 Periksa Ringkasan Sesi", key=f"check_ledger_{selected_file[:8]}"):
+                try:
+                    diffs = get_storage().check(selected_file, repair=True)
+                    if diffs:
+                        st.warning(f"Ringkasan tidak cocok dengan nota ({len(diffs)} selisih), sudah dibangun ulang.")
+                        st.json({field: list(values) for field, values in diffs.items()})
+                        invalidate("today")
+                    else:
+                        st.success("Ringkasan cocok dengan nota.")
+                except Exception as e:
+                    st.error(f"Gagal memeriksa ringkasan: {e}")
+        else:
+            st.info("Belum ada sesi harian yang tercatat.")
+        manifest = unwrap(get_storage(), LedgerStorage, ShardedStorage)
+        if st.session_state["owner_mode"] and isinstance(manifest, ManifestStorage):
+            col_rebuild, col_compact = st.columns(2)
+            if col_rebuild.button("🔁 Bangun Ulang Manifest", key="rebuild_manifest"):
+                try:
+                    manifest.rebuild()
+                    invalidate("history")
+                    st.rerun(scope="fragment")
+                except Exception as e:
+                    st.error(f"Gagal membangun ulang manifest: {e}")
+            # Closed days move into one archive per month; they stay readable and editable
+            if col_compact.button("🗜️ Arsipkan Sesi Lama", key="compact_days"):
+                try:
+                    result = manifest.compact_days(get_today_filename()[:8])
+                    st.success(f"{len(result['removed'])} file diarsipkan.")
+                    invalidate("history")
+                except Exception as e:
+                    st.error(f"Gagal mengarsipkan sesi: {e}")
+        elif st.session_state["owner_mode"] and isinstance(manifest, SqliteStorage):
+            st.caption("Arsip sesi lama tidak tersedia untuk penyimpanan SQLite: semua sesi sudah dalam satu database.")
+
+
+cart_region()
+today_region()
+session_close_region()
+history_region()
+
+
+# --- ANALITIK (owner mode) ---
+if st.session_state["owner_mode"]:
+    st.subheader("📊 Analitik Penjualan")
+    period_labels = {"week": "Minggu", "month": "Bulan", "year": "Tahun"}
+    period_kind = st.radio("Periode", list(period_labels), format_func=period_labels.get, horizontal=True, key="analytics_period")
+    anchor = st.date_input("Tanggal", value=now().date(), key="analytics_anchor")
+    first, last = period_bounds(period_kind, anchor)
+
+    rollups = get_rollups()
+    try:
+        refreshed = rollups.refresh()
+    except Exception as e:
+        refreshed = 0
+        st.error(f"Gagal memperbarui rekap harian: {e}")
+    p = rollups.period(first, last)
+    st.caption(f"{first:%d-%m-%Y} s/d {last:%d-%m-%Y} · {p['days']} hari · {refreshed} hari dihitung ulang")
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Omzet", rupiah(p["revenue"]))
+    col2.metric("Nota", p["receipts"])
+    col3.metric("Pcs", p["pieces"])
+    col4.metric("Luas", f"{p['area_m2']:.2f} m²")
+
+    st.markdown("**Per Jenis Kaca**")
+    st.dataframe([
+        {"Item": r["item"], "Omzet": rupiah(r["revenue"]), "Pcs": r["pieces"], "m²": r["area_m2"],
+         "Nota": r["receipts"], "Rata-rata Nota": rupiah(r["avg_ticket"])}
+        for r in p["items"]
+    ], hide_index=True, use_container_width=True)
+
+    st.markdown("**Per Metode Pembayaran**")
+    st.dataframe([
+        {"Metode": r["method"], "Omzet": rupiah(r["revenue"]), "Nota": r["receipts"], "Pcs": r["pieces"],
+         "Rata-rata Nota": rupiah(r["avg_ticket"])}
+        for r in p["methods"]
+    ], hide_index=True, use_container_width=True)
+
+    st.markdown("**Per Jam**")
+    if p["hours"]:
+        st.bar_chart({f"{r['hour']:02d}:00": r["revenue"] for r in p["hours"]})
+        st.dataframe([
+            {"Jam": f"{r['hour']:02d}:00", "Omzet": rupiah(r["revenue"]), "Nota": r["receipts"], "Pcs": r["pieces"],
+             "Rata-rata Nota": rupiah(r["avg_ticket"])}
+            for r in p["hours"]
+        ], hide_index=True, use_container_width=True)
+    else:
+        st.info("Belum ada transaksi pada periode ini.")
 
 
-# --- RIWAYAT SESI HARIAN (Moved to very bottom) ---
-st.subheader("📅 Riwayat Sesi Harian")
+# --- STOK KACA (owner mode) ---
+if st.session_state["owner_mode"]:
+    st.subheader("📦 Stok Kaca")
+    today = now().date()
+    try:
+        stock = load_stock(get_storage())
+    except Exception as e:
+        st.error(f"Gagal membaca stok: {e}")
+        stock = None
+    if stock is not None:
+        try:
+            # Same rollups as Analitik above, no day file is read again
+            rates = get_rollups().consumption(today, FORECAST_WINDOW_DAYS, FORECAST_HALF_LIFE_DAYS)
+        except Exception as e:
+            st.warning(f"Perkiraan pemakaian tidak tersedia: {e}")
+            rates = [0.0] * (len(ITEMS) + 1)
+        rows = forecast(stock, rates, item_names(), today)
+        if rows:
+            st.dataframe([
+                {"Item": r["item"], "Sisa m²": round(r["area_m2"], 2), "Sisa Lembar": r["sheets"],
+                 "Batas Lembar": r["min_sheets"], "Pemakaian m²/hari": round(r["rate_m2_day"], 2),
+                 "Habis Dalam": "-" if r["days_left"] is None else f"{r['days_left']:g} hari",
+                 "Perkiraan Habis": "-" if r["stockout"] is None else f"{r['stockout']:%d-%m-%Y}",
+                 "Status": "⚠️ Menipis" if r["low"] else "✅"}
+                for r in rows
+            ], hide_index=True, use_container_width=True)
+            st.caption(f"Pemakaian: rata-rata {FORECAST_WINDOW_DAYS} hari terakhir, hari yang lebih baru lebih berat.")
+        else:
+            st.info("Belum ada stok yang dicatat.")
+
+        col_item, col_sheets, col_kind = st.columns(3)
+        stock_item = col_item.selectbox("Jenis Kaca", item_names(), key="stock_item")
+        current = stock["items"].get(stock_item, {})
+        stock_sheets = col_sheets.number_input("Jumlah Lembar", min_value=0, value=1, step=1, key="stock_sheets")
+        stock_kind = col_kind.radio("Catat Sebagai", ["restock", "count"], format_func={"restock": "Tambah stok", "count": "Hitung ulang (opname)"}.get, key="stock_kind")
+        col_w, col_h, col_min = st.columns(3)
+        sheet = current.get("sheet") or STOCK_SHEETS[stock_item]
+        sheet_w = col_w.number_input("Lebar Lembar (cm)", min_value=1.0, value=float(sheet[0]), step=0.1, key=f"stock_w_{stock_item}")
+        sheet_h = col_h.number_input("Tinggi Lembar (cm)", min_value=1.0, value=float(sheet[1]), step=0.1, key=f"stock_h_{stock_item}")
+        min_sheets = col_min.number_input("Batas Menipis (lembar)", min_value=0, value=int(current.get("min_sheets", LOW_STOCK_SHEETS)), step=1, key=f"stock_min_{stock_item}")
+        if st.button("💾 Simpan Stok", key="stock_save"):
+            try:
+                restock(get_storage(), stock_item, int(stock_sheets), now(), sheet=(sheet_w, sheet_h),
+                        min_sheets=int(min_sheets), count=stock_kind == "count")
+                invalidate("today")
+                st.rerun()
+            except Exception as e:
+                st.error(f"Gagal menyimpan stok: {e}")
+        if stock["restocks"]:
+            with st.expander("Riwayat Stok"):
+                st.dataframe([
+                    {"Waktu": when[:16].replace("T", " "), "Item": name, "Lembar": sheets, "m²": area,
+                     "Jenis": "Tambah stok" if kind == "restock" else "Hitung ulang"}
+                    for when, name, sheets, area, kind in reversed(stock["restocks"][-20:])
+                ], hide_index=True, use_container_width=True)
+
+
+# --- RENCANA POTONG HARIAN (owner mode) ---
+if st.session_state["owner_mode"]:
+    st.subheader("✂️ Rencana Potong Hari Ini")
+    day_items = [it for t in today_data()[1].transactions for it in t.raw["items"]]
+    if day_items:
+        render_cutting_plan(day_items, "cut_day")
+    else:
+        st.info("Belum ada transaksi hari ini.")
 
-# Initialize toggle state if not exists
-if "show_riwayat" not in st.session_state:
-    st.session_state["show_riwayat"] = False
 
-# Toggle button
-if st.button("👁️ Tampilkan Riwayat" if not st.session_state["show_riwayat"] else "🙈 Sembunyikan Riwayat"):
-    st.session_state["show_riwayat"] = not st.session_state["show_riwayat"]
-    st.rerun()
-
-# Only render riwayat if visible
-if st.session_state["show_riwayat"]:
-    session_files = list_session_files()
-    if session_files:
-        sesi_label = [f"Sesi {f[:4]}-{f[4:6]}-{f[6:8]}" for f in session_files]
-        selected_idx = st.selectbox(
-            "Pilih Sesi",
-            range(len(session_files)),
-            format_func=lambda x: sesi_label[x]
-        )
-        selected_file = session_files[selected_idx]
-
-        st.info(f"Menampilkan transaksi dari sesi: **{sesi_label[selected_idx]}**")
-        transactions = load_transactions(selected_file)
-        if transactions:
-            for i, t in enumerate(transactions):
-                qty_display = t.get("total_qty", sum(safe_item_fields(it)[3] for it in t.get("items", [])))
-                total_display = t.get("total", sum(safe_item_fields(it)[5] for it in t.get("items", [])))
-                method_display = t.get("method", "-")
-                with st.expander(f"{t.get('code','(tanpa kode)')} - {rupiah(total_display)} [{qty_display} pcs, {method_display}]"):
-                    col1, col2, col3, col4, col5, col6 = st.columns([3, 2, 1, 2, 3, 1])
-                    with col1: st.markdown("**Item**")
-                    with col2: st.markdown("**Ukuran (cm)**")
-                    with col3: st.markdown("**Qty**")
-                    with col4: st.markdown("**Harga Satuan**")
-                    with col5: st.markdown("**Subtotal**")
-                    with col6: st.markdown("")
-                    for item in t.get("items", []):
-                        name, w, h, qty, unit_p, subtotal, area_m2 = safe_item_fields(item)
-                        col1, col2, col3, col4, col5, col6 = st.columns([3, 2, 1, 2, 3, 1])
-                        with col1: st.write(name)
-                        with col2: st.write(f"{round(w,2):g} x {round(h,2):g}")
-                        with col3: st.write(f"{qty}")
-                        with col4: st.write(f"{rupiah(unit_p)}")
-                        with col5: st.write(f"{rupiah(subtotal)}")
-                        with col6: st.write("")
-                    # Reprint for session transactions
-                    passcode = st.text_input(
-                        f"Masukkan Kode Owner untuk Reprint [{t.get('code','no_code')}] (Riwayat)",
-                        type="password",
-                        key=f"riwayat_reprint_passcode_{i}"
-                    )
-                    if passcode:
-                        if passcode == OWNER_PASSCODE:
-                            if st.button(f"Reprint Struk [{t.get('code','no_code')}] (Riwayat)", key=f"riwayat_reprint_btn_{i}"):
-                                pdf = create_receipt_pdf(t)
-                                st.download_button(
-                                    label=f"⬇️ Download Reprint PDF [{t.get('code','no_code')}]",
-                                    data=pdf,
-                                    file_name=f"reprint_{t.get('code','no_code')}.pdf",
-                                    mime="application/pdf"
-                                )
-                        else:
-                            st.error("Kode salah. Tidak bisa reprint.")
+# --- CETAK STRUK MASSAL (owner mode) ---
+if st.session_state["owner_mode"]:
+    st.subheader("🧾 Cetak Struk Massal")
+    today = now().date()
+    batch_range = st.date_input("Rentang tanggal", value=(today, today), key="batch_range")
+    if len(batch_range) == 2 and st.button("Buat PDF Semua Struk", key="batch_pdf_btn"):
+        first, last = batch_range
+        try:
+            days = get_storage().load_range(f"{first:%Y%m%d}", f"{last:%Y%m%d}")
+        except Exception as e:
+            days = {}
+            st.error(f"Gagal memuat transaksi: {e}")
+        # Sales still in the outbox belong in the export too
+        for f, pending in get_outbox().pending_by_file().items():
+            if f"{first:%Y%m%d}" <= f[:8] <= f"{last:%Y%m%d}":
+                known = {t.get("code") for t in days.get(f, [])}
+                days[f] = days.get(f, []) + [t for t in pending if t.get("code") not in known]
+        batch = [t for f in sorted(days) for t in days[f]]
+        if batch:
+            with get_telemetry().span("pdf.batch", receipts=len(batch)):
+                batch_pdf = render_receipts_pdf(batch, SHOP_NAME)
+            st.download_button(
+                f"⬇️ Download {len(batch)} Struk PDF",
+                batch_pdf,
+                file_name=f"struk_{first:%Y%m%d}_{last:%Y%m%d}.pdf",
+                mime="application/pdf"
+            )
         else:
-            st.info("Tidak ada transaksi pada sesi ini.")
+            st.info("Tidak ada transaksi pada rentang ini.")
+
+
+# --- EKSPOR DATA (owner mode) ---
+EXPORT_LABELS = {"lines": "Per item", "receipts": "Per nota"}
+
+if st.session_state["owner_mode"]:
+    st.subheader("📤 Ekspor Data")
+    today = now().date()
+    export_range_value = st.date_input("Rentang tanggal", value=(today.replace(day=1), today), key="export_range")
+    col_gran, col_fmt = st.columns(2)
+    granularity = col_gran.radio("Rincian", list(EXPORT_LABELS), format_func=EXPORT_LABELS.get, horizontal=True, key="export_granularity")
+    export_format = col_fmt.radio("Format", list(EXPORT_FORMATS), format_func=str.upper, horizontal=True, key="export_format")
+    if len(export_range_value) == 2 and st.button("Siapkan File Ekspor", key="export_btn"):
+        first, last = (f"{d:%Y%m%d}" for d in export_range_value)
+        # Rows stream day by day into a temporary file; only the finished file is handed to the browser
+        try:
+            export_file = tempfile.TemporaryFile()
+            skipped = []
+            with get_telemetry().span("export", format=export_format, granularity=granularity):
+                rows = export_range(get_storage(), first, last, granularity, export_format, export_file,
+                                    get_outbox().pending_by_file(), errors=skipped)
+            export_file.seek(0)
+            if skipped:
+                st.warning(f"{len(skipped)} nota tidak bisa dibaca dan tidak ikut diekspor.")
+            st.download_button(
+                f"⬇️ Download {rows} baris {export_format.upper()}",
+                export_file.read(),
+                file_name=export_filename(first, last, granularity, export_format),
+                mime=MIME_TYPES[export_format],
+            )
+        except Exception as e:
+            st.error(f"Gagal mengekspor data: {e}")
+
+
+# --- DIAGNOSTIK (owner mode) ---
+if st.session_state["owner_mode"]:
+    st.subheader("🩺 Diagnostik")
+    telemetry = get_telemetry()
+    col_on, col_clear = st.columns(2)
+    telemetry.enabled = col_on.toggle("Rekam waktu proses", value=telemetry.enabled, key="telemetry_enabled")
+    if col_clear.button("Kosongkan Data", key="telemetry_clear"):
+        telemetry.clear()
+    summary = telemetry.summary()
+    if telemetry.rate:
+        reset = datetime.datetime.fromtimestamp(telemetry.rate["reset"], TIMEZONE)
+        st.caption(f"Sisa kuota GitHub API: {telemetry.rate['remaining']} / {telemetry.rate['limit']} (reset {reset:%H:%M})")
+    if summary:
+        st.dataframe([
+            {"Proses": name, "Jumlah": row["count"], "Gagal": row["errors"], "p50 (ms)": row["p50_ms"],
+             "p90 (ms)": row["p90_ms"], "p99 (ms)": row["p99_ms"], "Maks (ms)": row["max_ms"]}
+            for name, row in summary.items()
+        ], hide_index=True, use_container_width=True)
+        col_jsonl, col_prom = st.columns(2)
+        col_jsonl.download_button("⬇️ Span (JSONL)", telemetry.to_jsonl(), file_name="spans.jsonl", mime="application/x-ndjson")
+        col_prom.download_button("⬇️ Metrik (Prometheus)", telemetry.to_prometheus(), file_name="metrics.prom", mime="text/plain")
     else:
-        st.info("Belum ada sesi harian yang tercatat.")
+        st.info("Belum ada data waktu proses.")
+
+
+# --- Cache status ---
+cache_stats = get_storage().stats()
+if cache_stats:
+    st.caption(f"Cache transaksi: {cache_stats['hits']} hit / {cache_stats['misses']} miss")
+if "commits" in cache_stats:
+    st.caption(f"Commit GitHub: {cache_stats['commits']} (konflik ref: {cache_stats['conflicts']})")
+receipt_cache = get_receipt_cache()
+st.caption(f"Cache struk PDF: {receipt_cache.hits} hit / {receipt_cache.misses} miss")
 
+# Reruns cut short by st.rerun()/st.stop() are not recorded
+get_telemetry().record("rerun", time.perf_counter() - RERUN_STARTED)
@@ -0,0 +1,9 @@
+# --- GLASS CASHIER CORE ---
+# Pricing, receipt numbering, storage, PDFs and summaries without Streamlit.
+# glass_cashier.py is the page on top of this package, `python -m glass_core`
+# the command line. Modules that need PyGithub, ReportLab or NumPy are not
+# imported here, so `import glass_core` stays cheap.
+
+from .helpers import rupiah, safe_item_fields
+from .numbering import ReceiptCounter, code_day_filename, generate_receipt_code
+from .pricing import add_to_cart, cart_line, line_price, make_transaction, merge_lines, unit_price
@@ -0,0 +1,200 @@
+import datetime
+import threading
+import numpy as np
+from .prefetch import prefetch
+from .records import parse_day
+from .storage import day_of
+
+
+# --- SALES ANALYTICS ---
+# One compact rollup per day, recomputed only when the day's source version
+# (blob SHA on GitHub) changes. Periods are answered by summing the stacked
+# per-day arrays with NumPy instead of re-reading any day file. Rollups are
+# persisted per month ("rollups.202508.json"), so a sale only rewrites the
+# current month.
+
+ROLLUPS_PREFIX = "rollups."
+ROLLUP_VERSION = 1
+
+ITEM_FIELDS = ("revenue", "pieces", "area_m2", "receipts")
+SLOT_FIELDS = ("revenue", "receipts", "pieces")  # per method and per hour
+
+def day_rollup(transactions, item_names):
+    """Aggregate one day of records. Items not in item_names land in a trailing "other" row."""
+    index = {name: i for i, name in enumerate(item_names)}
+    other = len(item_names)
+    items = np.zeros((other + 1, len(ITEM_FIELDS)))
+    hours = np.zeros((24, len(SLOT_FIELDS)))
+    methods = {}
+    for t in transactions:
+        rows = set()
+        for it in t.items:
+            row = index.get(it.name, other)
+            items[row, 0] += it.subtotal
+            items[row, 1] += it.qty
+            items[row, 2] += it.area_m2 * it.qty
+            rows.add(row)
+        for row in rows:
+            items[row, 3] += 1
+        slot = np.array([t.total, 1, t.total_qty])
+        try:
+            hours[int(t.datetime[11:13])] += slot
+        except ValueError:
+            pass
+        methods[t.method] = methods.get(t.method, np.zeros(len(SLOT_FIELDS))) + slot
+    return {"items": items, "hours": hours, "methods": methods}
+
+def _encode(rollup, version):
+    return {
+        "version": version,
+        "items": np.round(rollup["items"], 4).tolist(),
+        "hours": rollup["hours"].astype(int).tolist(),
+        "methods": {m: v.astype(int).tolist() for m, v in rollup["methods"].items()},
+    }
+
+def rollups_filename(month):
+    return f"{ROLLUPS_PREFIX}{month}.json"
+
+def _decode(doc):
+    return {
+        "items": np.array(doc["items"], dtype=float),
+        "hours": np.array(doc["hours"], dtype=float),
+        "methods": {m: np.array(v, dtype=float) for m, v in doc["methods"].items()},
+    }
+
+
+class RollupStore:
+    def __init__(self, storage, item_names):
+        self.storage = storage
+        self.item_names = list(item_names)
+        self._lock = threading.Lock()
+        self._days = None  # day filename -> (version, rollup)
+        self._cube = None
+
+    def _load(self, months):
+        days = {}
+        for month in sorted(months):
+            doc = self.storage.load_json(rollups_filename(month), None) or {}
+            if doc.get("format") != ROLLUP_VERSION or doc.get("item_names") != self.item_names:
+                # Layout changed (e.g. ITEMS edited): recompute the month
+                continue
+            days.update((day, (d["version"], _decode(d))) for day, d in doc.get("days", {}).items())
+        return days
+
+    def refresh(self):
+        """Bring rollups up to date with storage; returns the number of recomputed days."""
+        with self._lock:
+            versions = self.storage.day_versions()
+            if self._days is None:
+                self._days = self._load({day[:6] for day in versions})
+            stale = [day for day, v in versions.items() if self._days.get(day, (None,))[0] != v]
+            gone = [day for day in self._days if day not in versions]
+            for day, transactions in prefetch(self.storage.load_day, stale, quota=self.storage.quota):
+                self._days[day] = (versions[day], day_rollup(parse_day(day, transactions).transactions, self.item_names))
+            for day in gone:
+                del self._days[day]
+            if stale or gone:
+                self._cube = None
+            for month in sorted({day[:6] for day in stale + gone}):
+                self.storage.save_json(rollups_filename(month), {
+                    "format": ROLLUP_VERSION,
+                    "item_names": self.item_names,
+                    "days": {day: _encode(r, v) for day, (v, r) in sorted(self._days.items()) if day[:6] == month},
+                })
+            return len(stale)
+
+    def _cubes(self):
+        # Stack every day once: (days, rows, fields) arrays plus the sorted day keys
+        if self._cube is None:
+            days = sorted(self._days)
+            methods = sorted({m for _, r in self._days.values() for m in r["methods"]})
+            n_items = len(self.item_names) + 1
+            items = np.zeros((len(days), n_items, len(ITEM_FIELDS)))
+            hours = np.zeros((len(days), 24, len(SLOT_FIELDS)))
+            by_method = np.zeros((len(days), len(methods), len(SLOT_FIELDS)))
+            for d, day in enumerate(days):
+                r = self._days[day][1]
+                items[d] = r["items"]
+                hours[d] = r["hours"]
+                for m, name in enumerate(methods):
+                    if name in r["methods"]:
+                        by_method[d, m] = r["methods"][name]
+            keys = np.array([int(day_of(day)) for day in days], dtype=np.int64)
+            ordinals = np.array([datetime.date(k // 10000, k // 100 % 100, k % 100).toordinal() for k in keys.tolist()], dtype=np.int64)
+            self._cube = (keys, ordinals, items, hours, methods, by_method)
+        return self._cube
+
+    def period(self, first, last):
+        """Totals for days first..last (datetime.date, inclusive)."""
+        with self._lock:
+            keys, _, items, hours, methods, by_method = self._cubes()
+        lo = int(first.strftime("%Y%m%d"))
+        hi = int(last.strftime("%Y%m%d"))
+        mask = (keys >= lo) & (keys <= hi)
+        item_sum = items[mask].sum(axis=0)
+        hour_sum = hours[mask].sum(axis=0)
+        method_sum = by_method[mask].sum(axis=0)
+
+        def avg(revenue, count):
+            return np.divide(revenue, count, out=np.zeros_like(revenue), where=count > 0)
+
+        item_avg = avg(item_sum[:, 0], item_sum[:, 3])
+        hour_avg = avg(hour_sum[:, 0], hour_sum[:, 1])
+        method_avg = avg(method_sum[:, 0], method_sum[:, 1])
+        names = self.item_names + ["Lainnya"]
+        return {
+            "days": int(mask.sum()),
+            "receipts": int(method_sum[:, 1].sum()),
+            "revenue": int(method_sum[:, 0].sum()),
+            "pieces": int(item_sum[:, 1].sum()),
+            "area_m2": float(item_sum[:, 2].sum()),
+            "items": [
+                {"item": names[i], "revenue": int(row[0]), "pieces": int(row[1]), "area_m2": round(float(row[2]), 2),
+                 "receipts": int(row[3]), "avg_ticket": int(item_avg[i])}
+                for i, row in enumerate(item_sum) if row[3] or i < len(self.item_names)
+            ],
+            "methods": [
+                {"method": name, "revenue": int(method_sum[m, 0]), "receipts": int(method_sum[m, 1]),
+                 "pieces": int(method_sum[m, 2]), "avg_ticket": int(method_avg[m])}
+                for m, name in enumerate(methods) if method_sum[m, 1]
+            ],
+            "hours": [
+                {"hour": h, "revenue": int(row[0]), "receipts": int(row[1]), "pieces": int(row[2]), "avg_ticket": int(hour_avg[h])}
+                for h, row in enumerate(hour_sum) if row[1]
+            ],
+        }
+
+    def consumption(self, today, window_days, half_life_days):
+        """m² per day of each item row (item_names + "other") over the window_days before today.
+
+        An exponentially weighted mean over calendar days, yesterday weighing most
+        and days without sales counting as 0. A history shorter than the window
+        is averaged over the days it covers. One masked matrix product over the
+        stacked days, however many years they span.
+        """
+        with self._lock:
+            _, ordinals, items, _, _, _ = self._cubes()
+        rates = np.zeros(len(self.item_names) + 1)
+        if not len(ordinals):
+            return rates
+        ages = today.toordinal() - ordinals  # 1 = yesterday; today is still being sold
+        span = min(window_days, int(ages.max()))
+        if span < 1:
+            return rates
+        decay = 0.5 ** (1 / half_life_days)
+        mask = (ages >= 1) & (ages <= span)
+        weights = decay ** (ages[mask] - 1)
+        # Sum of the weights of every calendar day in the window, sales or not
+        total_weight = (1 - decay ** span) / (1 - decay)
+        return weights @ items[mask, :, 2] / total_weight
+
+def period_bounds(kind, anchor):
+    """(first, last) dates of the week/month/year containing anchor."""
+    if kind == "week":
+        first = anchor - datetime.timedelta(days=anchor.weekday())
+        return first, first + datetime.timedelta(days=6)
+    if kind == "month":
+        first = anchor.replace(day=1)
+        nxt = (first + datetime.timedelta(days=32)).replace(day=1)
+        return first, nxt - datetime.timedelta(days=1)
+    return anchor.replace(month=1, day=1), anchor.replace(month=12, day=31)
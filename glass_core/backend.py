@@ -0,0 +1,95 @@
+import os
+import threading
+from .config import COMMIT_BATCH_INTERVAL, GITHUB_REPO, MISSING_FILE_TTL, item_names
+from .ledger import LedgerStorage
+from .manifest import ManifestStorage
+from .storage import LocalJsonStorage, ShardedStorage, SqliteStorage
+
+# --- STORAGE FROM SETTINGS ---
+# The same secrets drive the Streamlit page (st.secrets) and the CLI
+# (.streamlit/secrets.toml plus environment variables). PyGithub is only
+# imported when the GitHub backend is actually opened.
+
+SECRETS_PATH = os.path.join(".streamlit", "secrets.toml")
+SETTING_KEYS = (
+    "GITHUB_TOKEN", "STORAGE_BACKEND", "STORAGE_PATH", "DAY_FORMAT", "COMMIT_BATCH_INTERVAL",
+    "TILL_ID", "TILLS", "TELEMETRY",
+)
+
+def load_settings(path=SECRETS_PATH, environ=os.environ):
+    # Environment variables win over the secrets file, like on the hosted app
+    settings = {}
+    if path and os.path.exists(path):
+        import tomllib
+        with open(path, "rb") as f:
+            settings.update(tomllib.load(f))
+    for key in SETTING_KEYS:
+        if environ.get(key):
+            settings[key] = environ[key]
+    if isinstance(settings.get("TILLS"), str):
+        settings["TILLS"] = [t.strip() for t in settings["TILLS"].split(",") if t.strip()]
+    return settings
+
+# --- REPO OVERRIDE ---
+# Harnesses run the page and the CLI against an in-process stand-in for the
+# GitHub repo (benchmarks.fake_repo.FakeRepo) by calling set_repo_override()
+# before the first storage is opened. Set from Python only, never from secrets.
+_repo_override = None
+
+def set_repo_override(repo):
+    global _repo_override
+    _repo_override = repo
+
+def repo_override():
+    return _repo_override
+
+def github_repo_getter(settings, repo_name=GITHUB_REPO):
+    # Connects on first use and then reuses the repo, like get_github_repo on the page
+    lock = threading.Lock()
+    repo = []
+
+    def get_repo():
+        with lock:
+            if not repo and _repo_override is not None:
+                repo.append(_repo_override)
+            if not repo:
+                token = str(settings.get("GITHUB_TOKEN", "")).strip()
+                if not token:
+                    raise RuntimeError("GitHub token is missing or invalid.")
+                from github import Github
+                repo.append(Github(token).get_repo(repo_name))
+            return repo[0]
+    return get_repo
+
+def till_id(settings):
+    return str(settings.get("TILL_ID", "")).strip()
+
+def open_storage(settings, get_repo=None):
+    # STORAGE_BACKEND: "github" (default), "local" or "sqlite"
+    backend = settings.get("STORAGE_BACKEND", "github")
+    if backend == "sqlite":
+        return LedgerStorage(SqliteStorage(settings.get("STORAGE_PATH", "transactions.db")))
+    # DAY_FORMAT: "jsonl" (default), "jsonl.gz" or "json"; files in any format stay readable
+    day_format = settings.get("DAY_FORMAT", "jsonl")
+    if backend == "local":
+        storage = LocalJsonStorage(settings.get("STORAGE_PATH", "data"), day_format, item_names())
+    else:
+        from .github_storage import GithubStorage
+        batch_interval = float(settings.get("COMMIT_BATCH_INTERVAL", COMMIT_BATCH_INTERVAL))
+        storage = GithubStorage(
+            get_repo or github_repo_getter(settings), missing_ttl=MISSING_FILE_TTL, day_format=day_format,
+            item_names=item_names(), batch_interval=batch_interval or None,
+        )
+    # manifest.json lists the days with their totals, kept current on every write
+    storage = ManifestStorage(storage)
+    till = till_id(settings)
+    if till:
+        storage = ShardedStorage(storage, till, settings.get("TILLS", []))
+    # Running day totals on top, so one ledger covers every till's shard
+    return LedgerStorage(storage)
+
+def unwrap(storage, *layers):
+    # The storage below the given wrapper layers, e.g. the stored files below the ledger and sharding
+    while isinstance(storage, layers):
+        storage = storage.inner
+    return storage
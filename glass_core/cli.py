@@ -0,0 +1,259 @@
+import argparse
+import datetime
+import json
+import sys
+from .backend import SECRETS_PATH, load_settings, open_storage
+from .config import SHOP_NAME, day_filename, now
+from .numbering import code_day_filename
+from .storage import day_of
+
+# --- COMMAND LINE ---
+# Nightly reports, exports, bulk reprints and imports without the Streamlit
+# page. Storage comes from the same secrets as the app unless --local,
+# --sqlite or --github picks one. Heavy modules (PyGithub, ReportLab) are
+# imported by the commands that need them, so `--help` or a report over local
+# files starts without them.
+#
+#   python -m glass_core report --local data --date 2025-08-23
+#   python -m glass_core report --from 2025-08-01 --to 2025-08-31 --json
+#   python -m glass_core export --sqlite transactions.db --from 2025-08-01 --format xlsx --out agustus.xlsx
+#   python -m glass_core reprint GL230825-005 GL230825-006 --out nota.pdf
+#   python -m glass_core import --sqlite transactions.db 2025*.json
+#   python -m glass_core ledger --from 2025-08-01 --to 2025-08-31 --repair
+#   python -m glass_core stock --add "Kaca Polos 5MM" 10
+
+EXPORT_FORMATS = ("csv", "xlsx", "parquet", "jsonl")
+
+def parse_date(text):
+    return datetime.date.fromisoformat(text)
+
+def date_range(args):
+    # --date D, or --from A [--to B]; today when nothing is given
+    if args.date:
+        return args.date, args.date
+    first = args.first or now().date()
+    return first, args.last or max(first, now().date())
+
+def storage_from_args(args):
+    settings = load_settings(args.secrets)
+    if args.local:
+        settings.update(STORAGE_BACKEND="local", STORAGE_PATH=args.local)
+    elif args.sqlite:
+        settings.update(STORAGE_BACKEND="sqlite", STORAGE_PATH=args.sqlite)
+    elif args.github:
+        settings["STORAGE_BACKEND"] = "github"
+    return open_storage(settings)
+
+def load_days(storage, first, last):
+    """Yield (day filename, transactions) for first..last, oldest first."""
+    if first == last:
+        yield day_filename(first), storage.load_day(day_filename(first))
+        return
+    yield from storage.iter_range(f"{first:%Y%m%d}", f"{last:%Y%m%d}")
+
+def write_pdf(path, data):
+    if hasattr(data, "getvalue"):
+        # render_summary_pdf hands back the buffer, the receipt renderers bytes
+        data = data.getvalue()
+    with open(path, "wb") as f:
+        f.write(data)
+    print(f"Wrote {path} ({len(data)} bytes)", file=sys.stderr)
+
+# --- commands ---
+def load_records(storage, first, last):
+    """Transaction records for first..last; entries that do not parse are reported on stderr."""
+    from .records import parse_day
+    records = []
+    for filename, transactions in load_days(storage, first, last):
+        day = parse_day(filename, transactions)
+        for error in day.errors:
+            print(f"Skipped {error}", file=sys.stderr)
+        records.extend(day.transactions)
+    return records
+
+def cmd_report(args, storage):
+    from .summary import day_report, report_lines, summary_lines
+    first, last = date_range(args)
+    transactions = load_records(storage, first, last)
+    report = day_report(transactions)
+    title = f"Laporan {first:%d-%m-%Y}" if first == last else f"Laporan {first:%d-%m-%Y} s/d {last:%d-%m-%Y}"
+    if args.json:
+        print(json.dumps({"from": first.isoformat(), "to": last.isoformat(), **report}, ensure_ascii=False, indent=2))
+    else:
+        print("\n".join(report_lines(report, title)))
+    if args.pdf:
+        from .receipts import render_summary_pdf
+        # One day gets the same per-receipt summary as "Selesaikan Sesi"
+        lines = summary_lines(transactions) if first == last else report_lines(report, title)[1:]
+        write_pdf(args.pdf, render_summary_pdf(title, lines))
+    return 0
+
+def cmd_export(args, storage):
+    from .export import export_range
+    first, last = date_range(args)
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try:
+        if args.format == "jsonl":
+            # Raw receipts, one JSON document per line
+            count = 0
+            for filename, transactions in load_days(storage, first, last):
+                for t in transactions:
+                    out.write((json.dumps({"day": day_of(filename), **t}, ensure_ascii=False) + "\n").encode())
+                    count += 1
+        else:
+            errors = []
+            count = export_range(storage, f"{first:%Y%m%d}", f"{last:%Y%m%d}", args.granularity, args.format, out, errors=errors)
+            for error in errors:
+                print(f"Skipped unreadable receipt {error}", file=sys.stderr)
+    finally:
+        if args.out:
+            out.close()
+    print(f"Exported {count} rows", file=sys.stderr)
+    return 0
+
+def cmd_reprint(args, storage):
+    from .receipts import render_receipts_pdf
+    wanted = list(dict.fromkeys(code.upper() for code in args.codes))
+    if args.codes and (args.date or args.first):
+        print("Give receipt codes or a date range, not both", file=sys.stderr)
+        return 2
+    if args.codes:
+        files = sorted({code_day_filename(code) for code in wanted} - {None})
+        found = {}
+        for filename in files:
+            for t in storage.load_day(filename):
+                if str(t.get("code", "")).upper() in wanted:
+                    found[str(t["code"]).upper()] = t
+        missing = [code for code in wanted if code not in found]
+        if missing:
+            print(f"Receipts not found: {', '.join(missing)}", file=sys.stderr)
+            return 1
+        transactions = [found[code] for code in wanted]
+    else:
+        first, last = date_range(args)
+        transactions = [t for _, day in load_days(storage, first, last) for t in day]
+        if not transactions:
+            print("No receipts in that range", file=sys.stderr)
+            return 1
+    write_pdf(args.out, render_receipts_pdf(transactions, SHOP_NAME))
+    return 0
+
+def cmd_import(args, storage):
+    from .backend import unwrap
+    from .ledger import LedgerStorage
+    from .storage import import_json_files
+    # Straight into the backend (SQLite's bulk path), then the day ledgers recounted once per day
+    names = import_json_files(unwrap(storage, LedgerStorage), args.paths)
+    if isinstance(storage, LedgerStorage):
+        for name in names:
+            storage.rebuild(name)
+    print(f"Imported {len(names)} day files")
+    return 0
+
+def cmd_ledger(args, storage):
+    # Day ledgers against a recount of their receipts
+    first, last = date_range(args)
+    days = [f for f in storage.list_days() if f"{first:%Y%m%d}" <= day_of(f) <= f"{last:%Y%m%d}"]
+    bad = 0
+    for filename in sorted(days):
+        diffs = storage.check(filename, repair=args.repair)
+        if diffs:
+            bad += 1
+            fixed = " (rebuilt)" if args.repair else ""
+            print(f"{day_of(filename)}: {len(diffs)} differences{fixed}")
+            for field, (stored, rebuilt) in diffs.items():
+                print(f"  {field}: ledger {stored}, receipts {rebuilt}")
+        else:
+            print(f"{day_of(filename)}: OK")
+    return 1 if bad and not args.repair else 0
+
+def cmd_stock(args, storage):
+    # Stock left per glass type and when it runs out at the recent rate of sales
+    from .analytics import RollupStore
+    from .config import FORECAST_HALF_LIFE_DAYS, FORECAST_WINDOW_DAYS, item_names
+    from .stock import forecast, load_stock, restock
+    names = item_names()
+    for change, count in ((args.add, False), (args.count, True)):
+        if change:
+            name, sheets = change
+            if name not in names:
+                print(f"Unknown glass type {name!r}; one of: {', '.join(names)}", file=sys.stderr)
+                return 2
+            if not sheets.isdigit():
+                print(f"SHEETS must be a whole number, not {sheets!r}", file=sys.stderr)
+                return 2
+            restock(storage, name, int(sheets), now(), count=count)
+    rollups = RollupStore(storage, names)
+    rollups.refresh()
+    today = now().date()
+    rows = forecast(load_stock(storage), rollups.consumption(today, FORECAST_WINDOW_DAYS, FORECAST_HALF_LIFE_DAYS), names, today)
+    if args.json:
+        print(json.dumps(rows, default=str, indent=2))
+        return 0
+    if not rows:
+        print("No glass type is stocked yet; add sheets with --add NAME SHEETS")
+    for row in rows:
+        out = "no sales in the window" if row["days_left"] is None else f"out in {row['days_left']:g} days ({row['stockout']})"
+        low = "  LOW" if row["low"] else ""
+        print(f"{row['item']}: {row['area_m2']:.2f} m², {row['sheets']:g} sheets, "
+              f"{row['rate_m2_day']:.2f} m²/day, {out}{low}")
+    return 0
+
+# --- parser ---
+def add_range(parser):
+    parser.add_argument("--date", type=parse_date, metavar="YYYY-MM-DD", help="a single day (default: today)")
+    parser.add_argument("--from", dest="first", type=parse_date, metavar="YYYY-MM-DD")
+    parser.add_argument("--to", dest="last", type=parse_date, metavar="YYYY-MM-DD", help="default: today")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m glass_core", description="Glass Cashier without the Streamlit page")
+    parser.add_argument("--secrets", default=SECRETS_PATH, help=f"secrets file with the app settings (default: {SECRETS_PATH})")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--local", metavar="DIR", help="directory of day files")
+    source.add_argument("--sqlite", metavar="PATH", help="SQLite database")
+    source.add_argument("--github", action="store_true", help="GitHub repo, token from the secrets or GITHUB_TOKEN")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report = commands.add_parser("report", help="totals per payment method and glass type")
+    add_range(report)
+    report.add_argument("--json", action="store_true", help="machine-readable output")
+    report.add_argument("--pdf", metavar="PATH", help="also write the summary PDF")
+    report.set_defaults(run=cmd_report)
+
+    export = commands.add_parser("export", help="receipts or cart lines as CSV, XLSX, Parquet or JSON lines")
+    add_range(export)
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    export.add_argument("--granularity", choices=("receipts", "lines"), default="lines",
+                        help="one row per receipt or per cart line (jsonl is always per receipt)")
+    export.add_argument("--out", metavar="PATH", help="default: standard output")
+    export.set_defaults(run=cmd_export)
+
+    reprint = commands.add_parser("reprint", help="receipt PDFs by code or for a date range")
+    reprint.add_argument("codes", nargs="*", metavar="CODE")
+    add_range(reprint)
+    reprint.add_argument("--out", metavar="PATH", required=True)
+    reprint.set_defaults(run=cmd_reprint)
+
+    imports = commands.add_parser("import", help="load YYYYMMDD.json files into the configured storage")
+    imports.add_argument("paths", nargs="+", metavar="DAYFILE")
+    imports.set_defaults(run=cmd_import)
+
+    ledger = commands.add_parser("ledger", help="check the running day ledgers against the receipts")
+    add_range(ledger)
+    ledger.add_argument("--repair", action="store_true", help="rebuild ledgers that differ")
+    ledger.set_defaults(run=cmd_ledger)
+
+    stock = commands.add_parser("stock", help="glass left per type and the days until it runs out")
+    stock.add_argument("--add", nargs=2, metavar=("NAME", "SHEETS"), help="restock whole sheets of a glass type")
+    stock.add_argument("--count", nargs=2, metavar=("NAME", "SHEETS"), help="set a glass type to the sheets on the rack")
+    stock.add_argument("--json", action="store_true", help="machine-readable output")
+    stock.set_defaults(run=cmd_stock)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.run(args, storage_from_args(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import datetime
+from zoneinfo import ZoneInfo
+
+# --- CONFIGURATION ---
+GITHUB_REPO = "Saichizu/glass-cashier"
+SHOP_NAME = "Glass Cashier App"  # shown at top of receipt
+TIMEZONE = ZoneInfo("Asia/Shanghai")
+
+# --- ITEMS ---
+ITEMS = [
+    {"name": "Kaca Polos 5MM", "base_price": 190000},
+    {"name": "Kaca Reben 5MM", "base_price": 200000},
+    {"name": "Kaca Reben 3MM", "base_price": 160000},
+    {"name": "Kaca Polos 3MM", "base_price": 150000},
+    {"name": "Kaca Cermin", "base_price": 240000},
+    {"name": "Kaca Polos Utuh", "base_price": 140000},
+    {"name": "Kaca Reben Utuh", "base_price": 150000},
+]
+
+SERVICE_FEE = 500
+PAYMENT_METHODS = ["Cash", "Transfer"]
+
+# --- STORAGE ---
+MISSING_FILE_TTL = 30  # seconds a "day file not found" answer is trusted before asking GitHub again
+COMMIT_BATCH_INTERVAL = 1.0  # seconds GitHub writes are collected into one commit; 0 commits each write alone
+
+# --- STOCK ---
+LOW_STOCK_SHEETS = 2  # default alert level per glass type, in whole sheets
+FORECAST_WINDOW_DAYS = 56  # days of sales the consumption rate is taken from
+FORECAST_HALF_LIFE_DAYS = 14  # a day's sales this many days older count half
+
+def item_names():
+    return [item["name"] for item in ITEMS]
+
+def now():
+    return datetime.datetime.now(TIMEZONE)
+
+def day_filename(date):
+    # datetime.date -> "20250822.json"
+    return f"{date:%Y%m%d}.json"
@@ -0,0 +1,179 @@
+import itertools
+import math
+import random
+import time
+from .helpers import safe_item_fields
+
+# --- CUTTING-STOCK OPTIMIZER ---
+# 2D guillotine packing of cart pieces onto stock glass sheets. Every free
+# region is split with one straight edge-to-edge cut, the only kind of cut a
+# glass table can make. All sizes are in cm, like width_cm/height_cm.
+
+DEFAULT_SHEET = (213.4, 152.4)  # 84" x 60" float glass sheet
+DEFAULT_KERF = 0.2
+EPS = 1e-6
+STALE_RESTARTS = 30  # mode="best" stops after this many restarts in a row without saving a sheet
+
+SORT_KEYS = {
+    "area": lambda p: p[0] * p[1],
+    "long_side": lambda p: max(p[0], p[1]),
+    "perimeter": lambda p: p[0] + p[1],
+    "width": lambda p: p[0],
+    "height": lambda p: p[1],
+}
+
+FIT_RULES = {
+    "best_area": lambda fw, fh, w, h: (fw * fh - w * h, min(fw - w, fh - h)),
+    "best_short_side": lambda fw, fh, w, h: (min(fw - w, fh - h), max(fw - w, fh - h)),
+    "best_long_side": lambda fw, fh, w, h: (max(fw - w, fh - h), min(fw - w, fh - h)),
+}
+
+# True means cut horizontally first: the top leftover keeps the full free width
+SPLIT_RULES = {
+    "shorter_leftover": lambda fw, fh, w, h: (fw - w) <= (fh - h),
+    "longer_leftover": lambda fw, fh, w, h: (fw - w) > (fh - h),
+    "min_area": lambda fw, fh, w, h: w * (fh - h) > (fw - w) * h,
+    "max_area": lambda fw, fh, w, h: w * (fh - h) <= (fw - w) * h,
+    "shorter_axis": lambda fw, fh, w, h: fw <= fh,
+    "longer_axis": lambda fw, fh, w, h: fw > fh,
+}
+
+def expand_pieces(lines):
+    """Cart/transaction items -> [(w, h, label)], one entry per piece."""
+    pieces = []
+    for it in lines:
+        name, w, h, qty, unit_price, subtotal, area_m2 = safe_item_fields(it)
+        w, h = float(w or 0), float(h or 0)
+        if w > 0 and h > 0:
+            pieces.extend([(w, h, f"{name} {w:g}x{h:g}")] * qty)
+    return pieces
+
+def _pack(pieces, sheet, kerf, rotate, fit, split):
+    sw, sh = sheet
+    sheets = []  # [{"free": [(x, y, w, h)], "placed": [...]}]
+    unplaced = []
+    for w, h, label in pieces:
+        best = None
+        for s_idx, s in enumerate(sheets):
+            for f_idx, (fx, fy, fw, fh) in enumerate(s["free"]):
+                for pw, ph, rot in ((w, h, False), (h, w, True)) if rotate and w != h else ((w, h, False),):
+                    if pw <= fw + EPS and ph <= fh + EPS:
+                        score = fit(fw, fh, pw, ph)
+                        if best is None or score < best[0]:
+                            best = (score, s_idx, f_idx, pw, ph, rot)
+        if best is None:
+            fits = [(pw, ph, rot) for pw, ph, rot in ((w, h, False), (h, w, True)) if (rot is False or rotate) and pw <= sw + EPS and ph <= sh + EPS]
+            if not fits:
+                unplaced.append({"w": w, "h": h, "label": label})
+                continue
+            sheets.append({"free": [(0.0, 0.0, sw, sh)], "placed": []})
+            pw, ph, rot = min(fits, key=lambda f: fit(sw, sh, f[0], f[1]))
+            best = (None, len(sheets) - 1, 0, pw, ph, rot)
+        _, s_idx, f_idx, pw, ph, rot = best
+        s = sheets[s_idx]
+        fx, fy, fw, fh = s["free"].pop(f_idx)
+        s["placed"].append({"x": fx, "y": fy, "w": pw, "h": ph, "rotated": rot, "label": label})
+        # Guillotine split of what is left of the free rectangle, minus the blade kerf
+        if split(fw, fh, pw, ph):
+            right = (fx + pw + kerf, fy, fw - pw - kerf, ph)
+            top = (fx, fy + ph + kerf, fw, fh - ph - kerf)
+        else:
+            right = (fx + pw + kerf, fy, fw - pw - kerf, fh)
+            top = (fx, fy + ph + kerf, pw, fh - ph - kerf)
+        s["free"].extend(r for r in (right, top) if r[2] > EPS and r[3] > EPS)
+    return [s["placed"] for s in sheets], unplaced
+
+def _plan(layouts, unplaced, sheet, kerf, mode, elapsed):
+    used = sum(p["w"] * p["h"] for placed in layouts for p in placed)
+    stock = len(layouts) * sheet[0] * sheet[1]
+    return {
+        "sheet": sheet,
+        "kerf": kerf,
+        "mode": mode,
+        "sheets": layouts,
+        "sheet_count": len(layouts),
+        "pieces": sum(len(p) for p in layouts),
+        "used_m2": used / 10000.0,
+        "waste_pct": round(100.0 * (1 - used / stock), 2) if stock else 0.0,
+        "unplaced": unplaced,
+        "seconds": elapsed,
+    }
+
+def _score(layouts):
+    # Fewer sheets first, then the emptiest last sheet (its offcut is the most reusable)
+    last = sum(p["w"] * p["h"] for p in layouts[-1]) if layouts else 0
+    return (len(layouts), last)
+
+def optimize(pieces, sheet=DEFAULT_SHEET, kerf=DEFAULT_KERF, rotate=True, mode="fast", time_budget=0.3, seed=0):
+    """Pack [(w, h, label)] onto as few sheets as possible.
+
+    mode="fast": one greedy pass (largest area first, best area fit, split on
+    the shorter leftover axis). mode="best": every combination of sort order,
+    fit rule and split rule, then shuffled restarts until time_budget runs out
+    or STALE_RESTARTS restarts in a row use no fewer sheets.
+    """
+    started = time.perf_counter()
+    order = sorted(pieces, key=SORT_KEYS["area"], reverse=True)
+    best = _pack(order, sheet, kerf, rotate, FIT_RULES["best_area"], SPLIT_RULES["shorter_leftover"])
+    # No layout can use fewer sheets than the total area needs
+    lower_bound = math.ceil(sum(w * h for w, h, _ in pieces) / (sheet[0] * sheet[1]) - EPS)
+    if mode == "best" and len(best[0]) > lower_bound:
+        deadline = started + time_budget
+        combos = list(itertools.product(SORT_KEYS.values(), FIT_RULES.values(), SPLIT_RULES.values()))
+        for key, fit, split in combos:
+            if time.perf_counter() > deadline or len(best[0]) <= lower_bound:
+                break
+            result = _pack(sorted(pieces, key=key, reverse=True), sheet, kerf, rotate, fit, split)
+            if _score(result[0]) < _score(best[0]):
+                best = result
+        rng = random.Random(seed)
+        stale = 0
+        while time.perf_counter() < deadline and len(order) > 1 and len(best[0]) > lower_bound and stale < STALE_RESTARTS:
+            # Swap a few neighbours in the size order and try random rules
+            trial = list(order)
+            for _ in range(max(1, len(trial) // 10)):
+                i = rng.randrange(len(trial) - 1)
+                trial[i], trial[i + 1] = trial[i + 1], trial[i]
+            fit = rng.choice(list(FIT_RULES.values()))
+            split = rng.choice(list(SPLIT_RULES.values()))
+            result = _pack(trial, sheet, kerf, rotate, fit, split)
+            stale = 0 if len(result[0]) < len(best[0]) else stale + 1
+            if _score(result[0]) < _score(best[0]):
+                best = result
+                order = trial
+    return _plan(best[0], best[1], sheet, kerf, mode, time.perf_counter() - started)
+
+def optimize_by_type(lines, sheets=None, kerf=DEFAULT_KERF, rotate=True, mode="fast", time_budget=0.3):
+    """Cart lines or a day's items grouped per glass type -> {item name: plan}.
+
+    time_budget is shared by all types, so mode="best" stays interactive.
+    """
+    groups = {}
+    for it in lines:
+        groups.setdefault(safe_item_fields(it)[0], []).append(it)
+    sheets = sheets or {}
+    budget = time_budget / max(1, len(groups))
+    return {
+        name: optimize(expand_pieces(items), sheets.get(name, DEFAULT_SHEET), kerf, rotate, mode, budget)
+        for name, items in groups.items()
+    }
+
+def sheet_svg(placed, sheet, width_px=360):
+    # Scaled drawing of one sheet layout
+    sw, sh = sheet
+    scale = width_px / sw
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width_px}" height="{sh * scale:.0f}" viewBox="0 0 {sw} {sh}">',
+        f'<rect x="0" y="0" width="{sw}" height="{sh}" fill="#eee" stroke="#555" stroke-width="0.5"/>',
+    ]
+    for p in placed:
+        parts.append(
+            f'<rect x="{p["x"]:.2f}" y="{p["y"]:.2f}" width="{p["w"]:.2f}" height="{p["h"]:.2f}"'
+            ' fill="#9cd3f0" stroke="#1b6f9e" stroke-width="0.4"/>'
+        )
+        parts.append(
+            f'<text x="{p["x"] + p["w"] / 2:.2f}" y="{p["y"] + p["h"] / 2:.2f}" font-size="{min(8, p["h"] / 3, p["w"] / 6):.2f}"'
+            f' text-anchor="middle" dominant-baseline="middle">{p["w"]:g}x{p["h"]:g}</text>'
+        )
+    parts.append("</svg>")
+    return "".join(parts)
@@ -0,0 +1,182 @@
+import gzip
+import json
+import math
+import struct
+
+
+# --- DAY FILE FORMATS ---
+# "json"      the original indent=2 list
+# "jsonl"     a header line with the item name table, then one minified
+#             transaction per line; item names are indexes into the table and
+#             derived fields are left out when they recompute exactly
+# "jsonl.gz"  the same, gzip'd
+# loads_day() sniffs the content, so file names stay YYYYMMDD.json and every
+# reader handles old and new files alike.
+
+DAY_FORMATS = ("json", "jsonl", "jsonl.gz")
+HEADER_KEY = "glass_day"
+HEADER_VERSION = 1
+COMPACT = (",", ":")
+
+TRANSACTION_ORDER = ("code", "datetime", "items", "method", "total_qty", "total")
+ITEM_ORDER = ("item", "width_cm", "height_cm", "area_m2", "unit_price", "qty", "price")
+
+def _derived_item(it):
+    # Fields the cashier computes from the others, exactly as the page does
+    derived = {}
+    w, h = it.get("width_cm"), it.get("height_cm")
+    if isinstance(w, (int, float)) and isinstance(h, (int, float)):
+        derived["area_m2"] = (w / 100) * (h / 100)
+    unit_price, qty = it.get("unit_price"), it.get("qty")
+    if isinstance(unit_price, int) and isinstance(qty, int):
+        derived["price"] = math.ceil((unit_price * qty) / 1000) * 1000
+    return derived
+
+def _derived_transaction(t):
+    items = t.get("items", [])
+    derived = {}
+    if all(isinstance(it.get("qty"), int) for it in items):
+        derived["total_qty"] = sum(it["qty"] for it in items)
+    if all(isinstance(it.get("price"), int) for it in items):
+        derived["total"] = sum(it["price"] for it in items)
+    return derived
+
+def _ordered(record, order, derived):
+    # Canonical key order, dropped fields filled back in, unknown keys last
+    out = {}
+    for key in order:
+        if key in record:
+            out[key] = record[key]
+        elif key in derived:
+            out[key] = derived[key]
+    out.update((k, v) for k, v in record.items() if k not in out)
+    return out
+
+def _expand(record, names):
+    if "$" in record:
+        return record["$"]
+    items = []
+    for it in record.get("items", []):
+        it = dict(it)
+        if isinstance(it.get("item"), int) and 0 <= it["item"] < len(names):
+            it["item"] = names[it["item"]]
+        items.append(_ordered(it, ITEM_ORDER, _derived_item(it)))
+    t = dict(record, items=items) if "items" in record else dict(record)
+    return _ordered(t, TRANSACTION_ORDER, _derived_transaction(t))
+
+def _compact(t, index, names):
+    record = {k: v for k, v in t.items() if k not in ("total_qty", "total")}
+    if "items" in t:
+        items = []
+        for it in t["items"]:
+            derived = _derived_item(it)
+            c = {k: v for k, v in it.items() if k not in derived}
+            if isinstance(c.get("item"), str) and c["item"] in index:
+                c["item"] = index[c["item"]]
+            items.append(c)
+        record["items"] = items
+    # Drop nothing unless it comes back byte for byte, key order included
+    if json.dumps(_expand(record, names)) != json.dumps(t):
+        return {"$": t}
+    return record
+
+def dumps_day(transactions, day_format="jsonl", item_names=()):
+    if day_format == "json":
+        return json.dumps(transactions, indent=2).encode()
+    names = list(item_names)
+    index = {name: i for i, name in enumerate(names)}
+    lines = [json.dumps({HEADER_KEY: HEADER_VERSION, "items": names}, separators=COMPACT)]
+    lines.extend(json.dumps(_compact(t, index, names), separators=COMPACT) for t in transactions)
+    data = ("\n".join(lines) + "\n").encode()
+    if day_format == "jsonl.gz":
+        # mtime=0 keeps identical days byte-identical, so unchanged days keep their SHA
+        return gzip.compress(data, mtime=0)
+    return data
+
+def loads_day(data):
+    """Transactions from a day file in any of DAY_FORMATS."""
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    text = data.decode()
+    stripped = text.lstrip()
+    if not stripped:
+        return []
+    if stripped[0] == "[":
+        return json.loads(text)
+    lines = [line for line in text.splitlines() if line.strip()]
+    header = json.loads(lines[0])
+    if HEADER_KEY not in header:
+        return [json.loads(line) for line in lines]
+    names = header.get("items", [])
+    return [_expand(json.loads(line), names) for line in lines[1:]]
+
+
+# --- MONTHLY ARCHIVES ---
+# "202508.archive" holds the closed days of a month:
+#   b"GLARC1\n" | 4-byte big-endian table length | JSON offset table | day blobs
+# The table maps each day filename to [offset, length] of its own gzip'd JSONL
+# blob, so one day is read and decoded without touching the rest of the month.
+
+ARCHIVE_MAGIC = b"GLARC1\n"
+ARCHIVE_SUFFIX = ".archive"
+
+def archive_filename(filename):
+    return f"{filename[:6]}{ARCHIVE_SUFFIX}"
+
+def is_archive_filename(name):
+    return name.endswith(ARCHIVE_SUFFIX) and len(name) == 6 + len(ARCHIVE_SUFFIX) and name[:6].isdigit()
+
+def pack_archive(days, item_names=()):
+    # {day filename: transactions} -> archive bytes
+    blobs = []
+    table = {}
+    offset = 0
+    for filename in sorted(days):
+        blob = dumps_day(days[filename], "jsonl.gz", item_names)
+        table[filename] = [offset, len(blob)]
+        blobs.append(blob)
+        offset += len(blob)
+    head = json.dumps(table, separators=COMPACT).encode()
+    return ARCHIVE_MAGIC + struct.pack(">I", len(head)) + head + b"".join(blobs)
+
+def _table(head):
+    if head[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+        raise ValueError("not a day archive")
+    (size,) = struct.unpack(">I", head[len(ARCHIVE_MAGIC):len(ARCHIVE_MAGIC) + 4])
+    return size, len(ARCHIVE_MAGIC) + 4 + size
+
+
+class Archive:
+    """Parsed offset table over archive bytes already in memory."""
+
+    def __init__(self, data):
+        size, start = _table(data)
+        self.days = json.loads(data[start - size:start])
+        self._data = data
+        self._start = start
+
+    def __deepcopy__(self, memo):
+        # Immutable once parsed; cached copies can share it
+        return self
+
+    def load(self, filename):
+        if filename not in self.days:
+            return None
+        offset, length = self.days[filename]
+        return loads_day(self._data[self._start + offset:self._start + offset + length])
+
+    def all_days(self):
+        return {filename: self.load(filename) for filename in self.days}
+
+def read_archive_table(f):
+    # Offset table from an open archive file, without reading the day blobs
+    size, start = _table(f.read(len(ARCHIVE_MAGIC) + 4))
+    return json.loads(f.read(size)), start
+
+def read_archived_day(f, filename):
+    table, start = read_archive_table(f)
+    if filename not in table:
+        return None
+    offset, length = table[filename]
+    f.seek(start + offset)
+    return loads_day(f.read(length))
@@ -0,0 +1,137 @@
+import collections
+import itertools
+import queue
+import socket
+import textwrap
+import threading
+import time
+from .receipts import receipt_rows
+
+# --- ESC/POS RECEIPTS ---
+# Raw printer bytes for the 76 mm thermal printer, from the same receipt_rows()
+# layout the PDF uses. Output is deterministic, so it can be diffed against
+# golden files without a printer attached (python -m benchmarks.check_escpos).
+
+COLUMNS = 42  # Font A on 76 mm paper
+ENCODING = "cp858"  # has "×" and the accented Latin letters
+
+ESC = b"\x1b"
+GS = b"\x1d"
+INIT = ESC + b"@"
+CODEPAGE = ESC + b"t\x13"  # PC858
+ALIGN_LEFT = ESC + b"a\x00"
+ALIGN_CENTER = ESC + b"a\x01"
+BOLD_ON = ESC + b"E\x01"
+BOLD_OFF = ESC + b"E\x00"
+FEED_AND_CUT = ESC + b"d\x04" + GS + b"V\x01"
+
+def _text_lines(left, right, columns):
+    avail = max(columns - (len(right) + 1 if right else 0), 8)
+    parts = textwrap.wrap(left, avail) or [""]
+    lines = [parts[0].ljust(avail) + (" " + right if right else "")]
+    lines.extend(parts[1:])
+    return lines
+
+def render_escpos(transaction, shop_name, columns=COLUMNS, cut=True):
+    out = [INIT, CODEPAGE]
+    for kind, left, right in receipt_rows(transaction, shop_name):
+        if kind == "title":
+            out += [ALIGN_CENTER, BOLD_ON, left.encode(ENCODING, "replace"), b"\n", BOLD_OFF, ALIGN_LEFT]
+        elif kind == "rule":
+            out.append(b"-" * columns + b"\n")
+        else:
+            for line in _text_lines(left, right, columns):
+                out.append(line.rstrip().encode(ENCODING, "replace") + b"\n")
+    if cut:
+        out.append(FEED_AND_CUT)
+    return b"".join(out)
+
+
+# --- SINKS ---
+class FileSink:
+    """Appends to a file or a device node such as /dev/usb/lp0."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, data):
+        with open(self.path, "ab") as f:
+            f.write(data)
+            f.flush()
+
+class SocketSink:
+    """Raw TCP printing, port 9100 on most network thermal printers."""
+
+    def __init__(self, host, port=9100, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def write(self, data):
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as s:
+            s.sendall(data)
+
+def sink_from_url(url):
+    # "tcp://192.168.1.50:9100", "file:///tmp/printer.bin" or a plain path
+    if url.startswith("tcp://"):
+        host, _, port = url[len("tcp://"):].partition(":")
+        return SocketSink(host, int(port or 9100))
+    if url.startswith("file://"):
+        return FileSink(url[len("file://"):])
+    return FileSink(url)
+
+
+class PrintQueue:
+    """Background printing so a slow or offline printer never blocks a rerun."""
+
+    def __init__(self, sink, retries=2, retry_delay=1.0, history=200):
+        self.sink = sink
+        self.retries = retries
+        self.retry_delay = retry_delay  # seconds before the first retry, doubled for each next one
+        self.history = history  # newest jobs whose status is kept
+        self.last_error = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._status = collections.OrderedDict()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="print-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, data):
+        with self._lock:
+            job = next(self._ids)
+            self._status[job] = "queued"
+            while len(self._status) > self.history:
+                self._status.popitem(last=False)
+        self._queue.put((job, data))
+        return job
+
+    def status(self, job):
+        # "queued", "retrying n/N", "printed" or "failed" (all attempts used);
+        # None once the job is older than the last `history` ones
+        with self._lock:
+            return self._status.get(job)
+
+    def _set(self, job, status):
+        with self._lock:
+            if job in self._status:
+                self._status[job] = status
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            job, data = self._queue.get()
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    # A printer that is off or out of paper needs a moment, not a burst of retries
+                    time.sleep(self.retry_delay * 2 ** (attempt - 1))
+                try:
+                    self.sink.write(data)
+                    self._set(job, "printed")
+                    self.last_error = None
+                    break
+                except Exception as e:
+                    self.last_error = str(e)
+                    self._set(job, f"retrying {attempt + 1}/{self.retries}" if attempt < self.retries else "failed")
@@ -0,0 +1,193 @@
+import csv
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+from .records import parse_day
+from .storage import day_of
+
+# --- STREAMING EXPORT ---
+# fetch day -> normalize to rows -> write rows / row groups, one generator
+# feeding the next. Only the days in the prefetch window and one row group are
+# held at a time, so a month and five years export in the same memory.
+#
+#   rows = export_rows(storage.iter_range("20250801", "20250831"), "lines")
+#   write_export(rows, "lines", "xlsx", out)
+#
+# XLSX is written straight into the zip as one worksheet of inline strings,
+# so there is no spreadsheet dependency. Parquet needs pyarrow (shipped with
+# Streamlit).
+
+GRANULARITIES = ("receipts", "lines")
+EXPORT_FORMATS = ("csv", "xlsx", "parquet")
+MIME_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+ROW_GROUP_SIZE = 10000
+
+# (column, parquet type) per granularity
+COLUMNS = {
+    "receipts": (
+        ("day", "string"), ("code", "string"), ("datetime", "string"), ("method", "string"),
+        ("lines", "int64"), ("total_qty", "int64"), ("area_m2", "float64"), ("total", "int64"),
+    ),
+    "lines": (
+        ("day", "string"), ("code", "string"), ("datetime", "string"), ("method", "string"),
+        ("item", "string"), ("width_cm", "float64"), ("height_cm", "float64"), ("area_m2", "float64"),
+        ("unit_price", "int64"), ("qty", "int64"), ("price", "int64"),
+    ),
+}
+
+def column_names(granularity):
+    return [name for name, _ in COLUMNS[granularity]]
+
+# --- normalize ---
+def parsed_days(days, errors=None):
+    # (day, records) per day; receipts that do not parse are left out and, given a list, added to errors
+    for filename, transactions in days:
+        records = parse_day(filename, transactions)
+        if errors is not None:
+            errors.extend(records.errors)
+        yield day_of(filename), records.transactions
+
+def receipt_rows(days, errors=None):
+    for day, records in parsed_days(days, errors):
+        for t in records:
+            yield (day, t.code, t.datetime, t.method, len(t.items), t.total_qty, t.area_m2, t.total)
+
+def line_rows(days, errors=None):
+    for day, records in parsed_days(days, errors):
+        for t in records:
+            for it in t.items:
+                yield (day, t.code, t.datetime, t.method, it.name,
+                       it.width_cm, it.height_cm, round(it.area_m2, 4), it.unit_price, it.qty, it.subtotal)
+
+def export_rows(days, granularity, errors=None):
+    """Rows of the given granularity from an iterable of (day filename, transactions)."""
+    return receipt_rows(days, errors) if granularity == "receipts" else line_rows(days, errors)
+
+def with_pending(days, pending_by_file, first, last):
+    # Merge sales still waiting in the outbox into their days, by receipt code;
+    # days that only exist in the outbox come after the stored ones
+    pending = {f: p for f, p in pending_by_file.items() if first <= day_of(f) <= last}
+    for filename, transactions in days:
+        extra = pending.pop(filename, [])
+        known = {t.get("code") for t in transactions}
+        yield filename, transactions + [t for t in extra if t.get("code") not in known]
+    yield from sorted(pending.items())
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# --- writers ---
+def write_csv(rows, granularity, out):
+    # out: binary file; UTF-8 with BOM so Excel picks the encoding up
+    text = io.TextIOWrapper(out, encoding="utf-8-sig", newline="", write_through=True)
+    count = 0
+    try:
+        writer = csv.writer(text)
+        writer.writerow(column_names(granularity))
+        for batch in batched(rows, ROW_GROUP_SIZE):
+            writer.writerows(batch)
+            count += len(batch)
+    finally:
+        # Leave out open for the caller
+        text.detach()
+    return count
+
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{sheet}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+def _xlsx_cell(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value!r}</v></c>"
+    text = escape(_XML_ILLEGAL.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def _xlsx_row(values):
+    return "<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>"
+
+def write_xlsx(rows, granularity, out, sheet="Transaksi"):
+    count = 0
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, body in XLSX_PARTS.items():
+            zf.writestr(name, body.replace("{sheet}", escape(sheet)))
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as f:
+            f.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+            f.write(_xlsx_row(column_names(granularity)).encode())
+            for batch in batched(rows, ROW_GROUP_SIZE):
+                f.write("".join(_xlsx_row(row) for row in batch).encode())
+                count += len(batch)
+            f.write(b"</sheetData></worksheet>")
+    return count
+
+def write_parquet(rows, granularity, out):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    names = column_names(granularity)
+    schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in COLUMNS[granularity]])
+    count = 0
+    with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+        for batch in batched(rows, ROW_GROUP_SIZE):
+            columns = list(zip(*batch))
+            writer.write_table(pa.table({name: columns[i] for i, name in enumerate(names)}, schema=schema))
+            count += len(batch)
+    return count
+
+WRITERS = {"csv": write_csv, "xlsx": write_xlsx, "parquet": write_parquet}
+
+def write_export(rows, granularity, fmt, out):
+    """Write rows to the binary file out; returns the number of rows written."""
+    return WRITERS[fmt](rows, granularity, out)
+
+def export_range(storage, first, last, granularity="lines", fmt="csv", out=None, pending_by_file=None, errors=None):
+    # first/last: YYYYMMDD, inclusive; receipts left out as unreadable go to errors when given
+    days = storage.iter_range(first, last)
+    if pending_by_file:
+        days = with_pending(days, pending_by_file, first, last)
+    return write_export(export_rows(days, granularity, errors), granularity, fmt, out)
+
+def export_filename(first, last, granularity, fmt):
+    return f"transaksi_{granularity}_{first}_{last}.{fmt}"
@@ -0,0 +1,226 @@
+import base64
+import contextlib
+import copy
+import hashlib
+import random
+import threading
+import time
+from github import GithubException, InputGitTreeElement
+
+
+# --- COMMIT BATCHING ---
+# Changes queued within one flush interval are applied on top of the branch
+# head and pushed as a single commit through the Git Data API: one blob per
+# changed file, one tree on top of the head tree, one commit and a
+# fast-forward ref update. If another writer moved the branch in between, the
+# ref update answers 422 and the whole batch is re-applied on the new head,
+# the same optimistic retry the contents API path does per file.
+#
+# Derived write listeners (the manifest) run while the batch is applied, so
+# their writes join the commit; the other listeners (the search index) only
+# hear about a file once the commit is on the branch, once per flush.
+# Writes made inside group() (a sale's day file, ledger and stock) are queued
+# together and always share one flush.
+
+def git_blob_sha(data):
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+def _as_bytes(content):
+    return content.encode() if isinstance(content, str) else content
+
+
+class BatchOp:
+    __slots__ = ("path", "mutate", "message", "changed", "error", "done")
+
+    def __init__(self, path, mutate, message):
+        self.path = path
+        self.mutate = mutate
+        self.message = message
+        self.changed = False
+        self.error = None
+        self.done = threading.Event()
+
+
+class GitBatcher:
+    """Coalesces GithubStorage writes into one commit per flush.
+
+    A flush runs when `interval` seconds passed since the first queued change
+    or when `max_ops` changes are waiting. submit() blocks until the change is
+    committed (or failed), so callers keep the contents API semantics: the
+    outbox only marks a sale synced once it is really on the branch.
+    """
+
+    def __init__(self, storage, branch=None, interval=1.0, max_ops=20, max_retries=8):
+        self.storage = storage
+        self.branch = branch
+        self.interval = interval
+        self.max_ops = max_ops
+        self.max_retries = max_retries
+        self.commits = 0
+        self.conflicts = 0
+        self.last_error = None
+        self._ops = []
+        self._cond = threading.Condition()
+        self._flushing = threading.local()
+        self._thread = threading.Thread(target=self._run, name="git-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, path, mutate, message):
+        derived = getattr(self._flushing, "ops", None)
+        if derived is not None:
+            # A write listener (the manifest) reacting to this flush: same commit
+            derived.append(BatchOp(path, mutate, message))
+            return None
+        op = BatchOp(path, mutate, message)
+        group = getattr(self._flushing, "group", None)
+        if group is not None:
+            # Queued when the group closes; the outcome is known only then
+            group.append(op)
+            return None
+        self._wait([op])
+        return op.changed
+
+    def _wait(self, ops):
+        with self._cond:
+            self._ops.extend(ops)
+            self._cond.notify()
+        for op in ops:
+            op.done.wait()
+        for op in ops:
+            if op.error is not None:
+                raise op.error
+
+    @contextlib.contextmanager
+    def group(self):
+        """Writes submitted inside go into the same flush; blocks at the end until it is committed.
+
+        Yields the list of their BatchOps, whose `changed` is set once the block is left.
+        """
+        if getattr(self._flushing, "group", None) is not None:
+            yield self._flushing.group
+            return
+        self._flushing.group = ops = []
+        try:
+            yield ops
+        finally:
+            self._flushing.group = None
+        if ops:
+            self._wait(ops)
+
+    def staged(self, path):
+        # (True, content) of a file this thread's flush has changed but not committed yet
+        state = getattr(self._flushing, "state", None)
+        if state is None or path not in state or not state[path][1]:
+            return False, None
+        return True, copy.deepcopy(state[path][0])
+
+    def pending(self):
+        with self._cond:
+            return len(self._ops)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._ops:
+                    self._cond.wait()
+                deadline = time.monotonic() + self.interval
+                while len(self._ops) < self.max_ops and time.monotonic() < deadline:
+                    self._cond.wait(deadline - time.monotonic())
+                ops, self._ops = self._ops, []
+            self._flush(ops)
+
+    def _flush(self, ops):
+        try:
+            for attempt in range(self.max_retries):
+                try:
+                    self._commit(ops)
+                    break
+                except GithubException as e:
+                    if e.status not in (409, 422) or attempt == self.max_retries - 1:
+                        raise
+                    self.conflicts += 1
+                    time.sleep(random.uniform(0, 0.2 * 2 ** attempt))
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            for op in ops:
+                op.error = e
+        finally:
+            for op in ops:
+                op.done.set()
+
+    def _apply(self, ops, shas):
+        # Run every mutation on top of the head contents; derived listeners see each
+        # touched file once per round and may queue follow-up changes for the same
+        # commit. Returns the changed files and {path: (content, blob sha)} to
+        # notify the other listeners with once the commit landed
+        state = {}  # path -> [data, changed]
+        notices = {}
+        queue = list(ops)
+        self._flushing.state = state
+        try:
+            while queue:
+                touched = []
+                for op in queue:
+                    if op.path not in state:
+                        state[op.path] = [self.storage._read_at(op.path, shas.get(op.path)), False]
+                    new = op.mutate(state[op.path][0])
+                    op.changed = new is not None
+                    if new is not None:
+                        state[op.path] = [new, True]
+                    if op.path not in touched:
+                        touched.append(op.path)
+                self._flushing.ops = derived = []
+                try:
+                    for path in touched:
+                        data, changed = state[path]
+                        sha = git_blob_sha(_as_bytes(self.storage._serialize(path, data))) if changed else shas.get(path)
+                        if sha is not None:
+                            notices[path] = (data, sha)
+                            self.storage._notify(path, data, sha, derived=True)
+                finally:
+                    self._flushing.ops = None
+                queue = derived
+        finally:
+            self._flushing.state = None
+        return {path: data for path, (data, changed) in state.items() if changed}, notices
+
+    def _commit(self, ops):
+        repo = self.storage.get_repo()
+        ref = repo.get_git_ref(f"heads/{self.branch or repo.default_branch}")
+        head = repo.get_git_commit(ref.object.sha)
+        base_tree = repo.get_git_tree(head.tree.sha)
+        changed, notices = self._apply(ops, {e.path: e.sha for e in base_tree.tree})
+        if not changed:
+            self._notify(notices)
+            return
+        elements = []
+        for path, data in changed.items():
+            content = _as_bytes(self.storage._serialize(path, data))
+            try:
+                # Text goes inline in the tree request, saving a write call per file
+                elements.append(InputGitTreeElement(path, "100644", "blob", content=content.decode()))
+            except UnicodeDecodeError:
+                blob = repo.create_git_blob(base64.b64encode(content).decode(), "base64")
+                elements.append(InputGitTreeElement(path, "100644", "blob", sha=blob.sha))
+        tree = repo.create_git_tree(elements, base_tree)
+        messages = [op.message for op in ops if op.changed] or [f"Update {', '.join(changed)}"]
+        if len(messages) == 1:
+            message = messages[0]
+        else:
+            message = f"Batch of {len(messages)} changes\n\n" + "\n".join(f"- {m}" for m in messages)
+        commit = repo.create_git_commit(message, tree, [head])
+        try:
+            # Fast-forward only: 422 when another writer moved the branch meanwhile
+            ref.edit(commit.sha)
+        finally:
+            for path in changed:
+                self.storage.invalidate(path)
+        self.commits += 1
+        self._notify(notices)
+
+    def _notify(self, notices):
+        # The commit is on the branch (or there was nothing to commit): tell the
+        # other listeners, once, about the content they can now read back
+        for path, (data, sha) in notices.items():
+            self.storage._notify(path, data, sha, derived=False)
@@ -0,0 +1,256 @@
+import base64
+import copy
+import json
+import random
+import threading
+import time
+from github import GithubException, UnknownObjectException
+from .dayfile import Archive, archive_filename, dumps_day, is_archive_filename, loads_day
+from .gitbatch import GitBatcher
+from .storage import MISSING, Storage, archived_version, day_filename_of, drop_receipt
+
+
+# --- GITHUB BACKEND ---
+# Kept apart from storage.py so the local and SQLite backends (and the CLI on
+# top of them) import without PyGithub.
+
+class GithubStorage(Storage):
+    """Day files in the GitHub repo, with a SHA/ETag-revalidated read cache."""
+
+    def __init__(self, get_repo, missing_ttl=30, max_retries=8, day_format="json", item_names=(),
+                 batch_interval=None, batch_size=20, branch=None):
+        # get_repo is called lazily so the app still starts while GitHub is unreachable
+        self.get_repo = get_repo
+        self.missing_ttl = missing_ttl
+        self.max_retries = max_retries
+        self.day_format = day_format  # how day files are written, reads accept every format
+        self.item_names = list(item_names)
+        # With batch_interval set, writes are pushed as one Git Data API commit per flush
+        self._batcher = None
+        if batch_interval is not None:
+            self._batcher = GitBatcher(self, branch, batch_interval, batch_size, max_retries)
+        self._entries = {}  # filename -> {"file", "sha", "data", "checked"}
+        self._generations = {}  # filename -> invalidation count
+        self._file_locks = {}
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self, filename):
+        with self._lock:
+            self._entries.pop(filename, None)
+            self._generations[filename] = self._generations.get(filename, 0) + 1
+
+    def _parse(self, name, raw):
+        if is_archive_filename(name):
+            return Archive(raw)
+        if day_filename_of(name):
+            return loads_day(raw)
+        return json.loads(raw.decode())
+
+    def _serialize(self, name, data):
+        if day_filename_of(name):
+            return dumps_day(data, self.day_format, self.item_names)
+        return json.dumps(data, indent=2)
+
+    def _file_lock(self, filename):
+        with self._lock:
+            return self._file_locks.setdefault(filename, threading.Lock())
+
+    def _load_cached(self, filename):
+        if self._batcher is not None:
+            # Read inside a flush (a ledger built from its day): the batch's own content
+            staged, data = self._batcher.staged(filename)
+            if staged:
+                return data
+        return self._load_entry(filename)[0]
+
+    def batch(self):
+        return self._batcher.group() if self._batcher is not None else Storage.batch(self)
+
+    def _load_entry(self, filename):
+        # (parsed content of filename, its blob SHA), or (None, None) when the file
+        # does not exist. One fetch per file at a time; different files load in parallel.
+        repo = self.get_repo()
+        with self._file_lock(filename):
+            with self._lock:
+                entry = self._entries.get(filename)
+                generation = self._generations.get(filename, 0)
+            try:
+                if entry is not None:
+                    file = entry["file"]
+                    if file is None:
+                        # File did not exist on the last check
+                        if time.monotonic() - entry["checked"] < self.missing_ttl:
+                            with self._lock:
+                                self._hits += 1
+                            return None, None
+                        file = repo.get_contents(filename)
+                    elif not file.update() or file.sha == entry["sha"]:
+                        # Conditional GET with the cached ETag; a 304 does not count against the rate limit
+                        with self._lock:
+                            self._hits += 1
+                        return copy.deepcopy(entry["data"]), entry["sha"]
+                else:
+                    file = repo.get_contents(filename)
+                data = self._parse(filename, file.decoded_content)
+                new_entry = {"file": file, "sha": file.sha, "data": data, "checked": time.monotonic()}
+            except UnknownObjectException:
+                data = None
+                new_entry = {"file": None, "sha": None, "data": None, "checked": time.monotonic()}
+            with self._lock:
+                # A write invalidated the file while it was fetched: do not cache the older answer
+                if self._generations.get(filename, 0) == generation:
+                    self._entries[filename] = new_entry
+                self._misses += 1
+            return copy.deepcopy(data), new_entry["sha"]
+
+    def _load_archived(self, filename):
+        archive = self._load_cached(archive_filename(filename))
+        return archive.load(filename) if archive is not None else None
+
+    def load_day(self, filename):
+        data = self._load_cached(filename)
+        if data is None:
+            data = self._load_archived(filename)
+        return data if data is not None else []
+
+    def load_day_version(self, filename):
+        data, sha = self._load_entry(filename)
+        if data is not None:
+            return data, sha
+        archive, sha = self._load_entry(archive_filename(filename))
+        if archive is not None:
+            return archive.load(filename) or [], archived_version(sha)
+        return [], MISSING
+
+    def load_json(self, name, default=None):
+        data = self._load_cached(name)
+        return data if data is not None else default
+
+    def save_json(self, name, data):
+        self._update(name, lambda current: data, f"Update {name}")
+
+    def update_json(self, name, mutate):
+        self._update(name, mutate, f"Update {name}")
+
+    def _read_at(self, filename, sha):
+        # Parsed content of blob sha (None: not in the tree), from the cache when it matches
+        if sha is None:
+            return self._load_archived(filename) if day_filename_of(filename) else None
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is not None and entry["sha"] == sha:
+                return copy.deepcopy(entry["data"])
+        blob = self.get_repo().get_git_blob(sha)
+        return self._parse(filename, base64.b64decode(blob.content))
+
+    def _update(self, filename, mutate, message):
+        # Optimistic concurrency: read the file and its SHA, apply mutate() to the
+        # current list and commit against that SHA. If another till committed in
+        # between GitHub answers 409 (or 422 when both created the file), so re-read
+        # and apply the change again on top of the newer content.
+        if self._batcher is not None:
+            return self._batcher.submit(filename, mutate, message)
+        repo = self.get_repo()
+        try:
+            for attempt in range(self.max_retries):
+                try:
+                    file = repo.get_contents(filename)
+                    current = self._parse(filename, file.decoded_content)
+                except UnknownObjectException:
+                    file = None
+                    # An edit to an archived day starts from the archived copy
+                    current = self._load_archived(filename) if day_filename_of(filename) else None
+                new = mutate(current)
+                if new is None:
+                    if file is not None:
+                        # Nothing to commit, but listeners still see the current state,
+                        # so a replayed sync repairs an index update that failed earlier
+                        self._notify(filename, current, file.sha)
+                    return False
+                content = self._serialize(filename, new)
+                try:
+                    if file is None:
+                        result = repo.create_file(filename, message, content)
+                    else:
+                        result = repo.update_file(filename, message, content, file.sha)
+                except GithubException as e:
+                    if e.status not in (409, 422) or attempt == self.max_retries - 1:
+                        raise
+                    time.sleep(random.uniform(0, 0.2 * 2 ** attempt))
+                    continue
+                self._notify(filename, new, result["content"].sha)
+                return True
+        finally:
+            self.invalidate(filename)
+
+    def save_day(self, filename, transactions):
+        self._update(filename, lambda current: transactions, "Update transactions")
+
+    def append_transactions(self, filename, transactions):
+        def merge(current):
+            current = current or []
+            known = {t.get("code") for t in current}
+            new = [t for t in transactions if t.get("code") not in known]
+            return current + new if new else None
+        self._update(filename, merge, f"Sync {len(transactions)} transactions")
+
+    def delete_transaction(self, filename, code):
+        def remove(current):
+            return drop_receipt(current or [], code)
+        return self._update(filename, remove, f"Delete transaction {code}")
+
+    def list_days(self):
+        return sorted({day_filename_of(n) for n in self.file_versions()} - {None}, reverse=True)
+
+    def list_files(self):
+        return [f.name for f in self.get_repo().get_contents("")]
+
+    def quota(self):
+        # From the rate-limit headers of the last response, no request of its own
+        requester = getattr(self.get_repo(), "requester", None)
+        if requester is None or requester.rate_limiting[0] < 0:
+            return None
+        return requester.rate_limiting[0], requester.rate_limiting_resettime
+
+    def file_versions(self):
+        # The root listing carries every blob SHA, no need to open the files
+        return self._with_archived({f.name: f.sha for f in self.get_repo().get_contents("")})
+
+    def archived_days(self, name):
+        archive = self._load_cached(name)
+        return list(archive.days) if archive is not None else []
+
+    def load_archive(self, name):
+        archive = self._load_cached(name)
+        return archive.all_days() if archive is not None else {}
+
+    def save_archive(self, name, data):
+        repo = self.get_repo()
+        try:
+            try:
+                file = repo.get_contents(name)
+                result = repo.update_file(name, f"Archive {name}", data, file.sha)
+            except UnknownObjectException:
+                result = repo.create_file(name, f"Archive {name}", data)
+            return result["content"].sha
+        finally:
+            self.invalidate(name)
+
+    def delete_file(self, name):
+        repo = self.get_repo()
+        try:
+            file = repo.get_contents(name)
+            repo.delete_file(name, f"Delete {name}", file.sha)
+        except UnknownObjectException:
+            pass
+        finally:
+            self.invalidate(name)
+
+    def stats(self):
+        with self._lock:
+            stats = {"hits": self._hits, "misses": self._misses}
+        if self._batcher is not None:
+            stats.update(commits=self._batcher.commits, conflicts=self._batcher.conflicts)
+        return stats
@@ -0,0 +1,21 @@
+# --- HELPERS ---
+# Shared by the Streamlit page and the modules that run outside it.
+
+def rupiah(n):
+    try:
+        return f"Rp {int(n):,}".replace(",", ".")
+    except Exception:
+        return f"Rp {n}"
+
+def mm_to_pt(mm):
+    return mm * 72.0 / 25.4
+
+def safe_item_fields(item):
+    name = item.get("item") or item.get("name") or "Item"
+    w = item.get("width_cm", 0)
+    h = item.get("height_cm", 0)
+    qty = int(item.get("qty", 1))
+    unit_price = int(item.get("unit_price", 0))
+    subtotal = int(item.get("price", unit_price * qty))
+    area_m2 = float(item.get("area_m2", (w/100.0)*(h/100.0) if (w and h) else 0))
+    return name, w, h, qty, unit_price, subtotal, area_m2
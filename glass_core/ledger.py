@@ -0,0 +1,310 @@
+from .records import Transaction, parse_day
+from .stock import STOCK_FILE, consume, entry_areas
+from .storage import Storage, day_of
+
+# --- RUNNING DAY LEDGER ---
+# ledger.YYYYMMDD.json sits next to each day file. It holds the day's totals
+# overall, per payment method and per glass type, and the last receipt code.
+# It also keeps one compact entry per receipt:
+# [method, total, pieces, [[item, pieces, m², subtotal], ...]].
+# A sale adds its entry and a delete subtracts the stored one. So keeping the
+# ledger current costs the same for the first and the thousandth receipt of
+# the day, and replaying a sale the ledger already has changes nothing.
+#
+# Entries are keyed by occurrence: the receipt code, and "CODE#2", "CODE#3"...
+# for further receipts with the same code, which older days have (storage keeps
+# them all). Like storage, a sale whose code is already there is a replay and
+# a delete removes the newest receipt with the code.
+#
+# The same entries keep stock.json (glass_core.stock) in step: the m² of a
+# new receipt come off the stock, those of a deleted one go back on.
+#
+# Entries come from parsed records (glass_core.records), so a receipt the
+# page cannot read is left out of the ledger as it is left out of the list.
+#
+# The live header and "Selesaikan Sesi" read the ledger instead of the day.
+# check() rebuilds it from the receipts when the two are suspected to differ:
+#
+#   python -m glass_core ledger --local data --from 2025-08-01 --repair
+
+LEDGER_PREFIX = "ledger."
+LEDGER_FORMAT = 2  # 2: repeated codes kept as "CODE#2"...
+AREA_DIGITS = 4
+AREA_TOLERANCE = 0.01  # m² of rounding drift tolerated by the checker
+
+def ledger_filename(filename):
+    # "20250822.json" -> "ledger.20250822.json"; not a day file for day_filename_of()
+    return f"{LEDGER_PREFIX}{day_of(filename)}.json"
+
+def empty_ledger():
+    return {"format": LEDGER_FORMAT, "receipts": 0, "pieces": 0, "area_m2": 0.0, "total": 0,
+            "methods": {}, "items": {}, "last_code": None, "codes": {}}
+
+def receipt_entry(t):
+    # t: a records.Transaction
+    items = [[it.name, it.qty, round(it.area_m2 * it.qty, AREA_DIGITS), it.subtotal] for it in t.items]
+    return [t.method, t.total, t.total_qty, items]
+
+def _apply(ledger, entry, sign):
+    method, total, pieces, items = entry
+    ledger["receipts"] += sign
+    ledger["pieces"] += sign * pieces
+    ledger["total"] += sign * total
+    m = ledger["methods"].setdefault(method, {"receipts": 0, "pieces": 0, "total": 0})
+    m["receipts"] += sign
+    m["pieces"] += sign * pieces
+    m["total"] += sign * total
+    if not m["receipts"]:
+        del ledger["methods"][method]
+    area = 0.0
+    for name, qty, area_m2, subtotal in items:
+        row = ledger["items"].setdefault(name, {"pieces": 0, "area_m2": 0.0, "total": 0})
+        row["pieces"] += sign * qty
+        row["area_m2"] = round(row["area_m2"] + sign * area_m2, AREA_DIGITS)
+        row["total"] += sign * subtotal
+        if not row["pieces"] and not row["total"]:
+            del ledger["items"][name]
+        area += area_m2
+    ledger["area_m2"] = round(ledger["area_m2"] + sign * area, AREA_DIGITS)
+
+def receipt_code(key):
+    # "GL220825-003#2" -> "GL220825-003"
+    return key.split("#", 1)[0]
+
+def _occurrences(ledger, code):
+    # Keys of the receipts with this code, oldest first
+    keys = []
+    key = code
+    while key in ledger["codes"]:
+        keys.append(key)
+        key = f"{code}#{len(keys) + 1}"
+    return keys
+
+def _add(ledger, key, t):
+    entry = receipt_entry(t)
+    ledger["codes"][key] = entry
+    _apply(ledger, entry, 1)
+    ledger["last_code"] = receipt_code(key)
+
+def add_receipts(ledger, transactions):
+    """Add records whose code the ledger does not have yet; returns how many were new."""
+    added = 0
+    for t in transactions:
+        code = t.code
+        if code in ledger["codes"]:
+            continue
+        _add(ledger, code, t)
+        added += 1
+    return added
+
+def remove_receipt(ledger, code):
+    """Drop the newest receipt with this code; the stored entry, or None when there is none."""
+    keys = _occurrences(ledger, code)
+    if not keys:
+        return None
+    entry = ledger["codes"].pop(keys[-1])
+    _apply(ledger, entry, -1)
+    last = next(reversed(ledger["codes"]), None)
+    ledger["last_code"] = None if last is None else receipt_code(last)
+    return entry
+
+def build_ledger(transactions):
+    # Every record of the day counts, a repeated code included
+    ledger = empty_ledger()
+    for t in transactions:
+        code = t.code
+        _add(ledger, f"{code}#{len(_occurrences(ledger, code)) + 1}" if code in ledger["codes"] else code, t)
+    return ledger
+
+def ledger_receipts(ledger, newest_first=True):
+    # Records without items for summary.summary_sections(), without the day file
+    keys = reversed(ledger["codes"]) if newest_first else iter(ledger["codes"])
+    for key in keys:
+        method, total, pieces, items = ledger["codes"][key]
+        yield Transaction(receipt_code(key), "", method, (), pieces, total, round(sum(area for _, _, area, _ in items), AREA_DIGITS))
+
+def compare_ledgers(stored, rebuilt):
+    """{field: (stored, rebuilt)} for every total that differs; empty when consistent."""
+    diffs = {}
+    for key in ("receipts", "pieces", "total", "last_code"):
+        if stored.get(key) != rebuilt[key]:
+            diffs[key] = (stored.get(key), rebuilt[key])
+    if abs(stored.get("area_m2", 0) - rebuilt["area_m2"]) > AREA_TOLERANCE:
+        diffs["area_m2"] = (stored.get("area_m2"), rebuilt["area_m2"])
+    for group in ("methods", "items"):
+        ours, theirs = stored.get(group, {}), rebuilt[group]
+        for name in sorted(set(ours) | set(theirs)):
+            a, b = ours.get(name, {}), theirs.get(name, {})
+            for field in ("receipts", "pieces", "total"):
+                if field in a or field in b:
+                    if a.get(field, 0) != b.get(field, 0):
+                        diffs[f"{group}.{name}.{field}"] = (a.get(field, 0), b.get(field, 0))
+    missing = [c for c in rebuilt["codes"] if c not in stored.get("codes", {})]
+    extra = [c for c in stored.get("codes", {}) if c not in rebuilt["codes"]]
+    if missing:
+        diffs["codes.missing"] = (len(missing), missing[:10])
+    if extra:
+        diffs["codes.extra"] = (len(extra), extra[:10])
+    return diffs
+
+
+class LedgerStorage(Storage):
+    """Keeps the day ledgers in step with the sales and deletes made through it.
+
+    Sits on top of the stack, above the till sharding, so one ledger covers
+    the base day file and every till shard.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def _update(self, filename, change):
+        # Runs after the day file was written (or, batched, right after it in the
+        # same commit), so a missing ledger is built from the day as it is now and
+        # change(None) is told so; another till's sale racing this one is either
+        # in that read or adds itself to the ledger afterwards
+        def mutate(doc):
+            if doc is None or doc.get("format") != LEDGER_FORMAT:
+                change(None)
+                return build_ledger(self._records(filename))
+            return doc if change(doc) else None
+        self.inner.update_json(ledger_filename(filename), mutate)
+
+    def _records(self, filename):
+        return parse_day(filename, self.inner.load_day(filename)).transactions
+
+    def ledger(self, filename):
+        """The day's running totals; counted from the receipts when the day has no ledger yet."""
+        doc = self.inner.load_json(ledger_filename(filename), None)
+        if doc is None or doc.get("format") != LEDGER_FORMAT:
+            # Days from before the ledger: the next write (or check(repair=True)) stores one
+            doc = build_ledger(self._records(filename))
+        return doc
+
+    def rebuild(self, filename):
+        doc = build_ledger(self._records(filename))
+        self.inner.save_json(ledger_filename(filename), doc)
+        return doc
+
+    def check(self, filename, repair=False):
+        """Compare the stored ledger with one rebuilt from the receipts; returns the differences."""
+        stored = self.inner.load_json(ledger_filename(filename), None)
+        day = self._records(filename)
+        rebuilt = build_ledger(day)
+        if stored is None or stored.get("format") != LEDGER_FORMAT:
+            diffs = {"missing": (None, rebuilt["receipts"])} if rebuilt["receipts"] else {}
+        else:
+            diffs = compare_ledgers(stored, rebuilt)
+        # The rebuild itself against a plain count of the day, a repeated code included
+        recount = (len(day), sum(t.total for t in day))
+        if (rebuilt["receipts"], rebuilt["total"]) != recount:
+            diffs["day"] = ((rebuilt["receipts"], rebuilt["total"]), recount)
+        if diffs and repair:
+            self.inner.save_json(ledger_filename(filename), rebuilt)
+        return diffs
+
+    def _update_stock(self, filename, entries, sign, batched):
+        # entries: filled by the ledger change, which runs first (when batched, at
+        # commit time): only receipts the ledger took in or gave up, so a replayed
+        # sale is not counted twice
+        if not batched and not entries:
+            return
+
+        def mutate(doc):
+            areas = entry_areas(entries)
+            return doc if doc is not None and areas and consume(doc, filename, areas, sign) else None
+        self.inner.update_json(STOCK_FILE, mutate)
+
+    def append_transactions(self, filename, transactions):
+        incoming = {t.code: t for t in parse_day(filename, transactions).transactions}
+        entries = []
+
+        def change(doc):
+            if doc is None:
+                # A missing ledger is built from the day with these receipts already in it: all count as new
+                entries[:] = [receipt_entry(t) for t in incoming.values()]
+                return True
+            new = [t for code, t in incoming.items() if code not in doc["codes"]]
+            entries[:] = [receipt_entry(t) for t in new]
+            return add_receipts(doc, new)
+        # Day file, ledger and stock in one commit where the backend batches writes
+        with self.inner.batch() as group:
+            self.inner.append_transactions(filename, transactions)
+            self._update(filename, change)
+            self._update_stock(filename, entries, 1, group is not None)
+
+    def delete_transaction(self, filename, code):
+        removed = []
+        day_ops = []
+
+        def change(doc):
+            removed[:] = []
+            if doc is None or (day_ops and not any(op.changed for op in day_ops)):
+                # Rebuilt from the day, or (batched) the day had no such receipt
+                return doc is None
+            entry = remove_receipt(doc, code)
+            if entry is not None:
+                removed.append(entry)
+            return entry is not None
+        with self.inner.batch() as group:
+            deleted = self.inner.delete_transaction(filename, code)
+            if group is not None:
+                # Batched: the day's delete is only applied at commit, just before the ledger's
+                day_ops[:] = group
+            if deleted or group is not None:
+                self._update(filename, change)
+                self._update_stock(filename, removed, -1, group is not None)
+        return any(op.changed for op in day_ops) if group is not None else deleted
+
+    def save_day(self, filename, transactions):
+        # Whole-day overwrites (imports, migrations): recount from what the day now holds
+        self.inner.save_day(filename, transactions)
+        self.rebuild(filename)
+
+    def add_write_listener(self, listener, derived=False):
+        self.inner.add_write_listener(listener, derived)
+
+    def batch(self):
+        return self.inner.batch()
+
+    def load_day(self, filename):
+        return self.inner.load_day(filename)
+
+    def load_day_version(self, filename):
+        return self.inner.load_day_version(filename)
+
+    def list_days(self):
+        return self.inner.list_days()
+
+    def load_json(self, name, default=None):
+        return self.inner.load_json(name, default)
+
+    def save_json(self, name, data):
+        self.inner.save_json(name, data)
+
+    def update_json(self, name, mutate):
+        self.inner.update_json(name, mutate)
+
+    def file_versions(self):
+        return self.inner.file_versions()
+
+    def day_versions(self):
+        return self.inner.day_versions()
+
+    def iter_range(self, first, last, newest_first=False, **kwargs):
+        return self.inner.iter_range(first, last, newest_first, **kwargs)
+
+    def day_summary(self, filename):
+        return self.inner.day_summary(filename)
+
+    def day_index(self):
+        return self.inner.day_index()
+
+    def compact_days(self, before):
+        return self.inner.compact_days(before)
+
+    def quota(self):
+        return self.inner.quota()
+
+    def stats(self):
+        return self.inner.stats()
@@ -0,0 +1,166 @@
+import argparse
+import datetime
+import os
+import threading
+from .storage import Storage, day_filename_of, merge_summaries, summarize_transactions
+from zoneinfo import ZoneInfo
+
+
+# --- SESSION MANIFEST ---
+# manifest.json lists every day file and till shard with its version (blob SHA
+# on GitHub), receipt count, totals per method and last receipt number. It is
+# rewritten from the write path of every day file, so listing the days and
+# their totals is one small read instead of a root listing plus every file.
+#
+#   python -m glass_core.manifest rebuild --local data
+#   GITHUB_TOKEN=... python -m glass_core.manifest rebuild --github Saichizu/glass-cashier
+#
+# "compact" rolls every closed day (before --before, default today) into its
+# monthly archive and updates the manifest to match:
+#
+#   python -m glass_core.manifest compact --local data --before 20250901
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_FORMAT = 1
+
+
+class ManifestStorage(Storage):
+    """Wraps a GitHub or local backend and keeps manifest.json in step with its day files."""
+
+    covers_shards = True  # day_index()/day_summary() include till shards
+
+    def __init__(self, inner):
+        self.inner = inner
+        self._rebuild_lock = threading.Lock()
+        inner.add_write_listener(self._record, derived=True)
+
+    def _record(self, name, transactions, version):
+        if day_filename_of(name) is None:
+            return
+        entry = dict(summarize_transactions(transactions or []), sha=version)
+
+        def put(doc):
+            if doc is None or doc.get("format") != MANIFEST_FORMAT:
+                # No manifest yet: the next read rebuilds it, this write included
+                return None
+            if doc["files"].get(name) == entry:
+                return None
+            doc["files"][name] = entry
+            return doc
+        self.inner.update_json(MANIFEST_FILE, put)
+
+    def manifest(self):
+        doc = self.inner.load_json(MANIFEST_FILE, None)
+        if doc is None or doc.get("format") != MANIFEST_FORMAT:
+            with self._rebuild_lock:
+                doc = self.inner.load_json(MANIFEST_FILE, None)
+                if doc is None or doc.get("format") != MANIFEST_FORMAT:
+                    doc = self.rebuild()
+        return doc
+
+    def rebuild(self):
+        """Regenerate the manifest from the stored files: one listing plus one read per day file."""
+        files = {}
+        for name, version in sorted(self.inner.file_versions().items()):
+            if day_filename_of(name):
+                files[name] = dict(summarize_transactions(self.inner.load_day(name)), sha=version)
+        doc = {"format": MANIFEST_FORMAT, "files": files}
+        self.inner.save_json(MANIFEST_FILE, doc)
+        return doc
+
+    def compact_days(self, before):
+        # One manifest commit for the whole compaction instead of one per moved file
+        result = self.inner.compact_days(before)
+
+        def apply(doc):
+            if doc is None or doc.get("format") != MANIFEST_FORMAT:
+                return None
+            for name in result["removed"]:
+                doc["files"].pop(name, None)
+            for day, (transactions, version) in result["days"].items():
+                doc["files"][day] = dict(summarize_transactions(transactions), sha=version)
+            return doc
+        if result["removed"]:
+            self.inner.update_json(MANIFEST_FILE, apply)
+        return result
+
+    def day_index(self):
+        days = {}
+        for name, entry in self.manifest()["files"].items():
+            days.setdefault(day_filename_of(name), []).append(entry)
+        return {day: merge_summaries(days[day]) for day in sorted(days, reverse=True)}
+
+    def list_days(self):
+        return list(self.day_index())
+
+    def day_summary(self, filename):
+        entry = self.day_index().get(filename)
+        return entry["methods"] if entry else {}
+
+    def file_versions(self):
+        return {name: entry["sha"] for name, entry in self.manifest()["files"].items()}
+
+    def add_write_listener(self, listener, derived=False):
+        # Writes happen in the wrapped backend
+        self.inner.add_write_listener(listener, derived)
+
+    def batch(self):
+        return self.inner.batch()
+
+    def load_day(self, filename):
+        return self.inner.load_day(filename)
+
+    def load_day_version(self, filename):
+        return self.inner.load_day_version(filename)
+
+    def save_day(self, filename, transactions):
+        self.inner.save_day(filename, transactions)
+
+    def append_transactions(self, filename, transactions):
+        self.inner.append_transactions(filename, transactions)
+
+    def delete_transaction(self, filename, code):
+        return self.inner.delete_transaction(filename, code)
+
+    def load_json(self, name, default=None):
+        return self.inner.load_json(name, default)
+
+    def save_json(self, name, data):
+        self.inner.save_json(name, data)
+
+    def update_json(self, name, mutate):
+        self.inner.update_json(name, mutate)
+
+    def quota(self):
+        return self.inner.quota()
+
+    def stats(self):
+        return self.inner.stats()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain manifest.json and the monthly day archives")
+    parser.add_argument("command", choices=["rebuild", "compact"])
+    parser.add_argument("--before", metavar="YYYYMMDD", help="compact days before this date (default: today)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--local", metavar="DIR", help="directory of YYYYMMDD.json files")
+    source.add_argument("--github", metavar="OWNER/REPO", help="GitHub repo, token in GITHUB_TOKEN")
+    args = parser.parse_args()
+
+    if args.local:
+        from .storage import LocalJsonStorage
+        inner = LocalJsonStorage(args.local)
+    else:
+        from github import Github
+        from .github_storage import GithubStorage
+        repo = Github(os.environ["GITHUB_TOKEN"]).get_repo(args.github)
+        inner = GithubStorage(lambda: repo)
+    storage = ManifestStorage(inner)
+    if args.command == "compact":
+        before = args.before or datetime.datetime.now(ZoneInfo("Asia/Shanghai")).strftime("%Y%m%d")
+        result = storage.compact_days(before)
+        print(f"Archived {len(result['removed'])} files, archives now hold {len(result['days'])} days of the touched months")
+    else:
+        doc = storage.rebuild()
+        days = {day_filename_of(name) for name in doc["files"]}
+        print(f"Rebuilt {MANIFEST_FILE}: {len(doc['files'])} files, {len(days)} days")
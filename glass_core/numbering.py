@@ -0,0 +1,77 @@
+import json
+import os
+import threading
+
+
+# --- RECEIPT NUMBERING ---
+# Codes look like GL230825-005, or GL230825-A005 when the till has an id.
+
+def generate_receipt_code(date_str, count, till=""):
+    return f"GL{date_str}-{till}{count:03d}"
+
+def parse_receipt_number(code, till=""):
+    suffix = (code or "").split("-")[-1]
+    if till:
+        if not suffix.startswith(till):
+            return None
+        suffix = suffix[len(till):]
+    return int(suffix) if suffix.isdigit() else None
+
+def code_day_filename(code):
+    # GL230825-005 -> "20250823.json", the day file the receipt was saved in
+    date_str = (code or "").upper().split("-")[0][2:]
+    if len(date_str) != 6 or not date_str.isdigit():
+        return None
+    return f"20{date_str[4:]}{date_str[2:4]}{date_str[:2]}.json"
+
+
+class ReceiptCounter:
+    """Next receipt number per (day, till) without rescanning the day.
+
+    The day is scanned once to seed the counter, after that every number is
+    handed out from memory under a lock, so sessions sharing this process
+    never get the same number. Tills running in separate processes must use
+    different till ids.
+
+    With a path, the last number handed out today is also kept in a small
+    local file and seeds the counter as well, so a restart can seed without
+    the day file (storage unreachable) and still never reuse a number.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._last = {}
+        self._lock = threading.Lock()
+        self._saved = self._read()  # {"day": filename, "last": {till: number}}
+
+    def _read(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except ValueError:
+            return {}
+
+    def _save(self, day):
+        self._saved = {"day": day, "last": {till: n for (d, till), n in self._last.items() if d == day}}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._saved, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def next(self, day, till, load_transactions):
+        with self._lock:
+            key = (day, till)
+            if key not in self._last:
+                # New day: seeds of earlier days are no longer needed
+                self._last = {k: v for k, v in self._last.items() if k[0] == day}
+                saved = self._saved.get("last", {}).get(till, 0) if self._saved.get("day") == day else 0
+                nums = (parse_receipt_number(t.get("code"), till) for t in load_transactions())
+                self._last[key] = max(max((n for n in nums if n is not None), default=0), saved)
+            self._last[key] += 1
+            if self.path:
+                self._save(day)
+            return self._last[key]
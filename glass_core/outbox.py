@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+import time
+
+
+# --- OUTBOX (local write-ahead journal) ---
+# Every sale is appended to a JSONL journal and fsync'd before the receipt is
+# shown. A SyncWorker drains the journal to GitHub in the background.
+#
+# Journal records:
+#   {"op": "sale", "filename": "20250822.json", "transaction": {...}}
+#   {"op": "synced", "codes": ["GL220825-003", ...]}
+#   {"op": "cancel", "codes": ["GL220825-003"]}
+#
+# While the worker commits a batch its codes are in flight: a cancel waits for
+# the commit to settle, then either cancels a sale that is pending again or
+# leaves a synced one to be deleted from storage.
+
+CANCEL_WAIT = 30.0  # seconds a cancel waits for an in-flight commit
+
+class Outbox:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._settled = threading.Condition(self._lock)
+        self._pending = {}  # code -> (filename, transaction), in journal order
+        self._synced = set()
+        self._in_flight = set()  # codes the sync worker is committing right now
+        self._replay()
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash: everything before it is intact
+                    continue
+                self._apply(record)
+
+    def _apply(self, record):
+        op = record.get("op")
+        if op == "sale":
+            t = record["transaction"]
+            self._pending[t["code"]] = (record["filename"], t)
+        elif op == "synced":
+            for code in record.get("codes", []):
+                if self._pending.pop(code, None) is not None:
+                    self._synced.add(code)
+        elif op == "cancel":
+            for code in record.get("codes", []):
+                self._pending.pop(code, None)
+
+    def _write(self, record):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(record)
+
+    def _truncate_if_drained(self):
+        if self._pending:
+            return
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, filename, transaction):
+        with self._lock:
+            self._write({"op": "sale", "filename": filename, "transaction": transaction})
+
+    def mark_synced(self, codes):
+        with self._lock:
+            codes = list(codes)
+            self._write({"op": "synced", "codes": codes})
+            self._in_flight.difference_update(codes)
+            self._truncate_if_drained()
+            self._settled.notify_all()
+
+    def claim_by_file(self):
+        # pending_by_file() for the sync worker: the codes stay in flight until mark_synced() or release()
+        with self._lock:
+            self._in_flight.update(self._pending)
+            return self._batches()
+
+    def release(self, codes):
+        # Codes whose commit failed or was not tried: pending again
+        with self._lock:
+            self._in_flight.difference_update(codes)
+            self._settled.notify_all()
+
+    def cancel(self, code, timeout=CANCEL_WAIT):
+        """Drop a sale that never reached storage; False when it did (or may still), so delete it there."""
+        with self._lock:
+            # A sale being committed may land in storage any moment: wait until it did or failed
+            self._settled.wait_for(lambda: code not in self._in_flight, timeout)
+            if code not in self._pending or code in self._in_flight:
+                return False
+            self._write({"op": "cancel", "codes": [code]})
+            self._truncate_if_drained()
+            return True
+
+    def pending(self, filename=None):
+        with self._lock:
+            return [t for fn, t in self._pending.values() if filename is None or fn == filename]
+
+    def _batches(self):
+        batches = {}
+        for fn, t in self._pending.values():
+            batches.setdefault(fn, []).append(t)
+        return batches
+
+    def pending_by_file(self):
+        with self._lock:
+            return self._batches()
+
+    def status(self, code):
+        with self._lock:
+            if code in self._pending:
+                return "pending"
+            return "synced"
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+
+class SyncWorker(threading.Thread):
+    """Drains an Outbox through commit(filename, transactions), one commit per day file."""
+
+    def __init__(self, outbox, commit, interval=5.0, batch_window=1.0, max_backoff=120.0):
+        super().__init__(name="outbox-sync", daemon=True)
+        self.outbox = outbox
+        self.commit = commit
+        self.interval = interval
+        self.batch_window = batch_window
+        self.max_backoff = max_backoff
+        self.last_error = None
+        self.last_sync = None
+        self._backoff = 0.0
+        self._wake = threading.Event()
+
+    def kick(self):
+        self._wake.set()
+
+    def run(self):
+        while True:
+            woken = self._wake.wait(timeout=self._backoff or self.interval)
+            self._wake.clear()
+            if woken and not self._backoff:
+                # Give sales made in quick succession a chance to share one commit
+                time.sleep(self.batch_window)
+            self.drain()
+
+    def drain(self):
+        batches = self.outbox.claim_by_file()
+        try:
+            for filename, transactions in batches.items():
+                try:
+                    self.commit(filename, transactions)
+                except Exception as e:
+                    self.last_error = f"{filename}: {e}"
+                    self._backoff = min(max(self._backoff * 2, self.interval), self.max_backoff)
+                    return
+                self.outbox.mark_synced(t["code"] for t in transactions)
+            self.last_error = None
+            self.last_sync = time.time()
+            self._backoff = 0.0
+        finally:
+            self.outbox.release(t["code"] for transactions in batches.values() for t in transactions)
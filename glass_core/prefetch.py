@@ -0,0 +1,123 @@
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+# --- PARALLEL RANGE PREFETCH ---
+# Loads many day files at once on a small thread pool and hands them to the
+# caller as they arrive. Only a window of loads is in flight, so a caller that
+# stops after the first N days (closing the generator) never pays for the
+# rest. The window follows the GitHub quota: it halves when GitHub throttles
+# (403/429, honouring Retry-After) and grows back one step per success, and
+# when the remaining core quota nears RATE_RESERVE the loads are spread over
+# the time left until the quota resets.
+#
+#   for filename, transactions in prefetch(storage.load_day, days, quota=storage.quota):
+#       ...
+
+DEFAULT_WORKERS = 8
+RATE_RESERVE = 200   # requests left for the till itself (sales, manifest) before pacing kicks in
+MAX_PACE = 5.0       # longest pause between loads while pacing, seconds
+MAX_RETRIES = 4
+
+def _throttled(e):
+    # GithubException by its attributes, so the local backends never import PyGithub
+    status = getattr(e, "status", None)
+    if status == 429:
+        return True
+    # Primary and secondary rate limits both answer 403 with a rate-limit message
+    return status == 403 and "rate limit" in str(getattr(e, "data", "")).lower()
+
+def _retry_after(e, attempt):
+    headers = {k.lower(): v for k, v in (getattr(e, "headers", None) or {}).items()}
+    try:
+        return float(headers["retry-after"])
+    except (KeyError, ValueError):
+        return random.uniform(0, 0.5 * 2 ** attempt)
+
+
+class _Window:
+    # Additive-increase / multiplicative-decrease limit on loads in flight
+    def __init__(self, size):
+        self.max = size
+        self.size = size
+        self._lock = threading.Lock()
+
+    def throttled(self):
+        with self._lock:
+            self.size = max(1, self.size // 2)
+
+    def succeeded(self):
+        with self._lock:
+            self.size = min(self.max, self.size + 1)
+
+
+def _pace(quota, reserve):
+    # Seconds to wait before the next load so the remaining quota lasts until reset
+    info = quota() if quota else None
+    if not info:
+        return 0.0
+    remaining, reset = info
+    if remaining > reserve:
+        return 0.0
+    left = max(0.0, reset - time.time())
+    return min(MAX_PACE, left / max(1, remaining))
+
+def prefetch(load, names, workers=DEFAULT_WORKERS, ordered=True, quota=None, reserve=RATE_RESERVE,
+             max_retries=MAX_RETRIES):
+    """Yield (name, load(name)) for every name, loading up to `workers` at once.
+
+    ordered=True yields in the order of `names` (each as soon as it and all
+    before it are in); ordered=False yields in completion order. quota() ->
+    (remaining, reset epoch) or None. Closing the generator early cancels the
+    loads not started yet.
+    """
+    names = list(names)
+    window = _Window(max(1, workers))
+
+    def attempt(name):
+        for n in range(max_retries):
+            try:
+                result = load(name)
+            except Exception as e:
+                if not _throttled(e) or n == max_retries - 1:
+                    raise
+                window.throttled()
+                time.sleep(_retry_after(e, n))
+                continue
+            window.succeeded()
+            return result
+
+    pool = ThreadPoolExecutor(max_workers=window.max, thread_name_prefix="prefetch")
+    pending = {}  # future -> index
+    done = {}     # index -> result, waiting for an earlier index (ordered mode)
+    submitted = 0
+    emitted = 0
+    try:
+        while emitted < len(names):
+            # Bounded lookahead: a slow first day does not pull in the whole range
+            while submitted < len(names) and len(pending) < window.size and submitted - emitted < 2 * window.max:
+                delay = _pace(quota, reserve)
+                if delay and pending:
+                    # Quota is low: let the loads in flight finish before starting more
+                    break
+                if delay:
+                    time.sleep(delay)
+                pending[pool.submit(attempt, names[submitted])] = submitted
+                submitted += 1
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done[pending.pop(future)] = future.result()
+            if ordered:
+                while emitted in done:
+                    yield names[emitted], done.pop(emitted)
+                    emitted += 1
+            else:
+                for i in sorted(done):
+                    yield names[i], done.pop(i)
+                    emitted += 1
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
@@ -0,0 +1,64 @@
+import math
+from .config import ITEMS, SERVICE_FEE
+from .helpers import safe_item_fields
+
+# --- PRICING ---
+# Unit price is area times the glass type's price per m² plus the cutting fee;
+# a cart line is rounded up to the next Rp 1.000.
+
+def base_price(item_name, items=ITEMS):
+    return next(item["base_price"] for item in items if item["name"] == item_name)
+
+def unit_price(base, width_cm, height_cm, service_fee=SERVICE_FEE):
+    area_m2 = (width_cm / 100) * (height_cm / 100)
+    return int(area_m2 * base + service_fee)
+
+def line_price(unit, qty):
+    return math.ceil((unit * qty) / 1000) * 1000
+
+def cart_line(item_name, width_cm, height_cm, qty, items=ITEMS, service_fee=SERVICE_FEE):
+    unit = unit_price(base_price(item_name, items), width_cm, height_cm, service_fee)
+    return {
+        "item": item_name,
+        "width_cm": float(width_cm),
+        "height_cm": float(height_cm),
+        "area_m2": (width_cm / 100) * (height_cm / 100),
+        "unit_price": unit,
+        "qty": int(qty),
+        "price": line_price(unit, qty),
+    }
+
+def line_key(line):
+    # Lines with the same glass and size are one cart line
+    return (line.get("item"), float(line.get("width_cm", 0)), float(line.get("height_cm", 0)))
+
+def merge_lines(cart, lines):
+    # Same glass and size again only raises the quantity of the existing line;
+    # one dict lookup per line, so a 300-piece cut list does not rescan the cart
+    index = {}
+    for i, item in enumerate(cart):
+        index.setdefault(line_key(item), i)
+    for line in lines:
+        key = line_key(line)
+        if key not in index:
+            index[key] = len(cart)
+            cart.append(line)
+            continue
+        item = cart[index[key]]
+        item["qty"] = int(item.get("qty", 1)) + line["qty"]
+        item["unit_price"] = line["unit_price"]
+        item["price"] = line_price(line["unit_price"], item["qty"])
+    return cart
+
+def add_to_cart(cart, line):
+    return merge_lines(cart, [line])
+
+def make_transaction(code, cart, method, when):
+    return {
+        "code": code,
+        "datetime": when.isoformat(),
+        "items": cart,
+        "method": method,
+        "total_qty": int(sum(safe_item_fields(t)[3] for t in cart)),
+        "total": int(sum(safe_item_fields(t)[5] for t in cart)),
+    }
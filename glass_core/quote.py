@@ -0,0 +1,143 @@
+import csv
+import math
+import re
+import numpy as np
+from .config import ITEMS, SERVICE_FEE
+
+# --- BATCH QUOTES ---
+# A whole cut list priced in one NumPy pass, with the rules of
+# pricing.cart_line: the unit price is area times the price per m² plus the
+# cutting fee, truncated like int(), and a line is rounded up to the next
+# Rp 1.000. The lines come out as the same dicts cart_line builds.
+#
+#   rows, errors = parse_cut_list("Kaca Polos 5MM, 60, 40, 2\nKaca Cermin; 45,5x30")
+#   merge_lines(cart, quote_lines(rows))
+
+def quote_arrays(bases, widths_cm, heights_cm, qtys, service_fee=SERVICE_FEE):
+    """(area_m2, unit_price, price) arrays for parallel arrays of pieces."""
+    widths = np.asarray(widths_cm, dtype=np.float64)
+    heights = np.asarray(heights_cm, dtype=np.float64)
+    # Same operations in the same order as unit_price(), so every float rounds the same way
+    area = (widths / 100) * (heights / 100)
+    units = np.trunc(area * np.asarray(bases, dtype=np.float64) + service_fee).astype(np.int64)
+    # Integer ceiling: equal to math.ceil(total / 1000) for any total below 2**53
+    totals = units * np.asarray(qtys, dtype=np.int64)
+    prices = -(-totals // 1000) * 1000
+    return area, units, prices
+
+def quote_lines(rows, items=ITEMS, service_fee=SERVICE_FEE):
+    # rows: (item name, width_cm, height_cm, qty) -> cart lines
+    if not rows:
+        return []
+    bases = {item["name"]: item["base_price"] for item in items}
+    names, widths, heights, qtys = zip(*rows)
+    unknown = sorted(set(names) - set(bases))
+    if unknown:
+        raise ValueError(f"unknown glass type {unknown[0]!r}")
+    area, units, prices = quote_arrays([bases[n] for n in names], widths, heights, qtys, service_fee)
+    return [
+        {
+            "item": name,
+            "width_cm": float(w),
+            "height_cm": float(h),
+            "area_m2": a,
+            "unit_price": u,
+            "qty": int(q),
+            "price": p,
+        }
+        for name, w, h, q, a, u, p in zip(names, widths, heights, qtys, area.tolist(), units.tolist(), prices.tolist())
+    ]
+
+# --- CUT-LIST IMPORT ---
+# One piece per line: glass name, width and height in cm, then an optional
+# quantity (1 when left out). Each line is split on tabs, ";" or "," (whichever
+# it uses, CSV quoting allowed), or on spaces for pasted text. The size may
+# also be written as one "60x40" or "60x40x2" field. A decimal comma is fine;
+# a line where a comma could be either a decimal comma or a separator
+# ("Kaca Cermin, 45,5x30") is an error, quote the number or write "45.5". A
+# line without a glass name takes default_item. A first line without digits
+# is a header; blank lines and "#" comments are skipped.
+
+SIZE = re.compile(r"^(\d+(?:[.,]\d+)?)\s*[xX×*]\s*(\d+(?:[.,]\d+)?)(?:\s*[xX×*]\s*(\d+))?$")
+# A comma not between two digits: a separator even where commas are decimal marks
+LOOSE_COMMA = re.compile(r"(?<!\d),|,(?!\d)")
+
+def _spaced(fields):
+    # A line without the separator is split on spaces, like pasted text
+    return fields if len(fields) > 1 else " ".join(fields).split()
+
+def _readings(line):
+    # The ways to split a line into fields: an unquoted comma line is read with
+    # commas as separators and, again, with commas between digits as decimal commas
+    delimiter = next((d for d in ("\t", ";", ",") if d in line), None)
+    if delimiter is None:
+        return [line.split()]
+    readings = [_spaced(next(csv.reader([line], delimiter=delimiter)))]
+    if delimiter == "," and '"' not in line:
+        readings.append(_spaced(LOOSE_COMMA.split(line)))
+    return readings
+
+def _number(field):
+    try:
+        number = float(field.replace(",", "."))
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+def _numbers(fields):
+    # The numeric fields of a line, a "WxH" field counting as two and "WxHxQ" as three
+    numbers = []
+    for field in fields:
+        size = SIZE.match(field)
+        if size:
+            numbers += [_number(g) for g in size.groups() if g is not None]
+            continue
+        number = _number(field)
+        if number is None:
+            return None
+        numbers.append(number)
+    return numbers
+
+def _row(fields, names, default_item):
+    # (row, None) or (None, error) for the fields of one line
+    fields = [f.strip() for f in fields if f.strip()]
+    # The glass name is everything before the first number or size
+    first = next((i for i, f in enumerate(fields) if _numbers([f]) is not None), len(fields))
+    label = " ".join(" ".join(fields[:first]).split())
+    numbers = _numbers(fields[first:])
+    if not label:
+        if default_item is None:
+            return None, "glass type is missing"
+        label = default_item
+    name = names.get(label.casefold())
+    if name is None:
+        return None, f"unknown glass type {label!r}"
+    if numbers is None or len(numbers) not in (2, 3):
+        return None, "expected width, height and an optional quantity"
+    width, height = numbers[:2]
+    qty = numbers[2] if len(numbers) == 3 else 1.0
+    if width <= 0 or height <= 0:
+        return None, "width and height must be above 0"
+    if not qty.is_integer() or qty < 1:
+        return None, f"quantity {qty:g} is not a whole number of pieces"
+    return (name, width, height, int(qty)), None
+
+def parse_cut_list(text, default_item=None, items=ITEMS):
+    """(rows, errors) of a cut list; rows are (item name, width_cm, height_cm, qty)."""
+    names = {" ".join(item["name"].split()).casefold(): item["name"] for item in items}
+    rows = []
+    errors = []
+    for n, line in enumerate(text.splitlines(), 1):
+        if not line.strip() or line.strip().startswith("#"):
+            continue
+        if not rows and not errors and not any(c.isdigit() for c in line):
+            continue  # header
+        parsed = [_row(fields, names, default_item) for fields in _readings(line)]
+        found = {row for row, _ in parsed if row is not None}
+        if len(found) > 1:
+            errors.append(f"line {n}: ambiguous comma, quote the number or write the decimal with '.'")
+        elif found:
+            rows.append(found.pop())
+        else:
+            errors.append(f"line {n}: {parsed[0][1]}")
+    return rows, errors
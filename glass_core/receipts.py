@@ -0,0 +1,175 @@
+import collections
+import datetime
+import hashlib
+import json
+import threading
+from .helpers import mm_to_pt, rupiah, safe_item_fields
+from io import BytesIO
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from zoneinfo import ZoneInfo
+
+# --- RECEIPT PDF ---
+MARGIN_LEFT = 20
+MARGIN_RIGHT = 20
+MARGIN_TOP = 16
+MARGIN_BOTTOM = 16
+PAGE_WIDTH = mm_to_pt(76)
+LINE_H = 12
+MAX_PAGE_LINES = 80  # longer receipts continue on the next page
+FONT = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+FONT_SIZE = 8
+TITLE_SIZE = 10
+
+def receipt_time(transaction):
+    tstr = transaction.get("datetime", "")[:16]
+    if not tstr:
+        return datetime.datetime.now(ZoneInfo("Asia/Shanghai")).strftime("%d-%m-%Y %H:%M")
+    try:
+        return datetime.datetime.fromisoformat(transaction["datetime"]).strftime("%d-%m-%Y %H:%M")
+    except Exception:
+        return tstr
+
+def receipt_rows(transaction, shop_name):
+    """Logical receipt layout as (kind, left, right) rows; kind is "title", "text" or "rule"."""
+    rows = [("title", shop_name, "")]
+    rows.append(("text", f"Kode: {transaction.get('code', 'GL-XXXXXX')}", ""))
+    rows.append(("text", f"Tanggal: {receipt_time(transaction)}", ""))
+    rows.append(("rule", "", ""))
+    for it in transaction.get("items", []):
+        name, w, h, qty, unit_price, subtotal, area_m2 = safe_item_fields(it)
+        rows.append(("text", f"{name}  {round(w,2):g}x{round(h,2):g} cm", rupiah(subtotal)))
+        rows.append(("text", f"{qty} × {rupiah(unit_price)} = {rupiah(unit_price * qty)}", ""))
+    rows.append(("rule", "", ""))
+    items = transaction.get("items", [])
+    total_qty = int(transaction.get("total_qty", sum(safe_item_fields(i)[3] for i in items)))
+    total_sum = int(transaction.get("total", sum(safe_item_fields(i)[5] for i in items)))
+    rows.append(("text", "Total Qty:", str(total_qty)))
+    rows.append(("text", "Total:", rupiah(total_sum)))
+    rows.append(("text", "Metode:", transaction.get("method", "-")))
+    return rows
+
+def _pdf_lines(rows):
+    # Wrap each row to the paper width; only the first physical line carries the right column
+    content = PAGE_WIDTH - MARGIN_LEFT - MARGIN_RIGHT
+    lines = []
+    for kind, left, right in rows:
+        if kind != "text":
+            lines.append((kind, left, right))
+            continue
+        avail = content - (stringWidth(right, FONT, FONT_SIZE) + 6 if right else 0)
+        parts = simpleSplit(left, FONT, FONT_SIZE, avail) or [""]
+        lines.append(("text", parts[0], right))
+        lines.extend(("text", p, "") for p in parts[1:])
+    return lines
+
+def _draw_lines(c, lines):
+    # One page per MAX_PAGE_LINES chunk, each sized to exactly what it holds
+    for start in range(0, len(lines), MAX_PAGE_LINES):
+        chunk = lines[start:start + MAX_PAGE_LINES]
+        height = len(chunk) * LINE_H + MARGIN_TOP + MARGIN_BOTTOM
+        c.setPageSize((PAGE_WIDTH, height))
+        y = height - MARGIN_TOP
+        for kind, left, right in chunk:
+            if kind == "title":
+                c.setFont(FONT_BOLD, TITLE_SIZE)
+                c.drawCentredString(PAGE_WIDTH/2, y, left)
+                c.setFont(FONT, FONT_SIZE)
+            elif kind == "rule":
+                c.line(MARGIN_LEFT, y, PAGE_WIDTH - MARGIN_RIGHT, y)
+            else:
+                c.drawString(MARGIN_LEFT, y, left)
+                if right:
+                    c.drawRightString(PAGE_WIDTH - MARGIN_RIGHT, y, right)
+            y -= LINE_H
+        c.showPage()
+        c.setFont(FONT, FONT_SIZE)
+
+def render_receipts_pdf(transactions, shop_name):
+    """All receipts in one canvas pass, one or more pages each."""
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=(PAGE_WIDTH, LINE_H + MARGIN_TOP + MARGIN_BOTTOM))
+    c.setFont(FONT, FONT_SIZE)
+    for t in transactions:
+        _draw_lines(c, _pdf_lines(receipt_rows(t, shop_name)))
+    c.save()
+    return buffer.getvalue()
+
+def render_receipt_pdf(transaction, shop_name):
+    return render_receipts_pdf([transaction], shop_name)
+
+
+class ReceiptCache:
+    """Rendered receipt PDFs keyed by a hash of the transaction content, LRU-evicted by total size."""
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(transaction, shop_name):
+        body = json.dumps([shop_name, transaction], sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(body.encode()).hexdigest()
+
+    def get(self, transaction, shop_name):
+        k = self.key(transaction, shop_name)
+        with self._lock:
+            data = self._entries.get(k)
+            if data is not None:
+                self._entries.move_to_end(k)
+                self.hits += 1
+                return data
+            self.misses += 1
+        data = render_receipt_pdf(transaction, shop_name)
+        with self._lock:
+            if k not in self._entries and len(data) <= self.max_bytes:
+                self._entries[k] = data
+                self._size += len(data)
+                while self._size > self.max_bytes:
+                    _, old = self._entries.popitem(last=False)
+                    self._size -= len(old)
+        return data
+
+
+# --- SUMMARY PDF ---
+def render_summary_pdf(title, lines):
+    margin_left = 20
+    margin_right = 20
+    margin_top = 16
+    margin_bottom = 16
+
+    width_pt = mm_to_pt(76)
+    line_h = 12
+    header_lines = 2
+    footer_lines = 1
+    est_lines = header_lines + footer_lines + len(lines)
+    height_pt = est_lines * line_h + margin_top + margin_bottom
+
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=(width_pt, height_pt))
+    y = height_pt - margin_top
+
+    c.setFont("Helvetica-Bold", 10)
+    c.drawCentredString(width_pt/2, y, title)
+    y -= line_h * 2
+    c.setFont("Helvetica", 8)
+    for line in lines:
+        c.drawString(margin_left, y, line)
+        y -= line_h
+        if y < (margin_left + 3*line_h):
+            c.showPage()
+            height_pt = 40*line_h + margin_top + margin_bottom
+            c.setPageSize((width_pt, height_pt))
+            y = height_pt - margin_top
+            c.setFont("Helvetica", 8)
+
+    c.showPage()
+    c.save()
+    buffer.seek(0)
+    return buffer
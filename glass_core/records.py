@@ -0,0 +1,245 @@
+import collections
+import threading
+from .helpers import rupiah
+from .storage import day_of
+
+# --- TRANSACTION RECORDS ---
+# A stored day parsed once into Transaction/Item objects: numbers coerced,
+# totals and areas summed, rupiah strings formatted on first use and kept.
+# The views read these instead of the raw dicts. An entry that cannot be
+# read (no item name, a quantity that is not a number, ...) is left out of
+# the records and reported in DayRecords.errors, rather than shown as
+# "Item" with 0 pieces.
+#
+# RecordCache keys parsed days by the storage version of the file, so a day
+# is parsed again only after it changed:
+#
+#   day = cache.load(storage, "20250823.json")
+#   for t in day.transactions: print(t.code, t.total_text)
+
+class RecordError(ValueError):
+    """An entry of a day file that does not parse into a record."""
+
+    def __init__(self, reason, filename=None, index=None, code=None):
+        super().__init__(reason)
+        self.reason = reason
+        self.filename = filename
+        self.index = index
+        self.code = code
+
+    def __str__(self):
+        where = [day_of(self.filename)] if self.filename else []
+        if self.index is not None:
+            where.append(f"#{self.index + 1}")
+        if self.code:
+            where.append(str(self.code))
+        return f"{' '.join(where)}: {self.reason}" if where else self.reason
+
+def _whole(value, field):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise RecordError(f"{field} {value!r} is not a whole number")
+
+def _number(value, field):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        number = float(value)
+    else:
+        try:
+            number = float(str(value).strip())
+        except ValueError:
+            raise RecordError(f"{field} {value!r} is not a number")
+    if number < 0:
+        raise RecordError(f"{field} {value!r} is negative")
+    return number
+
+def _text(raw, field):
+    value = raw.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise RecordError(f"{field} is missing")
+    return value
+
+
+class Item:
+    __slots__ = ("name", "width_cm", "height_cm", "qty", "unit_price", "subtotal", "area_m2", "_texts")
+
+    def __init__(self, name, width_cm, height_cm, qty, unit_price, subtotal, area_m2):
+        self.name = name
+        self.width_cm = width_cm
+        self.height_cm = height_cm
+        self.qty = qty
+        self.unit_price = unit_price
+        self.subtotal = subtotal
+        self.area_m2 = area_m2  # one piece
+        self._texts = None
+
+    @classmethod
+    def from_dict(cls, raw):
+        if not isinstance(raw, dict):
+            raise RecordError("item is not an object")
+        # "name" is the key of the oldest day files
+        name = raw.get("item") or raw.get("name")
+        if not isinstance(name, str) or not name.strip():
+            raise RecordError("item name is missing")
+        for field in ("width_cm", "height_cm", "qty", "unit_price"):
+            if field not in raw:
+                raise RecordError(f"{field} is missing")
+        w = _number(raw["width_cm"], "width_cm")
+        h = _number(raw["height_cm"], "height_cm")
+        qty = _whole(raw["qty"], "qty")
+        if qty < 1:
+            raise RecordError(f"qty {qty} is below 1")
+        unit_price = _whole(raw["unit_price"], "unit_price")
+        subtotal = _whole(raw["price"], "price") if "price" in raw else unit_price * qty
+        area_m2 = _number(raw["area_m2"], "area_m2") if "area_m2" in raw else (w / 100) * (h / 100)
+        return cls(name, w, h, qty, unit_price, subtotal, area_m2)
+
+    def _text(self, i):
+        if self._texts is None:
+            self._texts = (f"{round(self.width_cm, 2):g} x {round(self.height_cm, 2):g}",
+                           rupiah(self.unit_price), rupiah(self.subtotal))
+        return self._texts[i]
+
+    @property
+    def size_text(self):
+        return self._text(0)
+
+    @property
+    def unit_price_text(self):
+        return self._text(1)
+
+    @property
+    def subtotal_text(self):
+        return self._text(2)
+
+
+class Transaction:
+    __slots__ = ("code", "datetime", "method", "items", "total_qty", "total", "area_m2", "raw", "_total_text")
+
+    def __init__(self, code, datetime, method, items, total_qty, total, area_m2=0.0, raw=None):
+        self.code = code
+        self.datetime = datetime
+        self.method = method
+        self.items = items
+        self.total_qty = total_qty
+        self.total = total
+        self.area_m2 = area_m2  # all pieces
+        self.raw = raw  # the stored dict, for PDFs, printing and the cutting plan
+        self._total_text = None
+
+    @classmethod
+    def from_dict(cls, raw):
+        if not isinstance(raw, dict):
+            raise RecordError("receipt is not an object")
+        code = _text(raw, "code")
+        raw_items = raw.get("items")
+        if not isinstance(raw_items, list) or not raw_items:
+            raise RecordError("receipt has no items", code=code)
+        items = []
+        for i, it in enumerate(raw_items, 1):
+            try:
+                items.append(Item.from_dict(it))
+            except RecordError as e:
+                raise RecordError(f"item {i}: {e.reason}", code=code)
+        try:
+            dt = _text(raw, "datetime")
+            method = _text(raw, "method")
+            # Stored totals are what the customer paid; older receipts without them are summed
+            total_qty = _whole(raw["total_qty"], "total_qty") if "total_qty" in raw else sum(it.qty for it in items)
+            total = _whole(raw["total"], "total") if "total" in raw else sum(it.subtotal for it in items)
+        except RecordError as e:
+            raise RecordError(e.reason, code=code)
+        area = round(sum(it.area_m2 * it.qty for it in items), 4)
+        return cls(code, dt, method, tuple(items), total_qty, total, area, raw)
+
+    @property
+    def total_text(self):
+        if self._total_text is None:
+            self._total_text = rupiah(self.total)
+        return self._total_text
+
+    @property
+    def date_text(self):
+        return self.datetime[:10]
+
+    @property
+    def time_text(self):
+        return self.datetime[11:16]
+
+
+class DayRecords:
+    __slots__ = ("filename", "transactions", "errors", "receipts", "total_qty", "total", "area_m2", "_by_code")
+
+    def __init__(self, filename, transactions, errors=()):
+        self.filename = filename
+        self.transactions = tuple(transactions)
+        self.errors = tuple(errors)
+        self.receipts = len(self.transactions)
+        self.total_qty = sum(t.total_qty for t in self.transactions)
+        self.total = sum(t.total for t in self.transactions)
+        self.area_m2 = round(sum(t.area_m2 for t in self.transactions), 4)
+        self._by_code = None
+
+    def find(self, code):
+        if self._by_code is None:
+            self._by_code = {t.code: t for t in self.transactions}
+        return self._by_code.get(code)
+
+    def merged(self, other):
+        """This day plus the receipts of other it does not have yet (outbox sales)."""
+        extra = [t for t in other.transactions if self.find(t.code) is None]
+        if not extra and not other.errors:
+            return self
+        return DayRecords(self.filename, self.transactions + tuple(extra), self.errors + other.errors)
+
+def parse_day(filename, transactions):
+    records = []
+    errors = []
+    for index, raw in enumerate(transactions):
+        try:
+            records.append(Transaction.from_dict(raw))
+        except RecordError as e:
+            code = e.code or (raw.get("code") if isinstance(raw, dict) else None)
+            errors.append(RecordError(e.reason, filename, index, code))
+    return DayRecords(filename, records, errors)
+
+
+class RecordCache:
+    """Parsed days keyed by (day filename, storage version), LRU-evicted by day count.
+
+    Backends that cannot name a version (None) get their day parsed on every load.
+    """
+
+    def __init__(self, max_days=64):
+        self.max_days = max_days
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def day(self, filename, transactions, version):
+        key = (filename, version)
+        with self._lock:
+            day = self._entries.get(key) if version is not None else None
+            if day is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return day
+            self.misses += 1
+        day = parse_day(filename, transactions)
+        if version is not None:
+            with self._lock:
+                self._entries[key] = day
+                while len(self._entries) > self.max_days:
+                    self._entries.popitem(last=False)
+        return day
+
+    def load(self, storage, filename):
+        transactions, version = storage.load_day_version(filename)
+        return self.day(filename, transactions, version)
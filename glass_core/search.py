@@ -0,0 +1,326 @@
+import argparse
+import bisect
+import heapq
+import os
+import re
+import sys
+import threading
+from .prefetch import prefetch
+from .records import parse_day
+from .storage import day_filename_of
+
+
+# --- RECEIPT SEARCH INDEX ---
+# Every stored day file (and till shard) is reduced to one compact row per
+# receipt. Rows feed in-memory indexes: sorted codes for prefix lookups,
+# sorted totals and piece sizes for range lookups, and posting sets per item
+# name and payment method. Rows are persisted per month next to the day files
+# ("search_index.202508.json") with the version of the file they came from, so
+# a restart only re-reads days that changed since, and a write listener keeps
+# the index current for sales made by this process.
+#
+#   python -m glass_core.search --local data "reben 60x40 ~2"
+#   GITHUB_TOKEN=... python -m glass_core.search --github Saichizu/glass-cashier GL230825-0
+
+INDEX_PREFIX = "search_index."
+INDEX_FORMAT = 1
+DEFAULT_LIMIT = 50
+
+SIZE_RE = re.compile(r"^(\d+(?:[.,]\d+)?)[x×*](\d+(?:[.,]\d+)?)$")
+TOLERANCE_RE = re.compile(r"^[~±](\d+(?:[.,]\d+)?)$")
+AMOUNT_RE = re.compile(r"^(\d*)-(\d*)$")
+CODE_RE = re.compile(r"^[A-Z]{2}\d{2,}", re.IGNORECASE)
+
+def index_filename(month):
+    return f"{INDEX_PREFIX}{month}.json"
+
+def _number(text):
+    return float(text.replace(",", "."))
+
+def receipt_row(t):
+    # t: a records.Transaction
+    return [t.code, t.datetime, t.method, t.total, t.total_qty, [[it.name, it.width_cm, it.height_cm] for it in t.items]]
+
+def receipt_rows(name, transactions):
+    # Receipts that do not parse are left out, like on the page
+    return [receipt_row(t) for t in parse_day(name, transactions or []).transactions]
+
+def parse_query(text, methods=()):
+    """Criteria for SearchIndex.search() from one search box.
+
+    "GL230825-0" code prefix, "60x40" size (either orientation) with "~2"
+    tolerance in cm, "100000-250000" amount range (either end may be empty),
+    a payment method name, and any other words must all appear in an item name.
+    """
+    criteria = {}
+    words = []
+    lower_methods = {m.lower(): m for m in methods}
+    for token in text.split():
+        size = SIZE_RE.match(token)
+        tolerance = TOLERANCE_RE.match(token)
+        amount = AMOUNT_RE.match(token.replace(".", ""))
+        if size:
+            criteria["size"] = (_number(size.group(1)), _number(size.group(2)))
+        elif tolerance:
+            criteria["tolerance"] = _number(tolerance.group(1))
+        elif amount and token != "-":
+            lo, hi = amount.groups()
+            criteria["amount"] = (int(lo) if lo else None, int(hi) if hi else None)
+        elif token.lower() in lower_methods:
+            criteria["method"] = lower_methods[token.lower()]
+        elif CODE_RE.match(token):
+            criteria["code"] = token.upper()
+        else:
+            words.append(token.lower())
+    if words:
+        criteria["item"] = " ".join(words)
+    return criteria
+
+
+class SearchIndex:
+    def __init__(self, storage):
+        self.storage = storage
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._loaded = False
+        self._versions = {}  # stored file -> version its rows came from
+        self._rows = {}      # rid -> (file, row)
+        self._by_file = {}   # stored file -> [rid]
+        self._next_rid = 0
+        self._codes = []     # sorted (code, rid)
+        self._totals = []    # sorted (total, rid)
+        self._sizes = []     # sorted (width, height, rid), one per piece
+        self._times = []     # sorted (datetime, rid) for newest-first results
+        self._items = {}     # item name -> {rid}
+        self._methods = {}   # method -> {rid}
+        self._dirty = set()  # months to persist
+
+    # --- maintenance ---
+    def _versions_now(self):
+        try:
+            versions = self.storage.file_versions()
+        except NotImplementedError:
+            # SQLite has no per-file versions, its day versions play the same role
+            return self.storage.day_versions()
+        return {name: v for name, v in versions.items() if day_filename_of(name)}
+
+    def _drop(self, name):
+        for rid in self._by_file.pop(name, []):
+            file, row = self._rows.pop(rid)
+            code, dt, method, total, _, items = row
+            del self._codes[bisect.bisect_left(self._codes, (code, rid))]
+            del self._times[bisect.bisect_left(self._times, (dt, rid))]
+            del self._totals[bisect.bisect_left(self._totals, (total, rid))]
+            for item, w, h in items:
+                del self._sizes[bisect.bisect_left(self._sizes, (w, h, rid))]
+                self._items[item].discard(rid)
+            self._methods[method].discard(rid)
+        self._versions.pop(name, None)
+
+    def _append(self, name, rows, version, insert):
+        rids = []
+        for row in rows:
+            rid = self._next_rid
+            self._next_rid += 1
+            code, dt, method, total, _, items = row
+            self._rows[rid] = (name, row)
+            insert(self._codes, (code, rid))
+            insert(self._times, (dt, rid))
+            insert(self._totals, (total, rid))
+            for item, w, h in items:
+                insert(self._sizes, (w, h, rid))
+                self._items.setdefault(item, set()).add(rid)
+            self._methods.setdefault(method, set()).add(rid)
+            rids.append(rid)
+        self._by_file[name] = rids
+        self._versions[name] = version
+        self._dirty.add(name[:6])
+
+    def _put_rows(self, name, rows, version):
+        self._drop(name)
+        self._append(name, rows, version, bisect.insort)
+
+    def _put_many(self, entries):
+        # Bulk load: append everything, then sort each index once
+        for name, _, _ in entries:
+            self._drop(name)
+        for name, rows, version in entries:
+            self._append(name, rows, version, list.append)
+        self._codes.sort()
+        self._times.sort()
+        self._totals.sort()
+        self._sizes.sort()
+
+    def record(self, name, transactions, version):
+        # Write listener: re-index the written file from the content just stored
+        if day_filename_of(name) is None:
+            return
+        with self._lock:
+            if self._loaded:
+                self._put_rows(name, receipt_rows(name, transactions), version)
+
+    def _persisted(self, months):
+        entries = []
+        for month in sorted(months):
+            doc = self.storage.load_json(index_filename(month), None) or {}
+            if doc.get("format") != INDEX_FORMAT:
+                continue
+            entries.extend((name, e["rows"], e["version"]) for name, e in doc.get("files", {}).items())
+        return entries
+
+    def refresh(self):
+        """Bring the index up to date with storage; returns the number of re-read files.
+
+        Storage is only called with the index lock released: a write through
+        the storage (a GitBatcher flush, LocalJsonStorage's lock) calls
+        record(), which takes that lock.
+        """
+        versions = self._versions_now()
+        with self._lock:
+            loaded = self._loaded
+        if not loaded:
+            entries = self._persisted({name[:6] for name in versions})
+            with self._lock:
+                if not self._loaded:
+                    self._put_many(entries)
+                    self._dirty.clear()
+                    self._loaded = True
+        with self._lock:
+            seen = {name: self._versions.get(name) for name in set(versions) | set(self._versions)}
+        stale = [name for name, v in versions.items() if seen[name] != v]
+        fresh = [
+            (name, receipt_rows(name, transactions), versions[name])
+            for name, transactions in prefetch(self.storage.load_day, stale, quota=self.storage.quota)
+        ]
+        with self._lock:
+            # A file record() re-indexed meanwhile is newer than what was read here
+            self._put_many([entry for entry in fresh if self._versions.get(entry[0]) == seen[entry[0]]])
+            for name in [name for name in self._versions if name not in versions and self._versions[name] == seen.get(name)]:
+                self._drop(name)
+                self._dirty.add(name[:6])
+        self._save_dirty()
+        return len(stale)
+
+    def _save_dirty(self):
+        # Month documents built under the index lock, written after releasing it;
+        # _save_lock keeps two refreshes from writing a month out of order
+        with self._save_lock:
+            with self._lock:
+                docs = {}
+                for month in sorted(self._dirty):
+                    files = {
+                        name: {"version": self._versions[name], "rows": [self._rows[rid][1] for rid in rids]}
+                        for name, rids in sorted(self._by_file.items()) if name[:6] == month
+                    }
+                    docs[index_filename(month)] = {"format": INDEX_FORMAT, "files": files}
+                self._dirty.clear()
+            for name, doc in docs.items():
+                self.storage.save_json(name, doc)
+
+    # --- lookups ---
+    def methods(self):
+        with self._lock:
+            return sorted(m for m, rids in self._methods.items() if rids)
+
+    def _by_code(self, prefix):
+        lo = bisect.bisect_left(self._codes, (prefix,))
+        hi = bisect.bisect_left(self._codes, (prefix + "\uffff",))
+        return {rid for _, rid in self._codes[lo:hi]}
+
+    def _by_amount(self, lo, hi):
+        start = 0 if lo is None else bisect.bisect_left(self._totals, (lo,))
+        end = len(self._totals) if hi is None else bisect.bisect_right(self._totals, (hi, float("inf")))
+        return {rid for _, rid in self._totals[start:end]}
+
+    def _by_size(self, w, h, tolerance):
+        found = set()
+        for a, b in {(w, h), (h, w)}:
+            i = bisect.bisect_left(self._sizes, (a - tolerance,))
+            while i < len(self._sizes) and self._sizes[i][0] <= a + tolerance:
+                if abs(self._sizes[i][1] - b) <= tolerance:
+                    found.add(self._sizes[i][2])
+                i += 1
+        return found
+
+    def _by_item(self, text):
+        words = text.lower().split()
+        found = set()
+        for name, rids in self._items.items():
+            if all(word in name.lower() for word in words):
+                found |= rids
+        return found
+
+    def search(self, code=None, item=None, size=None, tolerance=0.0, amount=None, method=None, limit=DEFAULT_LIMIT):
+        """Receipts matching every given criterion, newest first.
+
+        Returns (hits, total matches); each hit is {"file", "day", "code",
+        "datetime", "method", "total", "total_qty", "items"}.
+        """
+        with self._lock:
+            sets = []
+            if code:
+                sets.append(self._by_code(code.upper()))
+            if item:
+                sets.append(self._by_item(item))
+            if size:
+                sets.append(self._by_size(size[0], size[1], tolerance))
+            if amount:
+                sets.append(self._by_amount(*amount))
+            if method:
+                sets.append(self._methods.get(method, set()))
+            if not sets:
+                return [], 0
+            sets.sort(key=len)
+            matches = sets[0].intersection(*sets[1:])
+            if len(matches) * 8 > len(self._times):
+                # Broad query: walk receipts newest first until the page is full
+                newest = []
+                for _, rid in reversed(self._times):
+                    if rid in matches:
+                        newest.append(rid)
+                        if len(newest) == limit:
+                            break
+            else:
+                newest = heapq.nlargest(limit, matches, key=lambda rid: self._rows[rid][1][1])
+            hits = []
+            for rid in newest:
+                name, (code, dt, method, total, qty, items) = self._rows[rid]
+                hits.append({
+                    "file": name, "day": day_filename_of(name), "code": code, "datetime": dt,
+                    "method": method, "total": total, "total_qty": qty,
+                    "items": [{"item": i, "width_cm": w, "height_cm": h} for i, w, h in items],
+                })
+            return hits, len(matches)
+
+    def query(self, text, limit=DEFAULT_LIMIT):
+        return self.search(limit=limit, **parse_query(text, self.methods()))
+
+    def stats(self):
+        with self._lock:
+            return {"files": len(self._by_file), "receipts": len(self._rows)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search receipts across every stored day")
+    parser.add_argument("query", help='e.g. "GL230825-0", "reben 60x40 ~2", "100000-250000 transfer"')
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--local", metavar="DIR", help="directory of YYYYMMDD.json files")
+    source.add_argument("--github", metavar="OWNER/REPO", help="GitHub repo, token in GITHUB_TOKEN")
+    args = parser.parse_args()
+
+    if args.local:
+        from .storage import LocalJsonStorage
+        storage = LocalJsonStorage(args.local)
+    else:
+        from github import Github
+        from .github_storage import GithubStorage
+        repo = Github(os.environ["GITHUB_TOKEN"]).get_repo(args.github)
+        storage = GithubStorage(lambda: repo)
+    index = SearchIndex(storage)
+    print(f"Re-read {index.refresh()} files, {index.stats()['receipts']} receipts indexed", file=sys.stderr)
+    hits, total = index.query(args.query, args.limit)
+    for hit in hits:
+        sizes = ", ".join(f"{it['item']} {it['width_cm']:g}x{it['height_cm']:g}" for it in hit["items"])
+        print(f"{hit['code']}\t{hit['datetime'][:16]}\t{hit['method']}\t{hit['total']}\t{sizes}")
+    print(f"{len(hits)} of {total} matches", file=sys.stderr)
@@ -0,0 +1,111 @@
+import datetime
+from .config import LOW_STOCK_SHEETS
+from .cutting import DEFAULT_SHEET
+from .storage import day_of
+
+# --- GLASS STOCK ---
+# stock.json holds what is left of each glass type the owner keeps stock of:
+#
+#   {"format": 1,
+#    "items": {name: {"area_m2", "sheet": [w, h], "min_sheets", "since"}},
+#    "restocks": [[when, name, sheets, m², "restock" | "count"], ...]}
+#
+# LedgerStorage subtracts the m² of each new receipt's ledger entry and adds
+# back those of a deleted one, so a sale costs the same whatever the history
+# length. Types that were never stocked are not tracked, and receipts of days
+# before a type's "since" day (the day it was first stocked) never count. A
+# restock adds whole sheets; a count (stock opname) sets the balance to what
+# is on the rack, which also clears any drift.
+
+STOCK_FILE = "stock.json"
+STOCK_FORMAT = 1
+STOCK_DIGITS = 4
+RESTOCK_LOG = 200  # newest restock/count entries kept
+
+def empty_stock():
+    return {"format": STOCK_FORMAT, "items": {}, "restocks": []}
+
+def sheet_m2(sheet):
+    w, h = sheet
+    return (w / 100) * (h / 100)
+
+def entry_areas(entries):
+    # {glass type: m²} of ledger receipt entries [method, total, pieces, [[item, pieces, m², subtotal], ...]]
+    areas = {}
+    for _, _, _, items in entries:
+        for name, _, area_m2, _ in items:
+            areas[name] = areas.get(name, 0.0) + area_m2
+    return areas
+
+def consume(stock, filename, areas, sign=1):
+    """Take areas ({name: m²}) of a day's receipts out of stock (sign=-1 puts them back); True if it changed."""
+    day = day_of(filename)
+    changed = False
+    for name, area_m2 in areas.items():
+        row = stock["items"].get(name)
+        if row is None or day < row["since"]:
+            continue
+        row["area_m2"] = round(row["area_m2"] - sign * area_m2, STOCK_DIGITS)
+        changed = True
+    return changed
+
+def receive(stock, name, sheets, sheet, when, min_sheets, kind):
+    """Add sheets of a glass type to a stock document, or set it to them with kind="count"."""
+    sheet = list(sheet or stock["items"].get(name, {}).get("sheet") or DEFAULT_SHEET)
+    area_m2 = round(sheets * sheet_m2(sheet), STOCK_DIGITS)
+    row = stock["items"].setdefault(name, {
+        "area_m2": 0.0, "sheet": sheet, "min_sheets": LOW_STOCK_SHEETS, "since": when.strftime("%Y%m%d"),
+    })
+    row["sheet"] = sheet
+    if min_sheets is not None:
+        row["min_sheets"] = min_sheets
+    row["area_m2"] = area_m2 if kind == "count" else round(row["area_m2"] + area_m2, STOCK_DIGITS)
+    stock["restocks"] = (stock["restocks"] + [[when.isoformat(timespec="seconds"), name, sheets, area_m2, kind]])[-RESTOCK_LOG:]
+    return stock
+
+def restock(storage, name, sheets, when, sheet=None, min_sheets=None, count=False):
+    """Add sheets of a glass type to stock, or with count=True set its stock to that many sheets."""
+    def mutate(doc):
+        if doc is None or doc.get("format") != STOCK_FORMAT:
+            doc = empty_stock()
+        return receive(doc, name, sheets, sheet, when, min_sheets, "count" if count else "restock")
+    storage.update_json(STOCK_FILE, mutate)
+
+def load_stock(storage):
+    doc = storage.load_json(STOCK_FILE, None)
+    return doc if doc is not None and doc.get("format") == STOCK_FORMAT else empty_stock()
+
+def stock_levels(stock):
+    """One row per stocked glass type: m² and sheets left, and whether it is at or below its alert level."""
+    rows = []
+    for name, row in stock["items"].items():
+        per_sheet = sheet_m2(row["sheet"])
+        sheets = row["area_m2"] / per_sheet
+        rows.append({
+            "item": name,
+            "area_m2": row["area_m2"],
+            "sheets": round(sheets, 2),
+            "whole_sheets": max(0, int(round(sheets, 4))),
+            "min_sheets": row["min_sheets"],
+            "low": sheets <= row["min_sheets"],
+        })
+    return rows
+
+def forecast(stock, rates, item_names, today):
+    """stock_levels() rows plus the m²/day rate and the days and date until each type runs out.
+
+    rates: m² per day per item row, as from RollupStore.consumption(), in item_names order.
+    """
+    index = {name: i for i, name in enumerate(item_names)}
+    rows = []
+    for row in stock_levels(stock):
+        i = index.get(row["item"])
+        rate = float(rates[i]) if i is not None else 0.0
+        days_left = max(0.0, row["area_m2"]) / rate if rate > 0 else None
+        rows.append(dict(
+            row,
+            rate_m2_day=round(rate, STOCK_DIGITS),
+            days_left=None if days_left is None else round(days_left, 1),
+            stockout=None if days_left is None else today + datetime.timedelta(days=int(days_left)),
+        ))
+    return rows
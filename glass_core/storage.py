@@ -0,0 +1,671 @@
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from .dayfile import ARCHIVE_SUFFIX, Archive, archive_filename, dumps_day, is_archive_filename, loads_day, pack_archive, read_archive_table, read_archived_day
+from .prefetch import DEFAULT_WORKERS, prefetch
+
+
+# --- STORAGE BACKENDS ---
+# Day files are addressed by filename ("20250822.json") everywhere in the app,
+# every backend keeps that contract so the page does not care where data lives.
+
+def is_day_filename(name):
+    return name.endswith(".json") and len(name) == 13 and name[:8].isdigit()
+
+def day_of(filename):
+    return filename[:8]
+
+# Per-till shards: "20250822.A.json" is till A's part of "20250822.json"
+def shard_filename(filename, till):
+    return f"{day_of(filename)}.{till}.json"
+
+def summarize_transactions(transactions):
+    """Receipt count, per-method totals and the last receipt number per till prefix."""
+    methods = {}
+    last = {}
+    for t in transactions:
+        s = methods.setdefault(t.get("method", "-"), {"count": 0, "qty": 0, "total": 0})
+        s["count"] += 1
+        s["qty"] += int(t.get("total_qty", sum(int(i.get("qty", 1)) for i in t.get("items", []))))
+        s["total"] += int(t.get("total", sum(int(i.get("price", 0)) for i in t.get("items", []))))
+        suffix = str(t.get("code") or "").split("-")[-1]
+        prefix = suffix.rstrip("0123456789")
+        if suffix != prefix:
+            last[prefix] = max(last.get(prefix, 0), int(suffix[len(prefix):]))
+    return {"count": len(transactions), "methods": methods, "last": last}
+
+def merge_summaries(summaries):
+    # One day out of the summaries of its base file and till shards
+    merged = {"count": 0, "methods": {}, "last": {}}
+    for s in summaries:
+        merged["count"] += s["count"]
+        for method, m in s["methods"].items():
+            acc = merged["methods"].setdefault(method, {"count": 0, "qty": 0, "total": 0})
+            for k in acc:
+                acc[k] += m[k]
+        for prefix, n in s["last"].items():
+            merged["last"][prefix] = max(merged["last"].get(prefix, 0), n)
+    merged["qty"] = sum(m["qty"] for m in merged["methods"].values())
+    merged["total"] = sum(m["total"] for m in merged["methods"].values())
+    return merged
+
+def day_filename_of(name):
+    # Day file a listing entry belongs to, for plain day files and till shards
+    parts = name.split(".")
+    if len(parts) in (2, 3) and parts[-1] == "json" and len(parts[0]) == 8 and parts[0].isdigit():
+        return f"{parts[0]}.json"
+    return None
+
+
+def merge_day_files(lists):
+    # Base day file plus till shards: the first file holding a code wins, ordered
+    # by time. A code repeated within one file is two receipts and both stay.
+    merged = []
+    seen = set()
+    for transactions in lists:
+        codes = set()
+        for t in transactions:
+            code = t.get("code")
+            if code is None or code not in seen:
+                codes.add(code)
+                merged.append(t)
+        seen |= codes
+    merged.sort(key=lambda t: t.get("datetime", ""))
+    return merged
+
+def drop_receipt(transactions, code):
+    # The day without its newest receipt with this code (older days repeat some
+    # codes, a delete removes one receipt); None when the code is not there
+    for i in range(len(transactions) - 1, -1, -1):
+        if transactions[i].get("code") == code:
+            return transactions[:i] + transactions[i + 1:]
+    return None
+
+MISSING = "missing"
+
+def archived_version(archive_version):
+    return f"archive:{archive_version}"
+
+
+class Storage:
+    def add_write_listener(self, listener, derived=False):
+        # listener(stored file name, new content, new version) after every write.
+        # derived=True: the listener only writes documents derived from the file
+        # (the manifest); a batching backend runs it while the batch is applied,
+        # so those writes land in the same commit
+        if "_listeners" not in self.__dict__:
+            self._listeners = []
+        self._listeners.append((listener, derived))
+
+    def _notify(self, name, data, version, derived=None):
+        # derived=None: every listener, True/False: only that kind
+        for listener, kind in self.__dict__.get("_listeners", ()):
+            if derived is None or kind == derived:
+                listener(name, data, version)
+
+    @contextlib.contextmanager
+    def batch(self):
+        # Writes made inside land together where the backend batches commits
+        # (GithubStorage with a GitBatcher); elsewhere each is written at once.
+        # Yields the batch (None when not batching)
+        yield None
+
+    def load_day(self, filename):
+        raise NotImplementedError
+
+    def load_day_version(self, filename):
+        # (transactions, version of what was read) for caches of parsed days;
+        # MISSING for a day that does not exist, None when the backend cannot tell
+        return self.load_day(filename), None
+
+    def save_day(self, filename, transactions):
+        raise NotImplementedError
+
+    def append_transactions(self, filename, transactions):
+        # Merge by receipt code so replaying the same sale twice is harmless
+        current = self.load_day(filename)
+        known = {t.get("code") for t in current}
+        new = [t for t in transactions if t.get("code") not in known]
+        if new:
+            self.save_day(filename, current + new)
+
+    def delete_transaction(self, filename, code):
+        remaining = drop_receipt(self.load_day(filename), code)
+        if remaining is None:
+            return False
+        self.save_day(filename, remaining)
+        return True
+
+    def list_days(self):
+        raise NotImplementedError
+
+    def load_json(self, name, default=None):
+        # Auxiliary documents kept next to the day files (rollups, indexes, ...)
+        raise NotImplementedError
+
+    def save_json(self, name, data):
+        raise NotImplementedError
+
+    def update_json(self, name, mutate):
+        # mutate(current or None) -> new document, or None to leave it alone
+        new = mutate(self.load_json(name))
+        if new is not None:
+            self.save_json(name, new)
+
+    def file_versions(self):
+        # {stored file name: opaque version} for every file, from one listing
+        raise NotImplementedError
+
+    def _with_archived(self, versions):
+        # Archived days are listed under their day filename; a day file written
+        # after compaction (an edit to an old day) wins over its archived copy
+        merged = {}
+        for name, version in versions.items():
+            if is_archive_filename(name):
+                for day in self.archived_days(name):
+                    merged[day] = archived_version(version)
+        merged.update((n, v) for n, v in versions.items() if not is_archive_filename(n))
+        return merged
+
+    def compact_days(self, before):
+        """Roll day files and till shards dated before `before` (YYYYMMDD) into monthly archives.
+
+        Returns {"days": {day filename: (transactions, version)}, "removed": [file names]}.
+        """
+        sources = sorted(n for n in self.list_files() if day_filename_of(n) and n[:8] < before)
+        months = {}
+        for name in sources:
+            months.setdefault(name[:6], []).append(name)
+        result = {"days": {}, "removed": []}
+        for month, names in sorted(months.items()):
+            archive_name = f"{month}{ARCHIVE_SUFFIX}"
+            days = self.load_archive(archive_name)
+            parts = {}
+            for name in names:
+                parts.setdefault(day_filename_of(name), []).append(name)
+            for day, files in parts.items():
+                base = self.load_day(day) if day in files else days.get(day, [])
+                shards = [self.load_day(n) for n in files if n != day]
+                days[day] = merge_day_files([base, *shards]) if shards else base
+            # Archive first: until the sources are gone the day files still win on read
+            version = self.save_archive(archive_name, pack_archive(days, self.item_names))
+            for name in names:
+                self.delete_file(name)
+            result["days"].update((day, (t, archived_version(version))) for day, t in days.items())
+            result["removed"].extend(names)
+        return result
+
+    def day_versions(self):
+        # {day filename: version} where the version changes whenever the day
+        # file or any of its till shards changes
+        parts = {}
+        for name, version in self.file_versions().items():
+            day = day_filename_of(name)
+            if day:
+                parts.setdefault(day, []).append(f"{name}:{version}")
+        return {day: "|".join(sorted(v)) for day, v in parts.items()}
+
+    def quota(self):
+        # (remaining API requests, reset epoch) when the backend is rate limited, else None
+        return None
+
+    def iter_range(self, first, last, newest_first=False, workers=DEFAULT_WORKERS, ordered=True):
+        """Yield (day filename, transactions) for first..last (YYYYMMDD, inclusive), loaded in parallel.
+
+        Stop iterating (or close the generator) once enough days are in; the rest are not fetched.
+        """
+        days = sorted((f for f in self.list_days() if first <= day_of(f) <= last), reverse=newest_first)
+        return prefetch(self.load_day, days, workers, ordered, quota=self.quota)
+
+    def load_range(self, first, last):
+        return dict(self.iter_range(first, last))
+
+    def day_summary(self, filename):
+        return summarize_transactions(self.load_day(filename))["methods"]
+
+    def day_index(self):
+        # {day filename: merge_summaries() entry}, newest first. Backends with an
+        # index answer this without opening every day file.
+        return {f: merge_summaries([summarize_transactions(self.load_day(f))]) for f in self.list_days()}
+
+    def stats(self):
+        return {}
+
+
+class LocalJsonStorage(Storage):
+    """Same YYYYMMDD.json files as the GitHub repo, in a local directory."""
+
+    def __init__(self, directory, day_format="json", item_names=()):
+        self.directory = directory
+        self.day_format = day_format
+        self.item_names = list(item_names)
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def _version(self, name):
+        st = os.stat(self._path(name))
+        return f"{st.st_mtime_ns}-{st.st_size}"
+
+    def _write(self, name, data):
+        path = self._path(name)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def load_json(self, name, default=None):
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+
+    def save_json(self, name, data):
+        with self._lock:
+            self._write(name, json.dumps(data, indent=2).encode())
+            self._notify(name, data, self._version(name))
+
+    def update_json(self, name, mutate):
+        with self._lock:
+            Storage.update_json(self, name, mutate)
+
+    def _load_archived(self, filename):
+        try:
+            with open(self._path(archive_filename(filename)), "rb") as f:
+                return read_archived_day(f, filename)
+        except FileNotFoundError:
+            return None
+
+    def load_day(self, filename):
+        try:
+            with open(self._path(filename), "rb") as f:
+                return loads_day(f.read())
+        except FileNotFoundError:
+            archived = self._load_archived(filename)
+            return archived if archived is not None else []
+
+    def load_day_version(self, filename):
+        # Version taken before the read: a write in between costs a second parse, never a stale one
+        for name in (filename, archive_filename(filename)):
+            try:
+                version = self._version(name)
+            except FileNotFoundError:
+                continue
+            return self.load_day(filename), version if name == filename else archived_version(version)
+        return [], MISSING
+
+    def save_day(self, filename, transactions):
+        with self._lock:
+            self._write(filename, dumps_day(transactions, self.day_format, self.item_names))
+            self._notify(filename, transactions, self._version(filename))
+
+    def append_transactions(self, filename, transactions):
+        with self._lock:
+            current = self.load_day(filename)
+            known = {t.get("code") for t in current}
+            new = [t for t in transactions if t.get("code") not in known]
+            if new:
+                self.save_day(filename, current + new)
+
+    def list_days(self):
+        return sorted({day_filename_of(n) for n in self.file_versions()} - {None}, reverse=True)
+
+    def list_files(self):
+        return [n for n in os.listdir(self.directory) if not n.endswith(".tmp")]
+
+    def file_versions(self):
+        versions = {}
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".tmp"):
+                st = entry.stat()
+                versions[entry.name] = f"{st.st_mtime_ns}-{st.st_size}"
+        return self._with_archived(versions)
+
+    def archived_days(self, name):
+        with open(self._path(name), "rb") as f:
+            return list(read_archive_table(f)[0])
+
+    def load_archive(self, name):
+        try:
+            with open(self._path(name), "rb") as f:
+                return Archive(f.read()).all_days()
+        except FileNotFoundError:
+            return {}
+
+    def save_archive(self, name, data):
+        with self._lock:
+            self._write(name, data)
+            return self._version(name)
+
+    def delete_file(self, name):
+        with self._lock:
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+
+
+class ShardedStorage(Storage):
+    """Each till appends only to its own shard file; reads merge the base day file and all shards.
+
+    With one writer per file, two tills never race on the same SHA.
+    """
+
+    def __init__(self, inner, till, tills):
+        self.inner = inner
+        self.till = till
+        self.tills = list(dict.fromkeys([till, *tills]))
+
+    def _files(self, filename):
+        return [filename] + [shard_filename(filename, t) for t in self.tills]
+
+    def add_write_listener(self, listener, derived=False):
+        self.inner.add_write_listener(listener, derived)
+
+    def batch(self):
+        return self.inner.batch()
+
+    def quota(self):
+        return self.inner.quota()
+
+    def load_day(self, filename):
+        return merge_day_files(self.inner.load_day(name) for name in self._files(filename))
+
+    def load_day_version(self, filename):
+        parts = [self.inner.load_day_version(name) for name in self._files(filename)]
+        versions = [version for _, version in parts]
+        version = None if None in versions else "|".join(versions)
+        return merge_day_files(transactions for transactions, _ in parts), version
+
+    def save_day(self, filename, transactions):
+        # Whole-day overwrites (imports, migrations) go to the shared base file
+        self.inner.save_day(filename, transactions)
+
+    def append_transactions(self, filename, transactions):
+        self.inner.append_transactions(shard_filename(filename, self.till), transactions)
+
+    def delete_transaction(self, filename, code):
+        deleted = False
+        for name in self._files(filename):
+            deleted = self.inner.delete_transaction(name, code) or deleted
+        return deleted
+
+    def list_days(self):
+        return self.inner.list_days()
+
+    def load_json(self, name, default=None):
+        return self.inner.load_json(name, default)
+
+    def save_json(self, name, data):
+        self.inner.save_json(name, data)
+
+    def update_json(self, name, mutate):
+        self.inner.update_json(name, mutate)
+
+    def file_versions(self):
+        return self.inner.file_versions()
+
+    def day_summary(self, filename):
+        if getattr(self.inner, "covers_shards", False):
+            return self.inner.day_summary(filename)
+        return Storage.day_summary(self, filename)
+
+    def day_index(self):
+        if getattr(self.inner, "covers_shards", False):
+            return self.inner.day_index()
+        return Storage.day_index(self)
+
+    def compact_days(self, before):
+        # Compaction merges every shard, it does not depend on which till runs it
+        return self.inner.compact_days(before)
+
+    def stats(self):
+        return self.inner.stats()
+
+
+# Fields that get their own column, anything else round-trips through "extra"
+TRANSACTION_COLUMNS = ("code", "datetime", "method", "total_qty", "total")
+ITEM_COLUMNS = ("item", "width_cm", "height_cm", "area_m2", "unit_price", "qty", "price")
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    day TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    code TEXT,
+    datetime TEXT,
+    method TEXT,
+    total_qty INTEGER,
+    total INTEGER,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_day ON transactions (day, position);
+-- not unique: older day files contain the same code twice and import must keep both
+CREATE INDEX IF NOT EXISTS idx_transactions_code ON transactions (code, day);
+CREATE INDEX IF NOT EXISTS idx_transactions_method ON transactions (method, day);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    transaction_id INTEGER NOT NULL REFERENCES transactions (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    item TEXT,
+    -- no declared type: sizes round-trip exactly as written (88 vs 22.0)
+    width_cm,
+    height_cm,
+    area_m2 REAL,
+    unit_price INTEGER,
+    qty INTEGER,
+    price INTEGER,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_items_transaction ON items (transaction_id, position);
+CREATE INDEX IF NOT EXISTS idx_items_item ON items (item);
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+);
+"""
+
+def _split_extra(record, columns):
+    extra = {k: v for k, v in record.items() if k not in columns}
+    return [record.get(c) for c in columns], (json.dumps(extra) if extra else None)
+
+def _join_extra(columns, values, extra):
+    record = {c: v for c, v in zip(columns, values) if v is not None}
+    if extra:
+        record.update(json.loads(extra))
+    return record
+
+
+class SqliteStorage(Storage):
+    """Normalized transactions/items tables, indexed on day, code, method and item name."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(SQLITE_SCHEMA)
+
+    def _insert(self, day, transactions, start_position=0):
+        cur = self._conn.cursor()
+        for pos, t in enumerate(transactions, start_position):
+            values, extra = _split_extra({k: v for k, v in t.items() if k != "items"}, TRANSACTION_COLUMNS)
+            cur.execute(
+                "INSERT INTO transactions (day, position, code, datetime, method, total_qty, total, extra)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [day, pos, *values, extra],
+            )
+            tid = cur.lastrowid
+            rows = []
+            for ipos, it in enumerate(t.get("items", [])):
+                ivalues, iextra = _split_extra(it, ITEM_COLUMNS)
+                rows.append([tid, ipos, *ivalues, iextra])
+            cur.executemany(
+                "INSERT INTO items (transaction_id, position, item, width_cm, height_cm, area_m2, unit_price, qty, price, extra)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def _select(self, where, params):
+        # where filters the transactions table, aliased as t
+        rows = self._conn.execute(
+            f"SELECT t.id, t.day, t.code, t.datetime, t.method, t.total_qty, t.total, t.extra FROM transactions t"
+            f" WHERE {where} ORDER BY t.day, t.position",
+            params,
+        ).fetchall()
+        items = {}
+        for tid, *values, extra in self._conn.execute(
+            "SELECT i.transaction_id, i.item, i.width_cm, i.height_cm, i.area_m2, i.unit_price, i.qty, i.price, i.extra"
+            f" FROM items i JOIN transactions t ON t.id = i.transaction_id WHERE {where}"
+            " ORDER BY i.transaction_id, i.position",
+            params,
+        ):
+            items.setdefault(tid, []).append(_join_extra(ITEM_COLUMNS, values, extra))
+        result = []
+        for tid, day, code, dt, *values, extra in rows:
+            # Same key order as the original day files
+            t = _join_extra(("code", "datetime"), (code, dt), None)
+            t["items"] = items.get(tid, [])
+            t.update(_join_extra(TRANSACTION_COLUMNS[2:], values, extra))
+            result.append((day, t))
+        return result
+
+    def load_day(self, filename):
+        with self._lock:
+            return [t for _, t in self._select("t.day = ?", [day_of(filename)])]
+
+    def save_day(self, filename, transactions):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transactions WHERE day = ?", [day_of(filename)])
+            self._insert(day_of(filename), transactions)
+
+    def append_transactions(self, filename, transactions):
+        day = day_of(filename)
+        with self._lock, self._conn:
+            (last,) = self._conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM transactions WHERE day = ?", [day]).fetchone()
+            known = {code for (code,) in self._conn.execute("SELECT code FROM transactions WHERE day = ?", [day])}
+            self._insert(day, [t for t in transactions if t.get("code") not in known], last)
+
+    def delete_transaction(self, filename, code):
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "DELETE FROM transactions WHERE id = (SELECT id FROM transactions WHERE day = ? AND code = ? ORDER BY position DESC LIMIT 1)",
+                [day_of(filename), code],
+            )
+            return cur.rowcount > 0
+
+    def list_days(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT day FROM transactions ORDER BY day DESC").fetchall()
+        return [f"{day}.json" for (day,) in rows]
+
+    def load_json(self, name, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM documents WHERE name = ?", [name]).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def save_json(self, name, data):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO documents (name, body) VALUES (?, ?)", [name, json.dumps(data)])
+
+    def compact_days(self, before):
+        # One database holds every day, there are no day files to roll into archives
+        raise NotImplementedError("compaction is only for day-file backends (GitHub, local JSON), not SQLite")
+
+    def day_versions(self):
+        # Row ids only grow, so count + max id + sum changes on every insert or delete
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, COUNT(*), MAX(id), SUM(COALESCE(total, 0)) FROM transactions GROUP BY day"
+            ).fetchall()
+        return {f"{day}.json": f"{n}:{last}:{total}" for day, n, last, total in rows}
+
+    def load_range(self, first, last):
+        result = {}
+        with self._lock:
+            for day, t in self._select("t.day BETWEEN ? AND ?", [first, last]):
+                result.setdefault(f"{day}.json", []).append(t)
+        return result
+
+    def iter_range(self, first, last, newest_first=False, workers=DEFAULT_WORKERS, ordered=True):
+        # One query per month: few round trips, and a multi-year export never holds more than a month
+        months = []
+        year, month = int(first[:4]), int(first[4:6])
+        while f"{year:04d}{month:02d}" <= last[:6]:
+            months.append(f"{year:04d}{month:02d}")
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        for m in (reversed(months) if newest_first else months):
+            days = self.load_range(max(first, f"{m}01"), min(last, f"{m}31"))
+            yield from sorted(days.items(), reverse=newest_first)
+
+    def day_summary(self, filename):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT COALESCE(t.method, '-'), COUNT(*),"
+                " SUM(COALESCE(t.total_qty, (SELECT SUM(COALESCE(i.qty, 1)) FROM items i WHERE i.transaction_id = t.id), 0)),"
+                " SUM(COALESCE(t.total, (SELECT SUM(COALESCE(i.price, 0)) FROM items i WHERE i.transaction_id = t.id), 0))"
+                " FROM transactions t WHERE t.day = ? GROUP BY t.method",
+                [day_of(filename)],
+            ).fetchall()
+        return {m: {"count": n, "qty": q, "total": tot} for m, n, q, tot in rows}
+
+    def day_index(self):
+        # Two queries for every day: totals grouped by day and method, then the codes
+        with self._lock:
+            totals = self._conn.execute(
+                "SELECT t.day, COALESCE(t.method, '-'), COUNT(*),"
+                " SUM(COALESCE(t.total_qty, (SELECT SUM(COALESCE(i.qty, 1)) FROM items i WHERE i.transaction_id = t.id), 0)),"
+                " SUM(COALESCE(t.total, (SELECT SUM(COALESCE(i.price, 0)) FROM items i WHERE i.transaction_id = t.id), 0))"
+                " FROM transactions t GROUP BY t.day, t.method"
+            ).fetchall()
+            codes = self._conn.execute("SELECT day, code FROM transactions").fetchall()
+        entries = {}
+        for day, code in codes:
+            entries.setdefault(day, []).append({"code": code})
+        entries = {day: dict(summarize_transactions(e), methods={}) for day, e in entries.items()}
+        for day, method, n, qty, total in totals:
+            entries[day]["methods"][method] = {"count": n, "qty": qty, "total": total}
+        return {f"{day}.json": merge_summaries([entries[day]]) for day in sorted(entries, reverse=True)}
+
+    def import_days(self, days):
+        # Bulk load {filename: transactions} in a single SQLite transaction
+        with self._lock, self._conn:
+            for filename, transactions in days.items():
+                self._conn.execute("DELETE FROM transactions WHERE day = ?", [day_of(filename)])
+                self._insert(day_of(filename), transactions)
+
+
+def import_json_files(storage, paths):
+    # Returns the imported day filenames; pass the backend itself (below any
+    # wrapper) so SQLite takes its one-transaction bulk path
+    days = {}
+    for path in paths:
+        name = os.path.basename(path)
+        if not is_day_filename(name):
+            continue
+        with open(path, "rb") as f:
+            days[name] = loads_day(f.read())
+    if isinstance(storage, SqliteStorage):
+        storage.import_days(days)
+    else:
+        for name, transactions in days.items():
+            storage.save_day(name, transactions)
+    return sorted(days)
+
+
+if __name__ == "__main__":
+    # python -m glass_core.storage transactions.db 2025*.json
+    if len(sys.argv) < 3:
+        print("usage: python -m glass_core.storage DATABASE DAYFILE.json [DAYFILE.json ...]")
+        sys.exit(2)
+    names = import_json_files(SqliteStorage(sys.argv[1]), sys.argv[2:])
+    print(f"Imported {len(names)} day files into {sys.argv[1]}")
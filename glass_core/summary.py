@@ -0,0 +1,66 @@
+from .config import PAYMENT_METHODS
+from .helpers import rupiah
+
+# --- SESSION SUMMARY ---
+# The "Selesaikan Sesi" lines (receipts grouped by payment method with a total
+# per method) and a plain per-method / per-item report for the CLI. Both read
+# records.Transaction objects: a parsed day, or ledger_receipts() without
+# items. Pure Python on purpose: no NumPy, so a nightly report starts in a blink.
+
+def by_method(transactions, methods=PAYMENT_METHODS):
+    # Known methods first, even when empty; anything else after them in order of appearance
+    groups = {m: [] for m in methods}
+    for t in transactions:
+        groups.setdefault(t.method, []).append(t)
+    return groups
+
+def receipt_line(t):
+    return f"{t.code}: {t.total_text} ({t.total_qty} pcs)"
+
+def summary_sections(transactions, methods=PAYMENT_METHODS):
+    """[(method, receipt lines, total line)] in display order."""
+    sections = []
+    for method, txns in by_method(transactions, methods).items():
+        total = sum(t.total for t in txns)
+        sections.append((method, [receipt_line(t) for t in txns], f"Total {method}: {rupiah(total)}"))
+    return sections
+
+def summary_lines(transactions, methods=PAYMENT_METHODS):
+    # Flat text for the "Struk Ringkasan" text area and the summary PDF
+    lines = []
+    for method, receipt_lines, total_line in summary_sections(transactions, methods):
+        lines.append(f"Transaksi {method}\n")
+        lines.extend(receipt_lines)
+        lines.append(total_line + "\n")
+    return lines
+
+def day_report(transactions):
+    """Receipts, pieces, m² and revenue overall, per payment method and per glass type."""
+    report = {"receipts": 0, "pieces": 0, "area_m2": 0.0, "total": 0, "methods": {}, "items": {}}
+    for t in transactions:
+        for it in t.items:
+            row = report["items"].setdefault(it.name, {"pieces": 0, "area_m2": 0.0, "total": 0})
+            row["pieces"] += it.qty
+            row["area_m2"] += it.area_m2 * it.qty
+            row["total"] += it.subtotal
+        method = report["methods"].setdefault(t.method, {"receipts": 0, "total": 0})
+        method["receipts"] += 1
+        method["total"] += t.total
+        report["receipts"] += 1
+        report["pieces"] += t.total_qty
+        report["area_m2"] += t.area_m2
+        report["total"] += t.total
+    report["area_m2"] = round(report["area_m2"], 4)
+    for row in report["items"].values():
+        row["area_m2"] = round(row["area_m2"], 4)
+    return report
+
+def report_lines(report, title):
+    lines = [title, f"Nota: {report['receipts']}  Qty: {report['pieces']} pcs  Luas: {report['area_m2']:.2f} m²",
+             f"Total: {rupiah(report['total'])}", ""]
+    for method, row in report["methods"].items():
+        lines.append(f"{method}: {rupiah(row['total'])} ({row['receipts']} nota)")
+    lines.append("")
+    for name, row in sorted(report["items"].items(), key=lambda kv: -kv[1]["total"]):
+        lines.append(f"{name}: {row['pieces']} pcs, {row['area_m2']:.2f} m², {rupiah(row['total'])}")
+    return lines
@@ -0,0 +1,164 @@
+import collections
+import contextlib
+import json
+import math
+import time
+from github.ContentFile import ContentFile
+from github.GitRef import GitRef
+
+
+# --- TELEMETRY ---
+# Timing spans for the slow parts of a rerun (GitHub calls, PDFs, the rerun
+# itself) kept in a bounded ring buffer, plus the latest GitHub rate-limit
+# headers. Disabled telemetry hands out one shared no-op context manager, so
+# the instrumented code pays a single attribute check.
+#
+#   telemetry = Telemetry(capacity=2000)
+#   with telemetry.span("pdf.receipt"):
+#       ...
+#   telemetry.summary()      # {name: {count, errors, p50_ms, p90_ms, p99_ms, max_ms}}
+#   telemetry.to_jsonl()     # one span per line
+#   telemetry.to_prometheus()
+
+QUANTILES = (0.5, 0.9, 0.99)
+_NOOP = contextlib.nullcontext()
+
+def percentile(sorted_values, q):
+    # Nearest-rank on an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(q * len(sorted_values)))) - 1
+    return sorted_values[rank]
+
+
+class Telemetry:
+    def __init__(self, capacity=2000, enabled=True):
+        self.enabled = enabled
+        # deque appends are atomic, spans from the sync and batch threads need no lock
+        self.spans = collections.deque(maxlen=capacity)
+        self.rate = {}
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return _NOOP
+        return self._span(name, attrs)
+
+    @contextlib.contextmanager
+    def _span(self, name, attrs):
+        start = time.time()
+        t0 = time.perf_counter()
+        error = None
+        try:
+            yield attrs
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.record(name, time.perf_counter() - t0, error, start, **attrs)
+
+    def record(self, name, seconds, error=None, start=None, **attrs):
+        if not self.enabled:
+            return
+        entry = {"name": name, "start": round(start or time.time() - seconds, 3), "ms": round(seconds * 1000, 3)}
+        if error:
+            entry["error"] = error
+        entry.update(attrs)
+        self.spans.append(entry)
+
+    def record_rate_limit(self, remaining, limit, reset):
+        # PyGithub reports (-1, -1) until the first response with rate-limit headers
+        if remaining < 0:
+            return
+        self.rate = {"remaining": remaining, "limit": limit, "reset": reset, "at": round(time.time(), 3)}
+
+    def clear(self):
+        self.spans.clear()
+        self.rate = {}
+
+    def summary(self):
+        durations = collections.defaultdict(list)
+        errors = collections.Counter()
+        for s in list(self.spans):
+            durations[s["name"]].append(s["ms"])
+            if "error" in s:
+                errors[s["name"]] += 1
+        out = {}
+        for name in sorted(durations):
+            values = sorted(durations[name])
+            row = {"count": len(values), "errors": errors[name], "total_ms": round(sum(values), 3)}
+            for q in QUANTILES:
+                row[f"p{int(q * 100)}_ms"] = percentile(values, q)
+            row["max_ms"] = values[-1]
+            out[name] = row
+        return out
+
+    def to_jsonl(self):
+        lines = [json.dumps(s, ensure_ascii=False) for s in list(self.spans)]
+        if self.rate:
+            lines.append(json.dumps(dict(self.rate, name="github.rate_limit")))
+        return "\n".join(lines) + "\n"
+
+    def to_prometheus(self, prefix="glass"):
+        # Summaries over the spans still in the buffer, not since process start
+        lines = [
+            f"# HELP {prefix}_span_seconds Span durations in the telemetry ring buffer.",
+            f"# TYPE {prefix}_span_seconds summary",
+        ]
+        summary = self.summary()
+        for name, row in summary.items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for q in QUANTILES:
+                lines.append(f'{prefix}_span_seconds{{span="{label}",quantile="{q}"}} {row[f"p{int(q * 100)}_ms"] / 1000:.6f}')
+            lines.append(f'{prefix}_span_seconds_sum{{span="{label}"}} {row["total_ms"] / 1000:.6f}')
+            lines.append(f'{prefix}_span_seconds_count{{span="{label}"}} {row["count"]}')
+        lines.append(f"# HELP {prefix}_span_errors Spans in the ring buffer that raised.")
+        lines.append(f"# TYPE {prefix}_span_errors gauge")
+        for name, row in summary.items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{prefix}_span_errors{{span="{label}"}} {row["errors"]}')
+        if self.rate:
+            for key, kind in (("remaining", "remaining"), ("limit", "limit"), ("reset", "reset_timestamp_seconds")):
+                lines.append(f"# TYPE {prefix}_github_rate_limit_{kind} gauge")
+                lines.append(f"{prefix}_github_rate_limit_{kind} {self.rate[key]}")
+        return "\n".join(lines) + "\n"
+
+
+class Traced:
+    """PyGithub object proxy: every method call becomes a "<prefix><method>" span.
+
+    Results that make requests of their own (ContentFile.update() for the
+    conditional GET, GitRef.edit() for the batch commit) come back traced too.
+    After each call the rate-limit headers PyGithub already parsed from the
+    response are copied into the telemetry; no extra request is made.
+    """
+
+    def __init__(self, obj, telemetry, prefix="github."):
+        self._obj = obj
+        self._telemetry = telemetry
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        attr = getattr(self._obj, name)
+        if not callable(attr) or not self._telemetry.enabled:
+            return attr
+
+        def traced(*args, **kwargs):
+            attrs = {"path": args[0]} if args and isinstance(args[0], str) else {}
+            try:
+                with self._telemetry.span(self._prefix + name, **attrs):
+                    result = attr(*args, **kwargs)
+            finally:
+                self._capture_rate()
+            for kind, prefix in TRACED_RESULTS:
+                if isinstance(result, kind):
+                    return Traced(result, self._telemetry, prefix)
+            return result
+        return traced
+
+    def _capture_rate(self):
+        requester = getattr(self._obj, "requester", None)
+        if requester is not None:
+            remaining, limit = requester.rate_limiting
+            self._telemetry.record_rate_limit(remaining, limit, requester.rate_limiting_resettime)
+
+TRACED_RESULTS = ((ContentFile, "github.content."), (GitRef, "github.ref."))